@@ -0,0 +1,94 @@
+"""Startup-time guard for the lightweight CLI commands.
+
+Runs ``raster-builder list`` and ``raster-builder validate <config>`` in fresh
+interpreters, measures the time from the first ``raster_builder`` import to the
+command's return, and checks that no heavy dependency was imported. Exits 1 when a
+command exceeds ``--budget`` seconds or imports a guarded module::
+
+    python benchmarks/bench_import.py --budget 0.3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+HEAVY_MODULES = ("ee", "geopandas", "rasterio", "shapely", "pyarrow", "pandas", "numpy")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from raster_builder.main import main
+main({argv!r})
+elapsed = time.perf_counter() - started
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def _config(root: Path) -> Path:
+    (root / "service_account.json").write_text("{}", encoding="utf-8")
+    path = root / "pipeline.yml"
+    path.write_text(
+        "credentials:\n"
+        "  earthengine_service_account: service_account.json\n"
+        "paths:\n"
+        "  raw_data: raw\n"
+        "  processed_data: processed\n"
+        "schema:\n"
+        "  index:\n"
+        "    name: globfire\n"
+        "  earthengine:\n"
+        "    - dataset: firepred_daily\n"
+        "  earthaccess:\n"
+        "    - dataset: granules\n"
+        "      options: {short_name: MYD11A2}\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+def probe(argv: List[str], repeat: int) -> Dict[str, Any]:
+    """Best of ``repeat`` fresh-interpreter runs of ``raster-builder <argv>``."""
+    runs = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(argv=argv, heavy=HEAVY_MODULES)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run["seconds"])
+    return {**best, "command": argv[0], "seconds": round(best["seconds"], 4)}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget", type=float, default=0.5, help="Seconds allowed per command")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command (best counts)")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="raster-builder-import-") as tmp:
+        config = _config(Path(tmp))
+        for command in (["list"], ["validate", str(config)]):
+            result = probe(command, args.repeat)
+            problems = []
+            if result["seconds"] > args.budget:
+                problems.append(f"over budget ({args.budget}s)")
+            if result["heavy"]:
+                problems.append(f"imported {', '.join(result['heavy'])}")
+            failures += bool(problems)
+            status = "; ".join(problems) or "ok"
+            print(f"{result['command']:<10} {result['seconds']:.3f}s  {status}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""End-to-end pipeline benchmark against the simulated Earth Engine backend.
+
+Runs ``run_pipeline`` over synthetic GlobFire indexes of several sizes, each in a
+fresh process so peak memory is per size, and records wall time, request counts
+and peak RSS. With ``--baseline`` the results are compared against an earlier
+``--output`` file and the exit status is 1 when any metric regressed by more than
+``--tolerance``::
+
+    python benchmarks/bench_pipeline.py --sizes 10 100 --output bench.json
+    python benchmarks/bench_pipeline.py --sizes 10 100 --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+# Metrics compared against a baseline; larger is worse for all of them.
+GUARDED_METRICS = ("wall_seconds", "peak_rss_mb", "requests")
+
+
+def _write_config(root: Path, args: argparse.Namespace) -> Path:
+    import yaml
+
+    service_account = root / "service_account.json"
+    service_account.write_text(
+        json.dumps({"client_email": "bench@example.com", "project_id": "bench"}),
+        encoding="utf-8",
+    )
+    earthengine = [
+        {
+            "dataset": name,
+            "options": {
+                "resolution": args.resolution,
+                "buffer_m": args.buffer_m,
+                "output_format": args.output_format,
+            },
+        }
+        for name in args.datasets
+    ]
+    config = {
+        "credentials": {"earthengine_service_account": str(service_account)},
+        "paths": {"raw_data": str(root / "raw"), "processed_data": str(root / "processed")},
+        "schema": {
+            "index": {
+                "name": "globfire",
+                "options": {"start_date": args.start, "end_date": args.end, "min_size": 0},
+            },
+            "earthengine": earthengine,
+        },
+        "execution": {
+            "max_concurrency": args.concurrency,
+            "backoff_base": 0.05,
+            "backoff_max": 1.0,
+            "max_retries": 10,
+        },
+    }
+    path = root / "pipeline.yml"
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    return path
+
+
+def run_one(size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the pipeline once in this process; ``ee`` must not be imported yet."""
+    sys.path.insert(0, str(HERE))
+    from fake_ee import FakeEarthEngine
+
+    backend = FakeEarthEngine(
+        fires=size,
+        start=args.start,
+        end=args.end,
+        seed=args.seed,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        max_concurrent=args.max_concurrent,
+    )
+    backend.install()
+
+    from raster_builder.pipeline import run_pipeline
+
+    with tempfile.TemporaryDirectory(prefix="raster-builder-bench-") as tmp:
+        config_path = _write_config(Path(tmp), args)
+        started = time.perf_counter()
+        context = run_pipeline(config_path, force=True)
+        wall = time.perf_counter() - started
+        index_rows = 0 if context.index_data is None else len(context.index_data)
+    stats = backend.stats.to_dict()
+    return {
+        "fires": size,
+        "index_rows": index_rows,
+        "wall_seconds": round(wall, 3),
+        "requests": stats["total_requests"],
+        "requests_by_kind": stats["requests"],
+        "errors": stats["errors"],
+        "bytes": stats["bytes"],
+        "peak_in_flight": stats["peak_in_flight"],
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _run_child(size: int, argv: List[str]) -> Dict[str, Any]:
+    command = [sys.executable, str(Path(__file__).resolve()), *argv, "--child", str(size)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)  # the child's traceback and log
+        completed.check_returncode()
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """Describe every guarded metric that grew by more than ``tolerance`` over baseline."""
+    previous = {entry["fires"]: entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get(entry["fires"])
+        if before is None:
+            continue
+        for metric in GUARDED_METRICS:
+            old, new = before.get(metric), entry.get(metric)
+            if old and new is not None and new > old * (1 + tolerance):
+                regressions.append(
+                    f"{entry['fires']} fires: {metric} {old} -> {new} (+{new / old - 1:.0%})"
+                )
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--datasets",
+        nargs="*",
+        default=["firepred_daily"],
+        help="Earth Engine datasets to run after the index (none: index only)",
+    )
+    parser.add_argument("--start", default="2020-01-01")
+    parser.add_argument("--end", default="2020-12-31")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Extra random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Quota error probability")
+    parser.add_argument(
+        "--max-concurrent", type=int, default=40, help="Requests in flight before quota errors"
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="execution.max_concurrency")
+    parser.add_argument("--resolution", type=float, default=1000.0)
+    parser.add_argument("--buffer-m", type=float, default=5000.0)
+    parser.add_argument("--output-format", default="geotiff")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    args = build_parser().parse_args(argv)
+    if args.child is not None:
+        print(json.dumps(run_one(args.child, args)))
+        return 0
+
+    child_argv: List[str] = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in ("--output", "--baseline"):
+            skip = True
+        elif not arg.startswith(("--output=", "--baseline=")):
+            child_argv.append(arg)
+    results = []
+    for size in args.sizes:
+        result = _run_child(size, child_argv)
+        results.append(result)
+        print(
+            f"{size:>6} fires: {result['wall_seconds']:8.2f}s  "
+            f"{result['requests']:>7} requests  {result['errors']:>5} errors  "
+            f"{result['peak_rss_mb']:8.1f} MiB peak"
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,504 @@
+"""Simulated Earth Engine backend for benchmarks.
+
+:class:`FakeEarthEngine` builds a module that stands in for ``ee``: GlobFire
+final and daily perimeter tables are generated for a synthetic set of fires, the
+FeatureCollection operations used by ``datasets/index.py`` (``filterBounds``,
+``filter``, ``map``, ``select``, ``size``, ``toList``, ``serialize``) are evaluated
+locally, ``ee.data.getAsset`` reports a settable ``asset_version``, and
+``ee.data.computePixels`` returns random arrays of the requested grid. Image
+expressions are recorded but never evaluated. Every request sleeps for a
+configurable latency plus its transfer time, fails with a quota error at a
+configurable rate or when too many requests are in flight, and is counted.
+
+Install it before anything imports ``raster_builder``::
+
+    backend = FakeEarthEngine(fires=100)
+    backend.install()
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import random
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+FINAL_PERIMETERS = "JRC/GWIS/GlobFire/v2/FinalPerimeters"
+DAILY_PREFIX = "JRC/GWIS/GlobFire/v2/DailyPerimeters/"
+METERS_PER_DEGREE = 111_320.0
+# Lon/lat box of the contiguous United States, where synthetic fires are placed.
+BOUNDS = (-124.0, 31.0, -103.0, 49.0)
+FEATURE_BYTES = 600  # rough size of one GeoJSON perimeter in a getInfo response
+
+
+class EEException(Exception):
+    """Error type of the fake backend, mirroring ``ee.EEException``."""
+
+
+@dataclass
+class BackendStats:
+    """Requests served by the fake backend."""
+
+    requests: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+    bytes: int = 0
+    peak_in_flight: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "total_requests": sum(self.requests.values()),
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+def _millis(value: datetime) -> int:
+    return int(value.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _square(lon: float, lat: float, radius_m: float) -> Dict[str, Any]:
+    d_lat = radius_m / METERS_PER_DEGREE
+    d_lon = radius_m / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+    ring = [
+        [lon - d_lon, lat - d_lat],
+        [lon + d_lon, lat - d_lat],
+        [lon + d_lon, lat + d_lat],
+        [lon - d_lon, lat + d_lat],
+        [lon - d_lon, lat - d_lat],
+    ]
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+# --- Feature evaluation -----------------------------------------------------------
+
+
+class _Value:
+    """A concrete value reached through chained calls inside ``map`` functions."""
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def get(self, index: int) -> "_Value":
+        return _Value(self.value[index])
+
+
+class _Geometry:
+    def __init__(self, geojson: Dict[str, Any]) -> None:
+        self.geojson = geojson
+
+    def _ring(self) -> List[List[float]]:
+        return self.geojson["coordinates"][0]
+
+    def centroid(self, *args: Any, **kwargs: Any) -> "_Geometry":
+        ring = self._ring()[:-1]
+        lon = sum(point[0] for point in ring) / len(ring)
+        lat = sum(point[1] for point in ring) / len(ring)
+        return _Geometry({"type": "Point", "coordinates": [lon, lat]})
+
+    def coordinates(self) -> _Value:
+        return _Value(self.geojson["coordinates"])
+
+    def bounds(self) -> tuple:
+        if self.geojson["type"] == "Polygon":
+            points = self._ring()
+        else:
+            points = [self.geojson["coordinates"]]
+        lons = [point[0] for point in points]
+        lats = [point[1] for point in points]
+        return (min(lons), min(lats), max(lons), max(lats))
+
+    def area(self, *args: Any, **kwargs: Any) -> float:
+        min_lon, min_lat, max_lon, max_lat = self.bounds()
+        scale = METERS_PER_DEGREE**2 * math.cos(math.radians((min_lat + max_lat) / 2))
+        return (max_lon - min_lon) * (max_lat - min_lat) * scale
+
+
+class _Feature:
+    def __init__(self, properties: Dict[str, Any], geometry: Optional[Dict[str, Any]]) -> None:
+        self.properties = properties
+        self._geometry = geometry
+
+    def geometry(self) -> _Geometry:
+        return _Geometry(self._geometry)
+
+    def area(self, *args: Any, **kwargs: Any) -> float:
+        return self.geometry().area()
+
+    def get(self, name: str) -> Any:
+        return self.properties.get(name)
+
+    def set(self, values: Dict[str, Any], *args: Any) -> "_Feature":
+        properties = dict(self.properties)
+        for key, value in values.items():
+            properties[key] = value.value if isinstance(value, _Value) else value
+        return _Feature(properties, self._geometry)
+
+    def to_geojson(self) -> Dict[str, Any]:
+        return {"type": "Feature", "geometry": self._geometry, "properties": self.properties}
+
+
+class Filter:
+    """Property predicates (``ee.Filter``) evaluated against fake features."""
+
+    def __init__(self, predicate: Callable[[Dict[str, Any]], bool], spec: Any) -> None:
+        self.predicate = predicate
+        self.spec = spec
+
+    @staticmethod
+    def _compare(name: str, value: Any, test: Callable[[Any, Any], bool], op: str) -> "Filter":
+        def predicate(properties: Dict[str, Any]) -> bool:
+            current = properties.get(name)
+            return current is not None and test(current, value)
+
+        return Filter(predicate, [op, name, value])
+
+    @staticmethod
+    def eq(name: str, value: Any) -> "Filter":
+        return Filter._compare(name, value, lambda a, b: a == b, "eq")
+
+    @staticmethod
+    def gte(name: str, value: Any) -> "Filter":
+        return Filter._compare(name, value, lambda a, b: a >= b, "gte")
+
+    @staticmethod
+    def gt(name: str, value: Any) -> "Filter":
+        return Filter._compare(name, value, lambda a, b: a > b, "gt")
+
+    @staticmethod
+    def lt(name: str, value: Any) -> "Filter":
+        return Filter._compare(name, value, lambda a, b: a < b, "lt")
+
+    @staticmethod
+    def lte(name: str, value: Any) -> "Filter":
+        return Filter._compare(name, value, lambda a, b: a <= b, "lte")
+
+    @staticmethod
+    def inList(name: str, values: Sequence[Any]) -> "Filter":  # noqa: N802 - ee naming
+        wanted = set(values)
+        return Filter(
+            lambda properties: properties.get(name) in wanted,
+            ["inList", name, sorted(wanted, key=str)],
+        )
+
+    @staticmethod
+    def rangeContains(name: str, low: Any, high: Any) -> "Filter":  # noqa: N802
+        return Filter._compare(name, (low, high), lambda a, b: b[0] <= a <= b[1], "range")
+
+
+# --- Lazy expressions ---------------------------------------------------------------
+
+
+class _Expression:
+    """Any unevaluated image/date/collection expression; every call chains another."""
+
+    def __init__(self, name: str, args: Sequence[Any] = ()) -> None:
+        self._name = name
+        self._args = tuple(args)
+
+    def __getattr__(self, name: str) -> Callable[..., "_Expression"]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: _Expression(f"{self._name}.{name}", args)
+
+    def __repr__(self) -> str:
+        return f"<fake ee {self._name}>"
+
+
+class _Namespace:
+    """``ee.Image``-style callables whose attributes also build expressions."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __call__(self, *args: Any, **kwargs: Any) -> _Expression:
+        return _Expression(self._name, args)
+
+    def __getattr__(self, name: str) -> Callable[..., _Expression]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: _Expression(f"{self._name}.{name}", args)
+
+
+class _Computed:
+    """A value computed by the backend when ``getInfo`` is called."""
+
+    def __init__(self, backend: "FakeEarthEngine", kind: str, compute: Callable[[], Any]) -> None:
+        self._backend = backend
+        self._kind = kind
+        self._compute = compute
+
+    def getInfo(self) -> Any:  # noqa: N802 - ee naming
+        return self._backend.request(self._kind, self._compute)
+
+
+class FeatureCollection:
+    """Lazily filtered view over one of the backend's synthetic tables."""
+
+    def __init__(
+        self,
+        backend: "FakeEarthEngine",
+        asset: Any,
+        ops: Sequence[Callable[[List[_Feature]], List[_Feature]]] = (),
+        specs: Sequence[Any] = (),
+    ) -> None:
+        self._backend = backend
+        self._asset = asset
+        self._ops = tuple(ops)
+        self._specs = tuple(specs)
+
+    def _then(
+        self, op: Callable[[List[_Feature]], List[_Feature]], spec: Any
+    ) -> "FeatureCollection":
+        return FeatureCollection(
+            self._backend, self._asset, (*self._ops, op), (*self._specs, spec)
+        )
+
+    def serialize(self) -> str:
+        """JSON description of the asset and operations, like ``ee`` expression graphs."""
+        return json.dumps({"asset": self._asset, "ops": self._specs}, default=str)
+
+    def _evaluate(self) -> List[_Feature]:
+        features = self._backend.table(self._asset)
+        for op in self._ops:
+            features = op(features)
+        return features
+
+    def filter(self, condition: Filter) -> "FeatureCollection":
+        return self._then(
+            lambda features: [f for f in features if condition.predicate(f.properties)],
+            ["filter", condition.spec],
+        )
+
+    def filterBounds(self, region: Any) -> "FeatureCollection":  # noqa: N802
+        if not isinstance(region, _Geometry):
+            return self  # expression regions (e.g. the CONUS polygon) contain every fire
+        min_x, min_y, max_x, max_y = region.bounds()
+
+        def within(feature: _Feature) -> bool:
+            x0, y0, x1, y1 = feature.geometry().bounds()
+            return x0 <= max_x and x1 >= min_x and y0 <= max_y and y1 >= min_y
+
+        return self._then(
+            lambda features: [f for f in features if within(f)],
+            ["filterBounds", [min_x, min_y, max_x, max_y]],
+        )
+
+    def filterDate(self, start: Any, end: Any) -> "FeatureCollection":  # noqa: N802
+        return self  # only used on painted feature sources, which are never evaluated
+
+    def map(self, func: Callable[[_Feature], _Feature]) -> "FeatureCollection":
+        code = func.__code__
+        return self._then(
+            lambda features: [func(feature) for feature in features],
+            ["map", code.co_filename, code.co_firstlineno],
+        )
+
+    def select(
+        self,
+        properties: Sequence[str],
+        new_properties: Optional[Sequence[str]] = None,
+        retain_geometry: bool = True,
+    ) -> "FeatureCollection":
+        names = list(properties)
+
+        def project(features: List[_Feature]) -> List[_Feature]:
+            return [
+                _Feature(
+                    {name: f.properties.get(name) for name in names},
+                    f._geometry if retain_geometry else None,
+                )
+                for f in features
+            ]
+
+        return self._then(project, ["select", names, retain_geometry])
+
+    def size(self) -> _Computed:
+        return _Computed(self._backend, "size", lambda: len(self._evaluate()))
+
+    def toList(self, count: int, offset: int = 0) -> _Computed:  # noqa: N802
+        def page() -> List[Dict[str, Any]]:
+            features = self._evaluate()[offset : offset + count]
+            return [feature.to_geojson() for feature in features]
+
+        return _Computed(self._backend, "toList", page)
+
+    def getInfo(self) -> Dict[str, Any]:  # noqa: N802
+        return self._backend.request(
+            "getInfo",
+            lambda: {
+                "type": "FeatureCollection",
+                "features": [feature.to_geojson() for feature in self._evaluate()],
+            },
+        )
+
+
+# --- Backend --------------------------------------------------------------------------
+
+
+class FakeEarthEngine:
+    """Synthetic GlobFire tables and a latency/quota model behind a fake ``ee`` module.
+
+    ``latency`` seconds (plus up to ``jitter`` more) elapse per request, and payloads
+    transfer at ``bytes_per_second``. A request fails with a quota error with
+    probability ``error_rate``, or whenever more than ``max_concurrent`` are in flight.
+    """
+
+    def __init__(
+        self,
+        fires: int = 100,
+        *,
+        start: str = "2020-01-01",
+        end: str = "2020-12-31",
+        seed: int = 0,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        bytes_per_second: float = 50 * 1024**2,
+        error_rate: float = 0.0,
+        max_concurrent: Optional[int] = 40,
+        max_days: int = 14,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.fires = fires
+        self.latency = latency
+        self.jitter = jitter
+        self.bytes_per_second = bytes_per_second
+        self.error_rate = error_rate
+        self.max_concurrent = max_concurrent
+        self.stats = BackendStats()
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._tables: Dict[str, List[_Feature]] = {}
+        self.asset_version = "2020-01-01T00:00:00Z"
+        self._final, self._daily = self._generate(fires, start, end, seed, max_days)
+
+    @staticmethod
+    def _generate(count: int, start: str, end: str, seed: int, max_days: int) -> tuple:
+        rng = np.random.default_rng(seed)
+        first = datetime.fromisoformat(start)
+        span = max(1, (datetime.fromisoformat(end) - first).days)
+        min_lon, min_lat, max_lon, max_lat = BOUNDS
+        final: List[_Feature] = []
+        daily: Dict[int, List[_Feature]] = {}
+        for fire_id in range(1, count + 1):
+            lon = float(rng.uniform(min_lon, max_lon))
+            lat = float(rng.uniform(min_lat, max_lat))
+            ignition = first + timedelta(days=int(rng.integers(0, span)))
+            days = int(rng.integers(1, max_days + 1))
+            radius = float(rng.uniform(2_000, 8_000))
+            final.append(
+                _Feature(
+                    {
+                        "Id": fire_id,
+                        "IDate": _millis(ignition),
+                        "FDate": _millis(ignition + timedelta(days=days - 1)),
+                    },
+                    _square(lon, lat, radius),
+                )
+            )
+            for day in range(days):
+                when = ignition + timedelta(days=day)
+                grown = radius * (day + 1) / days
+                daily.setdefault(when.year, []).append(
+                    _Feature({"Id": fire_id, "IDate": _millis(when)}, _square(lon, lat, grown))
+                )
+        return final, daily
+
+    def table(self, asset: Any) -> List[_Feature]:
+        if asset == FINAL_PERIMETERS:
+            return self._final
+        if isinstance(asset, str) and asset.startswith(DAILY_PREFIX):
+            return self._daily.get(int(asset[len(DAILY_PREFIX) :]), [])
+        return []
+
+    def request(self, kind: str, compute: Callable[[], Any], payload: Optional[int] = None) -> Any:
+        """Serve one request: enforce the quota model, compute, then wait out its latency."""
+        with self._lock:
+            self._in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self._in_flight)
+            self.stats.requests[kind] = self.stats.requests.get(kind, 0) + 1
+            overloaded = self.max_concurrent is not None and self._in_flight > self.max_concurrent
+            failed = overloaded or self._rng.random() < self.error_rate
+            delay = self.latency + self._rng.random() * self.jitter
+        try:
+            if failed:
+                self._sleep(delay / 2)
+                with self._lock:
+                    self.stats.errors += 1
+                raise EEException("Too many concurrent aggregations.")
+            result = compute()
+            if payload is None:
+                payload = _payload_bytes(result)
+            self._sleep(delay + payload / self.bytes_per_second)
+            with self._lock:
+                self.stats.bytes += payload
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get_asset(self, asset_id: str) -> Dict[str, Any]:
+        """``ee.data.getAsset``: metadata whose ``updateTime`` is :attr:`asset_version`."""
+        return self.request("getAsset", lambda: {"id": asset_id, "updateTime": self.asset_version})
+
+    def compute_pixels(self, request: Dict[str, Any]) -> np.ndarray:
+        """``ee.data.computePixels``: a structured array with one float32 field per band."""
+        dimensions = request["grid"]["dimensions"]
+        shape = (int(dimensions["height"]), int(dimensions["width"]))
+        bands = list(request.get("bandIds") or ["b1"])
+        dtype = np.dtype([(band, np.float32) for band in bands])
+
+        def compute() -> np.ndarray:
+            data = np.empty(shape, dtype=dtype)
+            for band in bands:
+                data[band] = np.random.default_rng().random(shape, dtype=np.float32)
+            return data
+
+        return self.request("computePixels", compute, payload=dtype.itemsize * shape[0] * shape[1])
+
+    def module(self) -> types.ModuleType:
+        """A module exposing the ``ee`` API surface the pipeline uses."""
+        backend = self
+        ee = types.ModuleType("ee")
+        ee.EEException = EEException
+        ee.Filter = Filter
+        ee.Initialize = lambda *args, **kwargs: None
+        ee.ServiceAccountCredentials = lambda *args, **kwargs: object()
+        ee.FeatureCollection = lambda asset, *args: (
+            asset if isinstance(asset, FeatureCollection) else FeatureCollection(backend, asset)
+        )
+        geometry = _Namespace("Geometry")
+        ee.Geometry = geometry
+        for name in ("Image", "ImageCollection", "Date", "Algorithms", "Terrain", "Reducer"):
+            setattr(ee, name, _Namespace(name))
+        ee.data = types.SimpleNamespace(
+            computePixels=backend.compute_pixels, getAsset=backend.get_asset
+        )
+        ee.fake_backend = backend
+        return ee
+
+    def install(self) -> types.ModuleType:
+        """Register the fake as ``ee`` in ``sys.modules`` and return it."""
+        module = self.module()
+        sys.modules["ee"] = module
+        return module
+
+
+def _payload_bytes(result: Any) -> int:
+    if isinstance(result, list):
+        return FEATURE_BYTES * len(result)
+    if isinstance(result, dict) and "features" in result:
+        return FEATURE_BYTES * len(result["features"])
+    return len(json.dumps(result, default=str))
+
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 import yaml
 
@@ -13,11 +15,15 @@ __all__ = [
     "CredentialsConfig",
     "PathsConfig",
     "DatasetEntry",
+    "ExecutionConfig",
     "SchemaConfig",
     "PipelineConfig",
     "load_config",
 ]
 
+# Dataset options that only tune how a dataset runs, never what it produces.
+EXECUTION_OPTIONS = frozenset({"workers", "parallelism", "processes"})
+
 
 class ConfigError(RuntimeError):
     """Raised when the user supplied configuration is invalid."""
@@ -63,14 +69,83 @@ class PathsConfig:
         return self
 
 
+@dataclass
+class ExecutionConfig:
+    """Concurrency and retry settings shared by remote requests."""
+
+    max_concurrency: int = 8
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    stage_workers: Dict[str, int] = field(default_factory=dict)
+    default_stage_workers: int = 4
+    prometheus_textfile: bool = False
+    cache_size_mb: int = 2048
+    request_cache: bool = False
+    request_cache_size_mb: int = 256
+    request_cache_ttl_hours: Optional[float] = 168.0
+
+    def workers_for(self, stage: str) -> int:
+        """Number of datasets of ``stage`` that may run at the same time."""
+        return self.stage_workers.get(stage, self.default_stage_workers)
+
+    @staticmethod
+    def from_mapping(data: Mapping[str, Any]) -> "ExecutionConfig":
+        stage_workers = data.get("stage_workers") or {}
+        if not isinstance(stage_workers, Mapping):
+            raise ConfigError("execution.stage_workers must map stage names to worker counts")
+        ttl_hours = data.get("request_cache_ttl_hours", 168.0)
+        config = ExecutionConfig(
+            max_concurrency=int(data.get("max_concurrency", 8)),
+            max_retries=int(data.get("max_retries", 5)),
+            backoff_base=float(data.get("backoff_base", 1.0)),
+            backoff_max=float(data.get("backoff_max", 60.0)),
+            stage_workers={str(stage): int(count) for stage, count in stage_workers.items()},
+            default_stage_workers=int(data.get("default_stage_workers", 4)),
+            prometheus_textfile=bool(data.get("prometheus_textfile", False)),
+            cache_size_mb=int(data.get("cache_size_mb", 2048)),
+            request_cache=bool(data.get("request_cache", False)),
+            request_cache_size_mb=int(data.get("request_cache_size_mb", 256)),
+            request_cache_ttl_hours=None if ttl_hours is None else float(ttl_hours),
+        )
+        if any(count <= 0 for count in config.stage_workers.values()) or (
+            config.default_stage_workers <= 0
+        ):
+            raise ConfigError("execution stage worker counts must be positive integers")
+        if config.max_concurrency <= 0:
+            raise ConfigError("execution.max_concurrency must be a positive integer")
+        if config.cache_size_mb < 0:
+            raise ConfigError("execution.cache_size_mb must not be negative")
+        if config.request_cache_size_mb < 0:
+            raise ConfigError("execution.request_cache_size_mb must not be negative")
+        if config.request_cache_ttl_hours is not None and config.request_cache_ttl_hours < 0:
+            raise ConfigError("execution.request_cache_ttl_hours must not be negative")
+        if config.max_retries < 0:
+            raise ConfigError("execution.max_retries must not be negative")
+        if config.backoff_base < 0 or config.backoff_max < 0:
+            raise ConfigError("execution backoff values must not be negative")
+        return config
+
+
 @dataclass
 class DatasetEntry:
-    """Represents one dataset declaration inside the schema."""
+    """Represents one dataset declaration inside the schema.
+
+    ``dataset`` is the registered dataset the entry runs when it is declared under a
+    different ``name`` (e.g. two ``granules`` entries for different collections).
+    """
 
     name: str
     source: str
     options: Dict[str, Any] = field(default_factory=dict)
     function: Optional[str] = None
+    depends_on: List[str] = field(default_factory=list)
+    dataset: Optional[str] = None
+
+    @property
+    def registered_name(self) -> str:
+        """Name of the registered dataset this entry runs."""
+        return self.dataset or self.name
 
     @staticmethod
     def from_mapping(
@@ -79,7 +154,11 @@ class DatasetEntry:
         default_source: str,
         required_name: bool = True,
     ) -> "DatasetEntry":
-        if "dataset" in data:
+        dataset = None
+        if "dataset" in data and "name" in data:
+            name = str(data["name"])
+            dataset = str(data["dataset"])
+        elif "dataset" in data:
             name = str(data["dataset"])
         elif required_name and "name" in data:
             name = str(data["name"])
@@ -93,7 +172,46 @@ class DatasetEntry:
         function = data.get("function")
         if function is not None:
             function = str(function)
-        return DatasetEntry(name=name, source=source, options=options, function=function)
+        depends_on = data.get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        return DatasetEntry(
+            name=name,
+            source=source,
+            options=options,
+            function=function,
+            depends_on=[str(dependency) for dependency in depends_on],
+            dataset=dataset,
+        )
+
+    def fingerprint(
+        self,
+        function_path: str,
+        upstream: Optional[str] = None,
+        dependencies: Optional[Mapping[str, str]] = None,
+    ) -> str:
+        """Return a stable digest of everything that determines this dataset's output.
+
+        Execution-only options (:data:`EXECUTION_OPTIONS`) are left out, so retuning
+        concurrency keeps completed outputs and their journals valid. ``dependencies``
+        maps the ``depends_on`` datasets to their fingerprints, so a dataset is rebuilt
+        whenever one of its inputs is.
+        """
+        payload: Dict[str, Any] = {
+            "source": self.source,
+            "name": self.name,
+            "options": {
+                key: value for key, value in self.options.items() if key not in EXECUTION_OPTIONS
+            },
+            "function": function_path,
+            "upstream": upstream,
+        }
+        if self.dataset is not None:
+            payload["dataset"] = self.dataset
+        if dependencies:
+            payload["dependencies"] = dict(dependencies)
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
 
 
 @dataclass
@@ -105,6 +223,40 @@ class SchemaConfig:
     earthaccess: List[DatasetEntry] = field(default_factory=list)
     custom: List[DatasetEntry] = field(default_factory=list)
 
+    def stages(self) -> List[Tuple[str, List[DatasetEntry]]]:
+        """Return the downstream stages in execution order."""
+        return [
+            ("earthengine", self.earthengine),
+            ("earthaccess", self.earthaccess),
+            ("custom", self.custom),
+        ]
+
+    def validate_dependencies(self) -> None:
+        """Check that ``depends_on`` only names datasets of the same or an earlier stage.
+
+        Dependencies and failures are tracked by name, so names must be unique across
+        all stages, the index included.
+        """
+        stages: Dict[str, str] = {self.index.name: "index"}
+        for stage, entries in self.stages():
+            for entry in entries:
+                if entry.name in stages:
+                    raise ConfigError(
+                        f"Dataset '{entry.name}' is declared in stage '{stages[entry.name]}' "
+                        f"and again in stage '{stage}'; dataset names must be unique"
+                    )
+                stages[entry.name] = stage
+        available = {self.index.name}
+        for stage, entries in self.stages():
+            available.update(entry.name for entry in entries)
+            for entry in entries:
+                unknown = [name for name in entry.depends_on if name not in available]
+                if unknown:
+                    raise ConfigError(
+                        f"Dataset '{entry.name}' depends on unknown or later datasets: "
+                        f"{', '.join(unknown)}"
+                    )
+
 
 @dataclass
 class PipelineConfig:
@@ -114,6 +266,7 @@ class PipelineConfig:
     paths: PathsConfig
     schema: SchemaConfig
     config_path: Path
+    execution: ExecutionConfig = field(default_factory=ExecutionConfig)
 
 
 class PathResolver:
@@ -234,10 +387,17 @@ def load_config(path: Path) -> PipelineConfig:
         earthaccess=earthaccess_entries,
         custom=custom_entries,
     )
+    schema.validate_dependencies()
+
+    execution_section = data.get("execution") or {}
+    if not isinstance(execution_section, Mapping):
+        raise ConfigError("Configuration section 'execution' must be a mapping")
+    execution = ExecutionConfig.from_mapping(execution_section)
 
     return PipelineConfig(
         credentials=credentials,
         paths=paths,
         schema=schema,
         config_path=path,
+        execution=execution,
     )
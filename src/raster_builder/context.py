@@ -2,11 +2,22 @@
 
 from __future__ import annotations
 
+import threading
+from contextlib import AbstractContextManager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 from .config import PipelineConfig
+from .io.executor import RequestExecutor
+from .io.journal import RunJournal
+from .metrics import RunMetrics
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .io.memo import RequestCache
+    from .io.shared import SharedTable, SharedTableHandle
+    from .regions import FireRegionIndex
+    from .shards import ShardSpec
 
 __all__ = ["PipelineContext"]
 
@@ -20,6 +31,16 @@ class PipelineContext:
     artifacts: Dict[str, Any] = field(default_factory=dict)
     earth_engine_project: Optional[str] = None
     earthaccess_session: Optional[Any] = None
+    force: bool = False
+    fingerprints: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    metrics: RunMetrics = field(default_factory=RunMetrics)
+    shard: Optional["ShardSpec"] = None
+    _executor: Optional[RequestExecutor] = field(default=None, init=False, repr=False)
+    _journal: Optional[RunJournal] = field(default=None, init=False, repr=False)
+    _region_indexes: Dict[Tuple[Any, ...], Any] = field(default_factory=dict, init=False, repr=False)
+    _shared_index: Optional["SharedTable"] = field(default=None, init=False, repr=False)
+    _request_cache: Optional["RequestCache"] = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     @property
     def raw_path(self) -> Path:
@@ -43,9 +64,105 @@ class PipelineContext:
             creds["earthaccess_netrc"] = self.config.credentials.earthaccess_netrc
         return creds
 
+    @property
+    def executor(self) -> RequestExecutor:
+        """Shared request executor; datasets submit Earth Engine calls to it as futures."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = RequestExecutor.from_config(
+                    self.config.execution,
+                    metrics=self.metrics,
+                )
+            return self._executor
+
+    @property
+    def request_cache(self) -> Optional["RequestCache"]:
+        """Persistent cache of Earth Engine results, if ``execution.request_cache`` is on."""
+        execution = self.config.execution
+        if not execution.request_cache:
+            return None
+        from .io.memo import RequestCache
+
+        with self._lock:
+            if self._request_cache is None:
+                ttl_hours = execution.request_cache_ttl_hours
+                self._request_cache = RequestCache(
+                    self.scratch_path / "requests",
+                    max_bytes=execution.request_cache_size_mb * 1024**2,
+                    ttl_seconds=None if ttl_hours is None else ttl_hours * 3600,
+                    metrics=self.metrics,
+                )
+            return self._request_cache
+
+    @property
+    def journal(self) -> RunJournal:
+        """Run journal under the scratch directory recording per-unit progress (per shard)."""
+        with self._lock:
+            if self._journal is None:
+                suffix = "" if self.shard is None else f"-{self.shard.label}"
+                name = f"journal{suffix}.sqlite"
+                self._journal = RunJournal(self.scratch_path / name)
+            return self._journal
+
+    def region_index(
+        self,
+        *,
+        crs: Optional[str] = None,
+        buffer_days: int = 0,
+        buffer_m: Optional[float] = None,
+    ) -> "FireRegionIndex":
+        """Spatial index over the index's buffered fire boxes, built once per settings.
+
+        Downstream stages can ask which fires touch a tile on a day with
+        ``context.region_index().query(bbox, day)``.
+        """
+        from .regions import FireRegionIndex  # regions imports workunits, which imports us
+
+        key = (crs, buffer_days, buffer_m)
+        with self._lock:
+            if key not in self._region_indexes:
+                self._region_indexes[key] = FireRegionIndex.from_index(
+                    self.index_data, crs=crs, buffer_days=buffer_days, buffer_m=buffer_m
+                )
+            return self._region_indexes[key]
+
+    def shared_index(self) -> "SharedTableHandle":
+        """Handle to the index as an Arrow table in shared memory, published once per index.
+
+        Process pools send workers this handle plus row ranges instead of rows; see
+        :class:`~raster_builder.io.shared.SharedTable`.
+        """
+        from .io.shared import SharedTable, index_table
+
+        with self._lock:
+            if self._shared_index is None:
+                self._shared_index = SharedTable(index_table(self.index_data))
+            return self._shared_index.handle
+
+    def span(self, name: str, **labels: Any) -> AbstractContextManager[None]:
+        """Time a block of dataset work; it appears in the run report under ``name``."""
+        return self.metrics.span(name, **labels)
+
+    def close(self) -> None:
+        """Release pooled resources held by the context."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        self._release_shared_index()
+
+    def _release_shared_index(self) -> None:
+        if self._shared_index is not None:
+            self._shared_index.close()
+            self._shared_index = None
+
     def set_index(self, data: Any, **metadata: Any) -> None:
         """Store the index dataset result and optional metadata."""
         self.index_data = data
+        self._region_indexes.clear()
+        self._release_shared_index()
         if metadata:
             self.artifacts.setdefault("index", {}).update(metadata)
 
@@ -2,27 +2,58 @@
 
 from __future__ import annotations
 
-from importlib import import_module
-from typing import Callable, Optional
+import logging
 
-from .registry import DatasetCallable, DatasetRegistry, register_dataset, registry
+from .batch import batch_dataset
+from .registry import DatasetCallable, DatasetRegistry, DatasetSpec, register_dataset, registry
 
 __all__ = [
+    "batch_dataset",
     "DatasetCallable",
     "DatasetRegistry",
+    "DatasetSpec",
     "registry",
     "register_dataset",
     "load_builtin_datasets",
 ]
 
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "raster_builder.datasets"
+
+BUILTIN_DATASETS = [
+    DatasetSpec(source="index", name="globfire", module="raster_builder.datasets.index"),
+    DatasetSpec(
+        source="earthengine", name="composite", module="raster_builder.datasets.composite"
+    ),
+    DatasetSpec(
+        source="earthengine", name="firepred_daily", module="raster_builder.datasets.earthengine"
+    ),
+    DatasetSpec(
+        source="earthaccess", name="granules", module="raster_builder.datasets.earthaccess"
+    ),
+]
+
+
+def _entry_point_datasets() -> list[DatasetSpec]:
+    """Datasets other packages declare as ``<source>.<name> = <module>`` entry points."""
+    from importlib.metadata import entry_points
+
+    specs = []
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        source, _, name = entry_point.name.partition(".")
+        if not name:
+            logger.warning(
+                "Ignoring dataset entry point '%s' (expected '<source>.<name>')",
+                entry_point.name,
+            )
+            continue
+        module = entry_point.value.split(":", 1)[0].strip()
+        specs.append(DatasetSpec(source=source, name=name, module=module))
+    return specs
+
 
 def load_builtin_datasets() -> None:
-    """Ensure built-in dataset modules are imported so their registrations run."""
-    modules = [
-        "raster_builder.datasets.index",
-        "raster_builder.datasets.earthengine",
-        "raster_builder.datasets.earthaccess",
-        "raster_builder.datasets.custom",
-    ]
-    for module in modules:
-        import_module(module)
+    """Declare built-in and entry point datasets; their modules load on first use."""
+    for spec in [*BUILTIN_DATASETS, *_entry_point_datasets()]:
+        registry.declare(source=spec.source, name=spec.name, module=spec.module)
@@ -0,0 +1,179 @@
+"""Batch protocol for custom datasets: index rows streamed as Arrow record batches."""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Deque, Mapping, Optional, Union
+
+from ..config import ConfigError
+from .custom import resolve_custom_callable
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pyarrow as pa
+
+    from ..context import PipelineContext
+    from ..io.shared import SharedTableHandle
+
+__all__ = ["BatchDataset", "batch_dataset"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+BatchFunction = Callable[["pa.RecordBatch", Mapping[str, Any]], Any]
+
+
+def _run_batch(
+    path: str,
+    rows: Union["pa.Table", "SharedTableHandle"],
+    offset: int,
+    length: int,
+    options: Mapping[str, Any],
+) -> Any:
+    """Worker entry point: resolve the batch function by path and run it on a row range.
+
+    In worker processes ``rows`` is the handle of the shared index, so a task message
+    holds only the range; threads get the table itself.
+    """
+    from ..io.shared import to_arrow_table
+
+    target = resolve_custom_callable(path)
+    func = target.func if isinstance(target, BatchDataset) else target
+    table = rows.slice(offset, length)
+    batches = table.to_batches()
+    if len(batches) != 1:  # a range spanning chunks; single-chunk ranges stay zero-copy
+        batches = table.combine_chunks().to_batches()
+    return to_arrow_table(func(batches[0], options))
+
+
+class BatchDataset:
+    """A custom dataset that processes the index in record batches on a pool.
+
+    Calling it with ``(context, options)`` (as the pipeline does) slices
+    ``context.index_data`` into Arrow record batches of ``batch_size`` rows and runs
+    ``func(batch, options)`` for each in ``processes`` worker processes (or threads
+    with ``parallelism: thread``). Worker processes map the index from shared memory
+    (:meth:`PipelineContext.shared_index`) and receive only row ranges. Results
+    (Arrow tables/batches or DataFrames; None to emit nothing) are appended in batch
+    order to ``<processed>/custom/<name>/<name>.parquet`` as they arrive, so at most
+    ``2 * processes`` results are in memory. ``name`` is the config entry's name,
+    which the pipeline passes as ``dataset_name``, and otherwise the decorator's
+    ``name`` or the function name. Workers import ``func`` by its module path, so it
+    must be defined at module level.
+    """
+
+    def __init__(
+        self,
+        func: BatchFunction,
+        *,
+        name: Optional[str] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        processes: Optional[int] = None,
+    ) -> None:
+        self.func = func
+        self.name = name or func.__name__
+        self.batch_size = batch_size
+        self.processes = processes
+        self.path = f"{func.__module__}:{func.__qualname__}"
+        functools.update_wrapper(self, func)
+
+    def __call__(
+        self,
+        context: "PipelineContext",
+        options: Mapping[str, Any],
+        *,
+        dataset_name: Optional[str] = None,
+    ) -> Path:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        from ..io.storage import atomic_output, dataset_output_dir
+        from ..workunits import _make_pool
+
+        name = dataset_name or self.name
+        batch_size = int(options.get("batch_size", self.batch_size))
+        processes = int(options.get("processes") or self.processes or os.cpu_count() or 1)
+        if batch_size <= 0 or processes <= 0:
+            raise ConfigError(f"Batch dataset '{name}' needs positive batch_size/processes")
+        output_dir = dataset_output_dir(context, stage="custom", dataset_name=name)
+        path = output_dir / f"{name}.parquet"
+        mode = str(options.get("parallelism", "process"))
+        if mode == "process":
+            source: Any = context.shared_index()
+            num_rows = len(context.index_data) if context.index_data is not None else 0
+        else:
+            from ..io.shared import index_table
+
+            source = index_table(context.index_data)
+            num_rows = source.num_rows
+        ranges = [
+            (offset, min(batch_size, num_rows - offset))
+            for offset in range(0, num_rows, batch_size)
+        ]
+        worker_options = dict(options)
+        rows = 0
+        writer = None
+        pending: Deque["Future[Any]"] = deque()
+
+        def collect(future: "Future[Any]") -> None:
+            nonlocal rows, writer
+            result = future.result()
+            if result is None or result.num_rows == 0:
+                return
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, result.schema, compression="zstd")
+            elif result.schema != writer.schema:
+                result = result.cast(writer.schema)
+            writer.write_table(result)
+            rows += result.num_rows
+
+        with context.span("batches", dataset=name), atomic_output(path) as tmp_path:
+            try:
+                with _make_pool(mode, processes) as pool:
+                    for offset, length in ranges:
+                        pending.append(
+                            pool.submit(_run_batch, self.path, source, offset, length, worker_options)
+                        )
+                        if len(pending) >= processes * 2:
+                            collect(pending.popleft())
+                    while pending:
+                        collect(pending.popleft())
+            finally:
+                if writer is not None:
+                    writer.close()
+            if writer is None:
+                pq.write_table(pa.table({}), tmp_path)
+        logger.info(
+            "Batch dataset '%s' wrote %d rows from %d batches to %s",
+            name,
+            rows,
+            len(ranges),
+            path,
+        )
+        context.metrics.incr("rows_produced", rows, dataset=name)
+        context.add_artifact(name, {"rows": rows, "batches": len(ranges), "path": str(path)})
+        return path
+
+
+def batch_dataset(
+    func: Optional[BatchFunction] = None,
+    *,
+    name: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    processes: Optional[int] = None,
+) -> Any:
+    """Mark ``func(batch, options)`` as a batch custom dataset (see :class:`BatchDataset`).
+
+    Use as ``@batch_dataset`` or ``@batch_dataset(batch_size=500)`` and reference the
+    function from a ``custom`` entry's ``function``. The entry's ``batch_size``,
+    ``processes`` and ``parallelism`` options override the decorator's defaults.
+    """
+
+    def decorator(target: BatchFunction) -> BatchDataset:
+        return BatchDataset(target, name=name, batch_size=batch_size, processes=processes)
+
+    return decorator(func) if func is not None else decorator
@@ -0,0 +1,478 @@
+"""Composite Earth Engine datasets: several products stacked into one request per fire-day."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from ..config import ConfigError
+from ..io.cache import DEFAULT_CACHE_BYTES, DiskCache, cache_key
+from ..io.pixels import DEFAULT_NODATA, MAX_REQUEST_BYTES, PixelGrid, fetch_into, plan_tiles
+from ..io.storage import raster_writer
+from ..planner import DatasetCost
+from ..workunits import UnitOutput, WorkUnit, option_work_units, register_work_unit_dataset
+
+if TYPE_CHECKING:  # pragma: no cover
+    import ee  # type: ignore
+
+__all__ = [
+    "CompositeSource",
+    "composite_bands",
+    "composite_cost",
+    "composite_image",
+    "fetch_composite",
+    "register_composite_dataset",
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESOLUTION = 375.0
+REDUCERS = ("mean", "median", "min", "max", "sum", "first", "latest")
+RESAMPLING = ("nearest", "bilinear", "bicubic")
+GRANULARITIES = ("static", "yearly", "daily", "hourly")
+
+
+@dataclass(frozen=True)
+class CompositeSource:
+    """One product of a composite: where its bands come from and how they are reduced.
+
+    Exactly one of ``collection`` (``ee.ImageCollection``), ``image`` (``ee.Image``)
+    or ``features`` (``ee.FeatureCollection`` painted as a 0/1 band) is set.
+    Collections are filtered to ``[day - days_before, day + 1)``, optionally to
+    images whose ``day_property`` equals the start of the day (e.g. a forecast's
+    ``creation_time``) and to ``filters`` (``{property: value}`` or
+    ``{property: [low, high]}``), then reduced with ``reducer``. ``terrain`` derives
+    ``slope``/``aspect`` from an elevation image before ``bands`` are selected.
+
+    ``granularity`` says how often the source changes: ``static`` sources (never
+    date-filtered) and ``yearly`` ones are fetched once per fire and period and
+    reused across days. ``hourly`` sources are reduced over the day like ``daily``
+    ones, since units are days.
+    """
+
+    bands: List[str]
+    collection: Optional[str] = None
+    image: Optional[str] = None
+    features: Optional[str] = None
+    rename: Optional[List[str]] = None
+    reducer: str = "mean"
+    days_before: int = 0
+    day_property: Optional[str] = None
+    filters: Dict[str, Any] = field(default_factory=dict)
+    resample: str = "nearest"
+    terrain: bool = False
+    granularity: str = "daily"
+
+    def __post_init__(self) -> None:
+        kinds = [kind for kind in (self.collection, self.image, self.features) if kind]
+        if len(kinds) != 1:
+            raise ConfigError("Composite sources need exactly one of collection, image or features")
+        if not self.bands:
+            raise ConfigError(f"Composite source '{kinds[0]}' selects no bands")
+        if self.features and len(self.bands) != 1:
+            raise ConfigError(f"Composite source '{self.features}' paints exactly one band")
+        if self.rename is not None and len(self.rename) != len(self.bands):
+            raise ConfigError(f"Composite source '{kinds[0]}': rename must match bands")
+        if self.reducer not in REDUCERS:
+            raise ConfigError(f"Unknown reducer '{self.reducer}' (expected one of {REDUCERS})")
+        if self.resample not in RESAMPLING:
+            raise ConfigError(f"Unknown resample '{self.resample}' (expected one of {RESAMPLING})")
+        if self.granularity not in GRANULARITIES:
+            raise ConfigError(
+                f"Unknown granularity '{self.granularity}' (expected one of {GRANULARITIES})"
+            )
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "CompositeSource":
+        bands = data.get("bands") or []
+        rename = data.get("rename")
+        return cls(
+            bands=[str(band) for band in ([bands] if isinstance(bands, str) else bands)],
+            collection=data.get("collection"),
+            image=data.get("image"),
+            features=data.get("features"),
+            rename=None if rename is None else [str(name) for name in rename],
+            reducer=str(data.get("reducer", "mean")),
+            days_before=int(data.get("days_before", 0)),
+            day_property=data.get("day_property"),
+            filters=dict(data.get("filters") or {}),
+            resample=str(data.get("resample", "nearest")),
+            terrain=bool(data.get("terrain", False)),
+            granularity=str(data.get("granularity", "daily")),
+        )
+
+    @property
+    def output_bands(self) -> List[str]:
+        return list(self.rename or self.bands)
+
+    @property
+    def cacheable(self) -> bool:
+        return self.granularity in ("static", "yearly")
+
+    def period_start(self, day: date) -> date:
+        """First day of the period whose pixels stand for ``day``."""
+        if self.granularity == "static":
+            return date(2000, 1, 1)
+        if self.granularity == "yearly":
+            return date(day.year, 1, 1)
+        return day
+
+    def to_image(self, day: date) -> ee.Image:  # type: ignore[valid-type]
+        import ee  # type: ignore
+
+        start = ee.Date(day.isoformat())
+        end = start.advance(1, "day")
+        if self.features:
+            detections = ee.FeatureCollection(self.features).filterDate(
+                start.advance(-self.days_before, "day"), end
+            )
+            return ee.Image(0).paint(detections, 1).rename(self.output_bands).toFloat()
+        if self.image:
+            image = ee.Image(self.image)
+            if self.terrain:
+                image = ee.Terrain.products(image)
+            image = image.select(self.bands)
+            if self.resample != "nearest":
+                image = image.resample(self.resample)
+        else:
+            image = self._reduce_collection(start, end)
+        return image.rename(self.output_bands).toFloat()
+
+    def _reduce_collection(self, start: Any, end: Any) -> ee.Image:  # type: ignore[valid-type]
+        import ee  # type: ignore
+
+        collection = ee.ImageCollection(self.collection)
+        if self.granularity != "static":
+            collection = collection.filterDate(start.advance(-self.days_before, "day"), end)
+        if self.day_property:
+            collection = collection.filter(ee.Filter.eq(self.day_property, start.millis()))
+        for prop, value in self.filters.items():
+            if isinstance(value, (list, tuple)):
+                collection = collection.filter(ee.Filter.rangeContains(prop, value[0], value[1]))
+            else:
+                collection = collection.filter(ee.Filter.eq(prop, value))
+        collection = collection.select(self.bands)
+        if self.resample != "nearest":
+            # Composites have no native projection; resample each image before reducing.
+            collection = collection.map(lambda image: image.resample(self.resample))
+        if self.reducer == "latest":
+            reduced = collection.sort("system:time_start", False).mosaic()
+        elif self.reducer == "first":
+            reduced = collection.sort("system:time_start").mosaic()
+        else:
+            reduced = getattr(collection, self.reducer)()
+        # An empty window still yields the expected bands, fully masked.
+        placeholder = ee.Image.constant([0] * len(self.bands)).rename(self.bands).updateMask(0)
+        return ee.Image(ee.Algorithms.If(collection.size().gt(0), reduced, placeholder))
+
+
+def composite_bands(
+    sources: Sequence[CompositeSource],
+    derived: Optional[Mapping[str, str]] = None,
+    bands: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Band names of the composite, in output order."""
+    if bands:
+        return list(bands)
+    return [name for source in sources for name in source.output_bands] + list(derived or {})
+
+
+def composite_image(
+    sources: Sequence[CompositeSource],
+    day: date,
+    *,
+    derived: Optional[Mapping[str, str]] = None,
+    bands: Optional[Sequence[str]] = None,
+    nodata: float = DEFAULT_NODATA,
+) -> ee.Image:  # type: ignore[valid-type]
+    """Stack every source for ``day`` into one float image.
+
+    ``derived`` maps new band names to ``ee.Image.expression`` formulas over the
+    source bands. The image has no projection of its own: the request grid reprojects
+    every band server-side, so one fetch returns them pixel-aligned.
+    """
+    import ee  # type: ignore
+
+    stack = ee.Image.cat([source.to_image(day) for source in sources])
+    source_bands = composite_bands(sources)
+    for name, expression in (derived or {}).items():
+        variables = {band: stack.select(band) for band in source_bands}
+        stack = stack.addBands(stack.expression(expression, variables).rename(name))
+    return stack.select(composite_bands(sources, derived, bands)).toFloat().unmask(nodata)
+
+
+def _fetch_options(options: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        "executor": options["executor"],
+        "max_bytes": int(options.get("max_request_bytes", MAX_REQUEST_BYTES)),
+    }
+
+
+def _fetch_to_cache(
+    cache: DiskCache,
+    key: str,
+    image_for: Callable[[], Any],
+    grid: PixelGrid,
+    band_names: Sequence[str],
+    fetch_options: Mapping[str, Any],
+) -> Tuple[np.ndarray, int]:
+    """Return the cached ``(bands, y, x)`` array for ``key``, fetching it on a miss."""
+    fetched = 0
+
+    def fetch(path: Path) -> None:
+        nonlocal fetched
+        shape = (len(band_names), grid.height, grid.width)
+        array = open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+
+        def write(tile: np.ndarray, col_off: int, row_off: int) -> None:
+            array[:, row_off : row_off + tile.shape[1], col_off : col_off + tile.shape[2]] = tile
+
+        fetched = fetch_into(image_for(), grid, band_names, write, **fetch_options)
+        array.flush()
+
+    return cache.get_or_fetch(key, fetch), fetched
+
+
+def _cached_source(
+    cache: DiskCache,
+    source: CompositeSource,
+    day: date,
+    grid: PixelGrid,
+    fetch_options: Mapping[str, Any],
+) -> Tuple[np.ndarray, int]:
+    """Return the source's pixels for the period containing ``day``, fetching on a miss."""
+    period = source.period_start(day)
+    key = cache_key(asdict(source), asdict(grid), period.isoformat())
+    return _fetch_to_cache(
+        cache,
+        key,
+        lambda: composite_image([source], period),
+        grid,
+        source.output_bands,
+        fetch_options,
+    )
+
+
+def fetch_composite(
+    unit: WorkUnit,
+    options: Mapping[str, Any],
+    output_dir: Path,
+    *,
+    sources: Sequence[CompositeSource],
+    derived: Optional[Mapping[str, str]] = None,
+    bands: Optional[Sequence[str]] = None,
+) -> UnitOutput:
+    """Fetch one fire-day of a composite with a single (possibly tiled) request.
+
+    Sources with ``static`` or ``yearly`` granularity are fetched once per fire grid
+    and period into the disk cache at ``cache_dir`` (bounded by ``cache_max_bytes``)
+    and copied from there for every other day; ``derived`` expressions may only use
+    bands of daily sources. When the unit has a shared ``fetch_bbox`` (see
+    ``merge_regions``), the daily bands are fetched once for the whole region into
+    the same cache and each fire's grid is cropped from it; grids are snapped to the
+    resolution, so the crop is exact. Requests go through the run's executor, which
+    the dispatcher passes as the ``executor`` option. Options: ``resolution`` (metres,
+    default 375), ``max_request_bytes`` and ``output_format``.
+    """
+    grid = PixelGrid.from_bbox(
+        unit.bbox,
+        unit.crs,
+        float(options.get("resolution", DEFAULT_RESOLUTION)),
+    )
+    fetch_options = _fetch_options(options)
+    band_names = composite_bands(sources, derived, bands)
+    daily_sources = [source for source in sources if not source.cacheable]
+    cache = DiskCache(
+        Path(options.get("cache_dir") or output_dir / ".cache"),
+        int(options.get("cache_max_bytes", DEFAULT_CACHE_BYTES)),
+    )
+
+    cached: Dict[str, Tuple[np.ndarray, int]] = {}
+    fetched = 0
+    for source in sources:
+        if not source.cacheable or not set(source.output_bands) & set(band_names):
+            continue
+        array, source_fetched = _cached_source(cache, source, unit.date, grid, fetch_options)
+        fetched += source_fetched
+        for position, band in enumerate(source.output_bands):
+            cached[band] = (array, position)
+
+    daily_bands = [band for band in band_names if band not in cached]
+    daily_index = {band: position for position, band in enumerate(daily_bands)}
+
+    def daily_image() -> Any:
+        return composite_image(daily_sources, unit.date, derived=derived, bands=daily_bands)
+
+    writer = raster_writer(options, output_dir)
+    with writer.open_day(unit.fire_id, unit.date, grid, band_names) as sink:
+
+        def combine(array: np.ndarray, col_off: int, row_off: int) -> None:
+            if not cached:
+                sink(array, col_off, row_off)
+                return
+            height, width = array.shape[1:]
+            rows = slice(row_off, row_off + height)
+            cols = slice(col_off, col_off + width)
+            combined = np.empty((len(band_names), height, width), dtype=np.float32)
+            for position, band in enumerate(band_names):
+                if band in daily_index:
+                    combined[position] = array[daily_index[band]]
+                else:
+                    source_array, source_position = cached[band]
+                    combined[position] = source_array[source_position, rows, cols]
+            sink(combined, col_off, row_off)
+
+        if daily_bands and unit.fetch_bbox is None:
+            fetched += fetch_into(daily_image(), grid, daily_bands, combine, **fetch_options)
+        else:
+            region = np.empty((0, grid.height, grid.width), dtype=np.float32)
+            row_shift = col_shift = 0
+            if daily_bands:
+                # Shared region: the first fire of the group fetches it, the others crop.
+                region_grid = PixelGrid.from_bbox(unit.fetch_bbox, grid.crs, grid.resolution)
+                key = cache_key(
+                    [asdict(source) for source in daily_sources],
+                    dict(derived or {}),
+                    daily_bands,
+                    asdict(region_grid),
+                    unit.date.isoformat(),
+                )
+                region, region_fetched = _fetch_to_cache(
+                    cache, key, daily_image, region_grid, daily_bands, fetch_options
+                )
+                fetched += region_fetched
+                col_shift = int(round((grid.x0 - region_grid.x0) / grid.resolution))
+                row_shift = int(round((region_grid.y0 - grid.y0) / grid.resolution))
+            for col_off, row_off, tile in plan_tiles(grid, len(band_names)):
+                rows = slice(row_shift + row_off, row_shift + row_off + tile.height)
+                cols = slice(col_shift + col_off, col_shift + col_off + tile.width)
+                combine(np.asarray(region[:, rows, cols], dtype=np.float32), col_off, row_off)
+    return UnitOutput(path=writer.output_path(unit.fire_id, unit.date), bytes_downloaded=fetched)
+
+
+def composite_cost(
+    index: Any,
+    options: Mapping[str, Any],
+    config: Any = None,
+    *,
+    sources: Sequence[CompositeSource],
+    derived: Optional[Mapping[str, str]] = None,
+    bands: Optional[Sequence[str]] = None,
+    workers: int = 16,
+) -> DatasetCost:
+    """Estimate the requests and pixels :func:`fetch_composite` needs for ``index``.
+
+    Daily bands cost one tiled request per unit; ``static`` and ``yearly`` sources
+    are counted once per fire and period, as the cache serves the other days.
+    ``merge_regions`` is not modelled, so overlapping fires make this an upper bound.
+    """
+    resolution = float(options.get("resolution", DEFAULT_RESOLUTION))
+    max_bytes = int(options.get("max_request_bytes", MAX_REQUEST_BYTES))
+    band_names = composite_bands(sources, derived, bands)
+    cached_sources = [
+        (position, source)
+        for position, source in enumerate(sources)
+        if source.cacheable and set(source.output_bands) & set(band_names)
+    ]
+    cached_bands = {band for _, source in cached_sources for band in source.output_bands}
+    daily_count = len([band for band in band_names if band not in cached_bands])
+    cost = DatasetCost(concurrency=int(options.get("workers", workers)))
+    grids: Dict[Any, PixelGrid] = {}
+    fetched_periods = set()
+
+    def add_fetch(grid: PixelGrid, band_count: int) -> None:
+        cost.requests += len(plan_tiles(grid, band_count, max_bytes=max_bytes))
+        cost.pixels += grid.width * grid.height * band_count
+        cost.bytes += grid.width * grid.height * band_count * 4
+
+    for unit in option_work_units(index, options):
+        grid = grids.get(unit.fire_id)
+        if grid is None:
+            grid = grids[unit.fire_id] = PixelGrid.from_bbox(unit.bbox, unit.crs, resolution)
+        cost.work_units += 1
+        cost.disk_bytes += grid.width * grid.height * len(band_names) * 4
+        if daily_count:
+            add_fetch(grid, daily_count)
+        for position, source in cached_sources:
+            period = (unit.fire_id, position, source.period_start(unit.date))
+            if period not in fetched_periods:
+                fetched_periods.add(period)
+                add_fetch(grid, len(source.output_bands))
+    if options.get("merge_regions"):
+        cost.notes.append("merge_regions not modelled; requests are an upper bound")
+    return cost
+
+
+def register_composite_dataset(
+    *,
+    name: str,
+    sources: Sequence[CompositeSource],
+    derived: Optional[Mapping[str, str]] = None,
+    bands: Optional[Sequence[str]] = None,
+    workers: int = 16,
+) -> None:
+    """Register an Earth Engine work unit dataset that fetches a fixed composite."""
+    handler = partial(
+        fetch_composite,
+        sources=list(sources),
+        derived=dict(derived or {}),
+        bands=None if bands is None else list(bands),
+    )
+    handler.__name__ = name  # type: ignore[attr-defined]
+    handler.__qualname__ = name  # type: ignore[attr-defined]
+    handler.__module__ = __name__
+    handler.__doc__ = f"Composite of {', '.join(composite_bands(sources, derived, bands))}."
+    cost = partial(
+        composite_cost,
+        sources=list(sources),
+        derived=dict(derived or {}),
+        bands=None if bands is None else list(bands),
+        workers=workers,
+    )
+    register_work_unit_dataset(source="earthengine", name=name, workers=workers, cost=cost)(
+        handler
+    )
+
+
+def _options_sources(options: Mapping[str, Any]) -> List[CompositeSource]:
+    sources = options.get("sources")
+    if not sources:
+        raise ConfigError("The composite dataset requires a 'sources' list")
+    return [CompositeSource.from_mapping(source) for source in sources]
+
+
+def _composite_options_cost(index: Any, options: Mapping[str, Any], config: Any) -> DatasetCost:
+    return composite_cost(
+        index,
+        options,
+        config,
+        sources=_options_sources(options),
+        derived=options.get("derived"),
+        bands=options.get("bands"),
+    )
+
+
+@register_work_unit_dataset(
+    source="earthengine", name="composite", workers=16, cost=_composite_options_cost
+)
+def composite(unit: WorkUnit, options: Mapping[str, Any], output_dir: Path) -> UnitOutput:
+    """Fetch the products listed in ``sources`` as one multi-band raster per fire-day.
+
+    ``derived`` (name -> expression) adds computed bands and ``bands`` selects and
+    orders the output bands.
+    """
+    return fetch_composite(
+        unit,
+        options,
+        output_dir,
+        sources=_options_sources(options),
+        derived=options.get("derived"),
+        bands=options.get("bands"),
+    )
@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import importlib
-from typing import Callable
+import importlib.util
+from typing import Callable, Tuple
 
-__all__ = ["resolve_custom_callable"]
+__all__ = ["custom_module_exists", "resolve_custom_callable", "split_callable_path"]
 
 
-def resolve_custom_callable(path: str) -> Callable[..., object]:
-    """Load a function from a ``module:function`` style string."""
+def split_callable_path(path: str) -> Tuple[str, str]:
+    """Split ``module:function`` or ``package.module.function`` into module and attribute."""
     if ":" in path:
         module_name, attr = path.split(":", 1)
     elif "." in path:
@@ -18,7 +19,21 @@ def resolve_custom_callable(path: str) -> Callable[..., object]:
         raise ValueError(
             "Custom dataset function must be provided as 'module:function' or dotted path"
         )
+    return module_name, attr
+
+
+def custom_module_exists(path: str) -> bool:
+    """Whether the module of a custom callable path can be found, without importing it."""
+    module_name, _ = split_callable_path(path)
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
 
+def resolve_custom_callable(path: str) -> Callable[..., object]:
+    """Load a function from a ``module:function`` style string."""
+    module_name, attr = split_callable_path(path)
     module = importlib.import_module(module_name)
     try:
         func = getattr(module, attr)
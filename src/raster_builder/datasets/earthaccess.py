@@ -1,22 +1,208 @@
-"""Placeholders for NASA earthaccess dataset implementations."""
+"""NASA earthaccess dataset implementations."""
 
 from __future__ import annotations
 
 import logging
-from typing import Any, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
+import pandas as pd
+
+from ..config import ConfigError
 from ..context import PipelineContext
+from ..io.granules import (
+    DEFAULT_CMR_URL,
+    Granule,
+    GranuleCache,
+    GranuleDownloader,
+    SessionFactory,
+    plan_granules,
+    search_granules,
+)
+from ..io.pixels import PixelGrid, write_geotiff
+from ..io.storage import atomic_output, dataset_output_dir
+from ..io.subsets import subset_granule
+from ..planner import DatasetCost
+from ..workunits import DEFAULT_BUFFER_M, fire_bbox, options_crs, utm_crs
 from .registry import register_dataset
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_FILENAME = "granules.parquet"
+DEFAULT_SUBSET_RESOLUTION = 500.0
+
+
+def _session_factory(context: PipelineContext) -> SessionFactory:
+    if context.earthaccess_session is not None:
+        import earthaccess  # type: ignore
+
+        return earthaccess.get_requests_https_session
+
+    import requests
+
+    return requests.Session
 
-@register_dataset(source="earthaccess", name="example")
-def earthaccess_example(context: PipelineContext, options: Mapping[str, Any]) -> None:
-    """Demonstration placeholder that records configuration values."""
 
-    logger.warning(
-        "earthaccess example dataset is a placeholder and does not download data yet."
+def _fire_grids(
+    queries: List[Tuple[Any, ...]], options: Mapping[str, Any]
+) -> Dict[Any, PixelGrid]:
+    crs = options_crs(options)
+    resolution = float(options.get("resolution", DEFAULT_SUBSET_RESOLUTION))
+    grids = {}
+    for fire_id, bbox, _, _ in queries:
+        center = ((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+        grids[fire_id] = PixelGrid.from_bbox(bbox, crs or utm_crs(*center), resolution)
+    return grids
+
+
+def _fire_queries(index: Any, buffer_days: int, buffer_m: float) -> Iterator[Tuple[Any, ...]]:
+    geometries = index.geometry if "geometry" in index else None
+    padding = timedelta(days=buffer_days)
+    rows = index[["Id", "IDate", "FDate", "lat", "lon"]].itertuples(index=False)
+    for position, row in enumerate(rows):
+        geometry = geometries.iloc[position] if geometries is not None else None
+        yield (
+            row.Id,
+            fire_bbox(geometry, row.lon, row.lat, buffer_m),
+            pd.Timestamp(row.IDate).date() - padding,
+            pd.Timestamp(row.FDate).date() + padding,
+        )
+
+
+def _granules_cost(index: Any, options: Mapping[str, Any], config: Any) -> DatasetCost:
+    fires = 0 if index is None else len(index)
+    return DatasetCost(
+        work_units=fires,
+        requests=fires,
+        concurrency=config.execution.max_concurrency,
+        notes=["counts one CMR search per fire; granule downloads depend on search results"],
     )
-    context.add_artifact("earthaccess_example", {"options": dict(options)})
 
+
+@register_dataset(source="earthaccess", name="granules", cost=_granules_cost)
+def earthaccess_granules(
+    context: PipelineContext,
+    options: Mapping[str, Any],
+    *,
+    dataset_name: Optional[str] = None,
+) -> Path:
+    """Download the granules of a CMR collection that cover every indexed fire.
+
+    Every index row is searched (``short_name``, optional ``version``/``provider``)
+    over its buffered bbox and burning period, granules are deduplicated across
+    fires and downloaded by ``workers`` threads with pooled sessions into a
+    content-keyed cache (``cache_dir``, default ``<scratch>/granules``). The output
+    is ``granules.parquet`` mapping each fire to the local granule paths, in the
+    directory of ``dataset_name`` (the config entry), so several collections can be
+    declared as differently named entries.
+
+    With ``subset: true`` (or a ``variables`` list) each granule is then opened
+    once and every fire that needs it gets a GeoTIFF of just its footprint,
+    reprojected onto the fire's grid (``crs``/``utm_zone`` or the fire's UTM zone,
+    ``resolution`` metres, ``resampling``) under ``subsets/<Id>/``; the manifest
+    gains a ``subset_path`` column.
+    """
+
+    short_name = options.get("short_name")
+    if not short_name:
+        raise ConfigError("The earthaccess granules dataset requires a 'short_name' option")
+    if context.index_data is None or len(context.index_data) == 0:
+        logger.warning("Index is empty; no granules to download")
+    name = dataset_name or "granules"
+    output_dir = dataset_output_dir(context, stage="earthaccess", dataset_name=name)
+    cache_dir: Optional[str] = options.get("cache_dir")
+    cache = GranuleCache(Path(cache_dir) if cache_dir else context.scratch_path / "granules")
+    queries = []
+    if context.index_data is not None:
+        queries = list(
+            _fire_queries(
+                context.index_data,
+                int(options.get("buffer_days", 0)),
+                float(options.get("buffer_m", DEFAULT_BUFFER_M)),
+            )
+        )
+
+    with GranuleDownloader(
+        cache,
+        _session_factory(context),
+        workers=int(options.get("workers", 8)),
+        max_retries=context.config.execution.max_retries,
+        metrics=context.metrics,
+    ) as downloader:
+
+        def search(bbox: Tuple[float, ...], start: date, end: date) -> List[Granule]:
+            return search_granules(
+                downloader.session(),
+                short_name=str(short_name),
+                bbox=bbox,
+                start=start,
+                end=end,
+                version=options.get("version"),
+                provider=options.get("provider"),
+                cmr_url=str(options.get("cmr_url", DEFAULT_CMR_URL)),
+            )
+
+        with context.span("granule_search", dataset=name):
+            plan = plan_granules(queries, search, context.executor)
+        logger.info(
+            "Planned %d distinct granules for %d fires (%d searches)",
+            len(plan.granules),
+            len(queries),
+            plan.searches,
+        )
+        with context.span("granule_download", dataset=name):
+            paths = downloader.download_all(list(plan.granules.values()))
+
+    columns = ["Id", "concept_id", "url", "path"]
+    subsets: Dict[Tuple[str, Any], str] = {}
+    if options.get("subset") or options.get("variables"):
+        columns.append("subset_path")
+        grids = _fire_grids(queries, options)
+        variables = options.get("variables")
+        if isinstance(variables, str):
+            variables = [variables]
+
+        def subset(key: str) -> Dict[Tuple[str, Any], str]:
+            stem = Path(plan.granules[key].filename).stem
+            targets = [(fire_id, grids[fire_id]) for fire_id in sorted(plan.fires[key], key=str)]
+            written = {}
+            for fire_id, array, band_names in subset_granule(
+                paths[key],
+                targets,
+                variables=variables,
+                resampling=str(options.get("resampling", "nearest")),
+            ):
+                path = output_dir / "subsets" / str(fire_id) / f"{stem}.tif"
+                write_geotiff(path, array, grids[fire_id], band_names)
+                written[(key, fire_id)] = str(path)
+            return written
+
+        # Local GDAL work: keep it off the request executor and its retries and counters.
+        workers = int(options.get("workers", 8))
+        with context.span("granule_subset", dataset=name):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="subset") as pool:
+                for written in pool.map(subset, list(plan.granules)):
+                    subsets.update(written)
+
+    records = [
+        {
+            "Id": fire_id,
+            "concept_id": plan.granules[key].concept_id,
+            "url": plan.granules[key].url,
+            "path": str(paths[key]),
+            "subset_path": subsets.get((key, fire_id)),
+        }
+        for key, fire_ids in plan.fires.items()
+        for fire_id in sorted(fire_ids, key=str)
+    ]
+    manifest = pd.DataFrame(records, columns=columns)
+    path = output_dir / MANIFEST_FILENAME
+    with atomic_output(path) as tmp_path:
+        manifest.to_parquet(tmp_path, index=False)
+    context.add_artifact(
+        name,
+        {"granules": len(plan.granules), "fires": len(queries), "manifest": str(path)},
+    )
+    return path
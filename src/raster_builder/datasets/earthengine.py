@@ -1,26 +1,137 @@
-"""Placeholders for Earth Engine dataset implementations."""
+"""Earth Engine dataset implementations."""
 
 from __future__ import annotations
 
 import logging
-from typing import Any, Mapping
+from pathlib import Path
+from typing import Any, List, Mapping
 
-from ..context import PipelineContext
-from .registry import register_dataset
+from ..planner import DatasetCost
+from ..workunits import UnitOutput, WorkUnit, register_work_unit_dataset
+from .composite import CompositeSource, composite_cost, fetch_composite
 
 logger = logging.getLogger(__name__)
 
+FIREPRED_SOURCES = [
+    CompositeSource(collection="NASA/VIIRS/002/VNP09GA", bands=["M11", "I2", "I1"]),
+    CompositeSource(
+        collection="IDAHO_EPSCOR/GRIDMET",
+        bands=["pr", "vs", "th", "tmmn", "tmmx", "erc", "sph"],
+        resample="bilinear",
+    ),
+    CompositeSource(
+        image="USGS/SRTMGL1_003",
+        bands=["slope", "aspect", "elevation"],
+        terrain=True,
+        resample="bilinear",
+        granularity="static",
+    ),
+    CompositeSource(
+        collection="GRIDMET/DROUGHT",
+        bands=["pdsi"],
+        reducer="latest",
+        days_before=5,
+        resample="bilinear",
+    ),
+    CompositeSource(
+        collection="MODIS/061/MCD12Q1",
+        bands=["LC_Type1"],
+        reducer="latest",
+        days_before=731,
+        granularity="yearly",
+    ),
+    CompositeSource(
+        collection="NOAA/GFS0P25",
+        bands=[
+            "total_precipitation_surface",
+            "u_component_of_wind_10m_above_ground",
+            "v_component_of_wind_10m_above_ground",
+            "temperature_2m_above_ground",
+            "specific_humidity_2m_above_ground",
+        ],
+        rename=["forecast_pr", "forecast_u", "forecast_v", "forecast_tmp", "forecast_sph"],
+        day_property="creation_time",
+        filters={"forecast_hours": [1, 24]},
+        resample="bilinear",
+    ),
+]
+FIREPRED_DERIVED = {
+    "NDVI": "(I2 - I1) / (I2 + I1)",
+    "EVI2": "2.5 * (I2 - I1) * 0.0001 / ((I2 + 2.4 * I1) * 0.0001 + 1)",
+    "forecast_ws": "sqrt(forecast_u * forecast_u + forecast_v * forecast_v)",
+    "forecast_wd": "atan2(forecast_u, forecast_v) * 180 / 3.141592653589793",
+}
+FIREPRED_BANDS = [
+    "M11",
+    "I2",
+    "I1",
+    "NDVI",
+    "EVI2",
+    "pr",
+    "vs",
+    "th",
+    "tmmn",
+    "tmmx",
+    "erc",
+    "sph",
+    "slope",
+    "aspect",
+    "elevation",
+    "pdsi",
+    "LC_Type1",
+    "forecast_pr",
+    "forecast_ws",
+    "forecast_wd",
+    "forecast_tmp",
+    "forecast_sph",
+]
 
-@register_dataset(source="earthengine", name="firepred_daily")
-def firepred_daily(context: PipelineContext, options: Mapping[str, Any]) -> None:
-    """Placeholder for the FirePred daily export pipeline.
 
-    The legacy implementation exported imagery to Google Drive and then downloaded TIFFs.
-    That logic will be adapted to the new pipeline in a follow-up change.
-    """
+def _firepred_sources(options: Mapping[str, Any]) -> List[CompositeSource]:
+    if not options.get("active_fire_asset"):
+        return FIREPRED_SOURCES
+    active_fire = CompositeSource(features=str(options["active_fire_asset"]), bands=["active_fire"])
+    return [*FIREPRED_SOURCES, active_fire]
+
+
+def _firepred_bands(options: Mapping[str, Any]) -> List[str]:
+    if options.get("active_fire_asset"):
+        return [*FIREPRED_BANDS, "active_fire"]
+    return list(FIREPRED_BANDS)
 
-    logger.warning(
-        "firepred_daily dataset is not yet implemented in the refactored pipeline."
+
+def _firepred_cost(index: Any, options: Mapping[str, Any], config: Any) -> DatasetCost:
+    return composite_cost(
+        index,
+        options,
+        config,
+        sources=_firepred_sources(options),
+        derived=FIREPRED_DERIVED,
+        bands=_firepred_bands(options),
     )
-    context.add_artifact("firepred_daily", {"status": "not-implemented"})
 
+
+@register_work_unit_dataset(
+    source="earthengine", name="firepred_daily", workers=16, cost=_firepred_cost
+)
+def firepred_daily(unit: WorkUnit, options: Mapping[str, Any], output_dir: Path) -> UnitOutput:
+    """Fetch the FirePred feature stack for one fire-day and write it to the raster output.
+
+    VIIRS reflectance, GRIDMET weather and drought, SRTM terrain, MODIS land cover
+    and the GFS forecast are composed server-side into one image and requested
+    directly with ``computePixels`` on a grid in the unit's CRS (``utm_zone``/``crs``
+    option) at ``resolution`` metres, instead of exporting to Google Drive. Regions
+    over ``max_request_bytes`` are split into tiles fetched concurrently through the
+    run's request executor. Days span ``buffer_days`` around the fire; ``workers`` units run
+    concurrently. ``output_format`` selects the layout: ``geotiff``
+    (``<fire id>/<YYYY-MM-DD>.tif``), ``zarr`` or ``cog`` (one datacube per fire).
+    """
+
+    return fetch_composite(
+        unit,
+        options,
+        output_dir,
+        sources=_firepred_sources(options),
+        derived=FIREPRED_DERIVED,
+        bands=_firepred_bands(options),
+    )
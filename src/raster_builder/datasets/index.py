@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import json
 import logging
-from datetime import datetime
-from typing import Any, Iterable, Mapping
+import math
+import shutil
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 import ee  # type: ignore
 import geopandas as gpd
@@ -12,7 +16,17 @@ import pandas as pd
 
 from ..config import ConfigError
 from ..context import PipelineContext
-from ..io.storage import dataset_output_dir
+from ..io.executor import RequestExecutor
+from ..io.memo import RequestCache, asset_version
+from ..io.storage import (
+    atomic_output,
+    dataset_output_dir,
+    iter_partitions,
+    partition_path,
+    read_index,
+    write_index,
+)
+from ..planner import DatasetCost, synthetic_index
 from .registry import register_dataset
 
 logger = logging.getLogger(__name__)
@@ -56,11 +70,26 @@ USA_BOUNDS = [
 
 FINAL_PERIMETERS = "JRC/GWIS/GlobFire/v2/FinalPerimeters"
 DAILY_PERIMETERS_TEMPLATE = "JRC/GWIS/GlobFire/v2/DailyPerimeters/{year}"
+DEFAULT_DAILY_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 1000
+INDEX_FILENAME = "index.parquet"
+PARTITIONS_DIRNAME = "partitions"
+COVERAGE_FILENAME = "coverage.json"
+DEFAULT_REFRESH_DAYS = 7
+# Rough sizes for planning: a final perimeter feature with its polygon, a daily
+# centroid feature, and a stored index row.
+FINAL_FEATURE_BYTES = 4096
+DAILY_FEATURE_BYTES = 256
+INDEX_ROW_BYTES = 1024
+
+Interval = Tuple[datetime, datetime]
 
 
 def _parse_datetime(value: Any, *, field: str) -> datetime:
     if isinstance(value, datetime):
         return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
     if isinstance(value, str):
         try:
             return datetime.fromisoformat(value)
@@ -73,97 +102,291 @@ def _usa_geometry() -> ee.Geometry:  # type: ignore[valid-type]
     return ee.Geometry.Polygon([USA_BOUNDS])
 
 
-def _feature_collection_to_frame(collection: ee.FeatureCollection) -> gpd.GeoDataFrame:  # type: ignore[valid-type]
-    info = collection.getInfo()
-    features = info.get("features", []) if isinstance(info, dict) else []
-    if not features:
+def _append_page(
+    columns: Dict[str, List[Any]],
+    geometries: List[Any],
+    page: Iterable[Mapping[str, Any]],
+) -> None:
+    """Append one page of GeoJSON features to columnar buffers, padding ragged properties."""
+    from shapely.geometry import shape
+
+    for feature in page:
+        row = len(geometries)
+        for key, value in (feature.get("properties") or {}).items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * row
+            column.append(value)
+        geometry = feature.get("geometry")
+        geometries.append(shape(geometry) if geometry else None)
+        for column in columns.values():
+            if len(column) == row:
+                column.append(None)
+
+
+def _buffers_to_frame(columns: Dict[str, List[Any]], geometries: List[Any]) -> gpd.GeoDataFrame:
+    if not geometries:
         return gpd.GeoDataFrame()
-    properties = [feature.get("properties", {}) for feature in features]
-    return gpd.GeoDataFrame(properties)
-
-
-def _final_fires(min_size: float, start_ms: int, end_ms: int) -> gpd.GeoDataFrame:
+    if any(geometry is not None for geometry in geometries):
+        return gpd.GeoDataFrame(columns, geometry=geometries, crs="EPSG:4326")
+    return gpd.GeoDataFrame(columns)
+
+
+def _asset_versions(assets: Iterable[str], executor: RequestExecutor) -> Dict[str, str]:
+    futures = {asset: executor.submit(asset_version, asset) for asset in set(assets)}
+    return {asset: future.result() for asset, future in futures.items()}
+
+
+def _feature_collections_to_frames(
+    collections: Sequence[ee.FeatureCollection],  # type: ignore[valid-type]
+    executor: RequestExecutor,
+    *,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cache: Optional[RequestCache] = None,
+    assets: Sequence[str] = (),
+    label: str = "",
+) -> List[gpd.GeoDataFrame]:
+    """Fetch collections concurrently in bounded pages so no response holds every feature.
+
+    With a ``cache``, each collection's features are memoized page by page under its
+    serialized expression and the version of its asset (``assets[i]``); pages are
+    written as they arrive and cached collections are not queried at all.
+    """
+    buffers: List[tuple[Dict[str, List[Any]], List[Any]]] = [({}, []) for _ in collections]
+    keys: Dict[int, str] = {}
+    if cache is not None:
+        versions = _asset_versions(assets, executor)
+        for position, (collection, asset) in enumerate(zip(collections, assets)):
+            key = cache.key(collection, asset, versions[asset])
+            cached = cache.get_pages(key, label=label)
+            if cached is None:
+                keys[position] = key
+                continue
+            for features in cached:
+                _append_page(*buffers[position], features)
+        fetch = sorted(keys)
+    else:
+        fetch = list(range(len(collections)))
+
+    size_futures = [executor.get_info(collections[position].size()) for position in fetch]
+    totals = [int(future.result()) for future in size_futures]
+    pages = [
+        (position, offset)
+        for position, total in zip(fetch, totals)
+        for offset in range(0, total, page_size)
+    ]
+
+    def fetch_page(page: tuple[int, int]) -> List[Any]:
+        position, offset = page
+        return collections[position].toList(page_size, offset).getInfo() or []
+
+    for (position, offset), features in zip(pages, executor.map(fetch_page, pages)):
+        columns, geometries = buffers[position]
+        _append_page(columns, geometries, features)
+        if cache is not None:
+            cache.put_page(keys[position], offset // page_size, features)
+    if cache is not None:
+        for position, total in zip(fetch, totals):
+            cache.put_pages(keys[position], math.ceil(total / page_size))
+    return [_buffers_to_frame(columns, geometries) for columns, geometries in buffers]
+
+
+def _feature_collection_to_frame(
+    collection: ee.FeatureCollection,  # type: ignore[valid-type]
+    executor: RequestExecutor,
+    *,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    cache: Optional[RequestCache] = None,
+    asset: str = "",
+    label: str = "",
+) -> gpd.GeoDataFrame:
+    return _feature_collections_to_frames(
+        [collection], executor, page_size=page_size, cache=cache, assets=[asset], label=label
+    )[0]
+
+
+def _final_perimeters(min_size: float) -> ee.FeatureCollection:  # type: ignore[valid-type]
     region = _usa_geometry()
-    collection = (
+    return (
         ee.FeatureCollection(FINAL_PERIMETERS)
         .filterBounds(region)
         .map(lambda feat: feat.set({"area": feat.area()}))
         .filter(ee.Filter.gte("area", min_size))
         .filter(ee.Filter.lt("area", 1e20))
+    )
+
+
+def _final_fires(
+    min_size: float,
+    start_ms: int,
+    end_ms: int,
+    executor: RequestExecutor,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
+    collection = (
+        _final_perimeters(min_size)
         .filter(ee.Filter.gte("IDate", start_ms))
         .filter(ee.Filter.lt("IDate", end_ms))
     )
-    return _feature_collection_to_frame(collection)
+    return _feature_collection_to_frame(
+        collection, executor, cache=cache, asset=FINAL_PERIMETERS, label="final_fires"
+    )
 
 
-def _daily_centroids(fire_id: Any, start_date: pd.Timestamp, end_date: pd.Timestamp) -> gpd.GeoDataFrame:
+def _final_fires_by_id(
+    fire_ids: Sequence[Any],
+    min_size: float,
+    executor: RequestExecutor,
+    batch_size: int,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
+    collections = [
+        _final_perimeters(min_size).filter(
+            ee.Filter.inList("Id", list(fire_ids[offset : offset + batch_size]))
+        )
+        for offset in range(0, len(fire_ids), batch_size)
+    ]
+    frames = [
+        frame
+        for frame in _feature_collections_to_frames(
+            collections,
+            executor,
+            cache=cache,
+            assets=[FINAL_PERIMETERS] * len(collections),
+            label="final_fires",
+        )
+        if not frame.empty
+    ]
+    if not frames:
+        return gpd.GeoDataFrame()
+    return gpd.GeoDataFrame(pd.concat(frames, ignore_index=True))
+
+
+def _daily_centroids(fire_ids: Sequence[Any], year: int) -> ee.FeatureCollection:  # type: ignore[valid-type]
+    """Build one query for the daily perimeter centroids of several fires in a year."""
     region = _usa_geometry()
-    years = sorted(set(pd.date_range(start=start_date, end=end_date, freq="D").year))
-    daily_frames: list[gpd.GeoDataFrame] = []
-    for year in years:
-        collection_id = DAILY_PERIMETERS_TEMPLATE.format(year=year)
-        collection = (
-            ee.FeatureCollection(collection_id)
-            .filterBounds(region)
-            .filter(ee.Filter.eq("Id", fire_id))
-            .map(lambda feat: feat.set({
-                "lon": feat.geometry().centroid().coordinates().get(0),
-                "lat": feat.geometry().centroid().coordinates().get(1),
-            }))
+    collection_id = DAILY_PERIMETERS_TEMPLATE.format(year=year)
+    collection = (
+        ee.FeatureCollection(collection_id)
+        .filterBounds(region)
+        .filter(ee.Filter.inList("Id", list(fire_ids)))
+        .map(lambda feat: feat.set({
+            "lon": feat.geometry().centroid().coordinates().get(0),
+            "lat": feat.geometry().centroid().coordinates().get(1),
+        }))
+        .select(["Id", "IDate", "lat", "lon"], None, False)
+    )
+    return collection
+
+
+def _fire_ids_by_year(fires: gpd.GeoDataFrame) -> Dict[int, List[Any]]:
+    """Group fire ids by every calendar year their burning period touches."""
+    ids_by_year: Dict[int, List[Any]] = {}
+    for fire_id, start_year, end_year in zip(
+        fires["Id"].tolist(),
+        fires["IDate"].dt.year.tolist(),
+        fires["FDate"].dt.year.tolist(),
+    ):
+        for year in range(start_year, end_year + 1):
+            ids_by_year.setdefault(year, []).append(fire_id)
+    return ids_by_year
+
+
+def _collect_daily_centroids(
+    fires: gpd.GeoDataFrame,
+    batch_size: int,
+    executor: RequestExecutor,
+    cache: Optional[RequestCache] = None,
+) -> pd.DataFrame:
+    collections: list[ee.FeatureCollection] = []  # type: ignore[valid-type]
+    assets: List[str] = []
+    for year, fire_ids in sorted(_fire_ids_by_year(fires).items()):
+        for offset in range(0, len(fire_ids), batch_size):
+            collections.append(_daily_centroids(fire_ids[offset : offset + batch_size], year))
+            assets.append(DAILY_PERIMETERS_TEMPLATE.format(year=year))
+    logger.info("Fetching daily perimeters with %d batched queries", len(collections))
+    frames = [
+        pd.DataFrame(frame)
+        for frame in _feature_collections_to_frames(
+            collections, executor, cache=cache, assets=assets, label="daily_centroids"
         )
-        frame = _feature_collection_to_frame(collection)
-        if not frame.empty:
-            daily_frames.append(frame)
-    if not daily_frames:
-        return gpd.GeoDataFrame(columns=["Id", "IDate", "lat", "lon"])
-    return gpd.GeoDataFrame(pd.concat(daily_frames, ignore_index=True))
+        if not frame.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["Id", "IDate", "lat", "lon"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _match_initial_coordinates(fires: gpd.GeoDataFrame, daily: pd.DataFrame) -> pd.DataFrame:
+    """Pick, per fire, the daily centroid closest to its ignition date within 24 hours."""
+    daily = daily.dropna(subset=["Id", "IDate", "lat", "lon"]).copy()
+    if daily.empty:
+        return pd.DataFrame({"lat": pd.Series(dtype="float64"), "lon": pd.Series(dtype="float64")})
+    daily["IDate"] = pd.to_datetime(daily["IDate"], unit="ms", errors="coerce")
+    daily = daily.dropna(subset=["IDate"])
+
+    left = pd.DataFrame({"row": fires.index, "Id": fires["Id"].to_numpy(), "IDate": fires["IDate"].to_numpy()})
+    right = daily[["Id", "IDate", "lat", "lon"]].copy()
+    right["Id"] = right["Id"].astype(left["Id"].dtype)
+    right["IDate"] = right["IDate"].astype(left["IDate"].dtype)
+
+    matched = pd.merge_asof(
+        left.sort_values("IDate"),
+        right.sort_values("IDate"),
+        on="IDate",
+        by="Id",
+        direction="nearest",
+        tolerance=pd.Timedelta(hours=24),
+    )
+    return matched.set_index("row")[["lat", "lon"]]
 
 
-def _attach_initial_coordinates(fires: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+def _attach_initial_coordinates(
+    fires: gpd.GeoDataFrame,
+    batch_size: int,
+    executor: RequestExecutor,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
     if fires.empty:
         return fires
 
-    lats: list[Any] = []
-    lons: list[Any] = []
-    for _, row in fires.iterrows():
-        daily = _daily_centroids(
-            fire_id=row["Id"],
-            start_date=row["IDate"],
-            end_date=row["FDate"],
-        )
-        if daily.empty:
-            lats.append(pd.NA)
-            lons.append(pd.NA)
-            continue
-        daily["IDate"] = pd.to_datetime(daily["IDate"], unit="ms", errors="coerce")
-        daily["timedelta"] = (row["IDate"] - daily["IDate"]).abs()
-        daily = daily.sort_values("timedelta")
-        if daily["timedelta"].iloc[0] > pd.Timedelta(hours=24):
-            lats.append(pd.NA)
-            lons.append(pd.NA)
-        else:
-            lats.append(daily["lat"].iloc[0])
-            lons.append(daily["lon"].iloc[0])
+    daily = _collect_daily_centroids(
+        fires, batch_size=batch_size, executor=executor, cache=cache
+    )
+    coordinates = _match_initial_coordinates(fires, daily)
 
     fires = fires.copy()
-    fires["lat"] = lats
-    fires["lon"] = lons
+    fires["lat"] = coordinates["lat"].reindex(fires.index)
+    fires["lon"] = coordinates["lon"].reindex(fires.index)
     fires = fires.dropna(subset=["lat", "lon"])
     return fires
 
 
 def _format_final_fires(fires: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
     if fires.empty:
-        return gpd.GeoDataFrame(columns=["Id", "IDate", "FDate", "lat", "lon", "area"])
-    fires = fires.dropna(subset=["Id", "IDate", "FDate"])
+        return gpd.GeoDataFrame(
+            columns=["Id", "IDate", "FDate", "lat", "lon", "area", "geometry"],
+            geometry="geometry",
+            crs="EPSG:4326",
+        )
+    fires = fires.dropna(subset=["Id", "IDate", "FDate"]).copy()
     fires["IDate"] = pd.to_datetime(fires["IDate"], unit="ms", errors="coerce")
     fires["FDate"] = pd.to_datetime(fires["FDate"], unit="ms", errors="coerce")
     fires = fires.dropna(subset=["IDate", "FDate"])
-    fires = fires[["Id", "IDate", "FDate", "area"]]
+    columns = ["Id", "IDate", "FDate", "area"]
+    if "geometry" in fires:
+        columns.append("geometry")
+    fires = fires[columns]
     return fires.reset_index(drop=True)
 
 
-def _collect_final_fires(start: datetime, end: datetime, min_size: float) -> gpd.GeoDataFrame:
+def _collect_final_fires(
+    start: datetime,
+    end: datetime,
+    min_size: float,
+    executor: RequestExecutor,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
     start_ms = int(pd.Timestamp(start).timestamp() * 1000)
     end_ms = int(pd.Timestamp(end).timestamp() * 1000)
     logger.info(
@@ -172,35 +395,260 @@ def _collect_final_fires(start: datetime, end: datetime, min_size: float) -> gpd
         end.isoformat(),
         min_size,
     )
-    data = _final_fires(min_size=min_size, start_ms=start_ms, end_ms=end_ms)
+    data = _final_fires(
+        min_size=min_size, start_ms=start_ms, end_ms=end_ms, executor=executor, cache=cache
+    )
     logger.info("Retrieved %d final perimeters", len(data))
     return _format_final_fires(data)
 
 
-def _globfire_index(start: datetime, end: datetime, min_size: float) -> gpd.GeoDataFrame:
-    fires = _collect_final_fires(start=start, end=end, min_size=min_size)
-    fires = _attach_initial_coordinates(fires)
+def _globfire_index(
+    start: datetime,
+    end: datetime,
+    min_size: float,
+    executor: RequestExecutor,
+    batch_size: int = DEFAULT_DAILY_BATCH_SIZE,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
+    fires = _collect_final_fires(
+        start=start, end=end, min_size=min_size, executor=executor, cache=cache
+    )
+    fires = _attach_initial_coordinates(
+        fires, batch_size=batch_size, executor=executor, cache=cache
+    )
     logger.info("Final GlobFire index size: %d", len(fires))
     return fires
 
 
-def _save_index(context: PipelineContext, dataset_name: str, frame: gpd.GeoDataFrame) -> None:
-    output_dir = dataset_output_dir(context, stage="index", dataset_name=dataset_name)
-    output_path = output_dir / "index.csv"
-    df = frame.copy()
-    if "geometry" in df:
-        geometry = df.geometry
-        df = df.drop(columns=["geometry"])
-        df["geometry_wkt"] = geometry.to_wkt()
+def _refresh_fires(
+    fire_ids: Sequence[Any],
+    min_size: float,
+    executor: RequestExecutor,
+    batch_size: int,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
+    logger.info("Refreshing %d GlobFire fires still burning at a previous cutoff", len(fire_ids))
+    fires = _format_final_fires(
+        _final_fires_by_id(fire_ids, min_size, executor, batch_size, cache=cache)
+    )
+    return _attach_initial_coordinates(
+        fires, batch_size=batch_size, executor=executor, cache=cache
+    )
+
+
+def _merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_intervals(start: datetime, end: datetime, covered: Sequence[Interval]) -> List[Interval]:
+    """Return the parts of ``[start, end)`` that no covered interval contains."""
+    missing: List[Interval] = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def _load_coverage(store_dir: Path, min_size: float) -> Optional[List[Interval]]:
+    """Date ranges held in the partitioned store, or None if it was built otherwise."""
+    path = store_dir / COVERAGE_FILENAME
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            coverage = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if float(coverage.get("min_size", -1)) != min_size:
+        return None
+    return _merge_intervals(
+        (datetime.fromisoformat(start), datetime.fromisoformat(end))
+        for start, end in coverage.get("intervals", [])
+    )
+
+
+def _read_coverage(store_dir: Path, min_size: float) -> List[Interval]:
+    """Load the date ranges already held in the partitioned store.
+
+    A store built with a different ``min_size`` is discarded, since its rows would not
+    match the requested filter.
+    """
+    covered = _load_coverage(store_dir, min_size)
+    if covered is None:
+        if store_dir.exists():
+            logger.info("Discarding GlobFire partitions built with different options")
+            shutil.rmtree(store_dir)
+        return []
+    return covered
+
+
+def _write_coverage(store_dir: Path, min_size: float, intervals: Sequence[Interval]) -> None:
+    with atomic_output(store_dir / COVERAGE_FILENAME) as tmp_path, tmp_path.open(
+        "w", encoding="utf-8"
+    ) as handle:
+        json.dump(
+            {
+                "min_size": min_size,
+                "intervals": [[start.isoformat(), end.isoformat()] for start, end in intervals],
+            },
+            handle,
+            indent=2,
+        )
+
+
+def _read_store(store_dir: Path) -> gpd.GeoDataFrame:
+    frames = [read_index(path) for path in iter_partitions(store_dir)]
+    if not frames:
+        return _typed_index(_format_final_fires(gpd.GeoDataFrame()))
+    return gpd.GeoDataFrame(pd.concat(frames, ignore_index=True))
+
+
+def _partition_keys(frame: gpd.GeoDataFrame) -> Set[Tuple[int, int]]:
+    return set(zip(frame["IDate"].dt.year.tolist(), frame["IDate"].dt.month.tolist()))
+
+
+def _write_store(store_dir: Path, frame: gpd.GeoDataFrame, keys: Set[Tuple[int, int]]) -> None:
+    years = frame["IDate"].dt.year
+    months = frame["IDate"].dt.month
+    for year, month in sorted(keys):
+        rows = frame[(years == year) & (months == month)]
+        path = partition_path(store_dir, year, month)
+        if rows.empty:
+            path.unlink(missing_ok=True)
+        else:
+            write_index(rows.reset_index(drop=True), path)
+
+
+def _update_globfire_store(
+    store_dir: Path,
+    start: datetime,
+    end: datetime,
+    min_size: float,
+    executor: RequestExecutor,
+    batch_size: int = DEFAULT_DAILY_BATCH_SIZE,
+    refresh_days: int = DEFAULT_REFRESH_DAYS,
+    cache: Optional[RequestCache] = None,
+) -> gpd.GeoDataFrame:
+    """Bring the year/month partitioned index up to date for ``[start, end)``.
+
+    Only date ranges missing from the store are queried. Fires that were still burning
+    within ``refresh_days`` of an earlier cutoff are fetched again so their final date
+    and perimeter reflect later growth. Rows are deduplicated on ``Id``. ``cache``
+    memoizes the Earth Engine queries across runs.
+    """
+    covered = _read_coverage(store_dir, min_size)
+    missing = _missing_intervals(start, end, covered)
+    existing = _read_store(store_dir)
+
+    covered_ends = {covered_end for _, covered_end in covered}
+    cutoffs = {gap_start for gap_start, _ in missing if gap_start in covered_ends}
+    refresh_ids: List[Any] = []
+    for cutoff in sorted(cutoffs):
+        burning = (existing["IDate"] < cutoff) & (
+            existing["FDate"] >= cutoff - timedelta(days=refresh_days)
+        )
+        refresh_ids.extend(existing.loc[burning, "Id"].tolist())
+
+    new_frames = [
+        _typed_index(
+            _globfire_index(gap_start, gap_end, min_size, executor, batch_size, cache=cache)
+        )
+        for gap_start, gap_end in missing
+    ]
+    if refresh_ids:
+        new_frames.append(
+            _typed_index(
+                _refresh_fires(
+                    sorted(set(refresh_ids)), min_size, executor, batch_size, cache=cache
+                )
+            )
+        )
+
+    if missing:
+        new_rows = gpd.GeoDataFrame(pd.concat(new_frames, ignore_index=True))
+        stale = existing[existing["Id"].isin(new_rows["Id"])]
+        merged = gpd.GeoDataFrame(
+            pd.concat([existing, new_rows], ignore_index=True)
+        ).drop_duplicates(subset="Id", keep="last")
+        _write_store(store_dir, merged, _partition_keys(new_rows) | _partition_keys(stale))
+        _write_coverage(store_dir, min_size, _merge_intervals([*covered, (start, end)]))
+        logger.info(
+            "Fetched %d new or refreshed fires for %d missing interval(s)",
+            len(new_rows),
+            len(missing),
+        )
+    else:
+        merged = existing
+        logger.info("GlobFire partitions already cover %s to %s", start.isoformat(), end.isoformat())
+
+    in_range = (merged["IDate"] >= pd.Timestamp(start)) & (merged["IDate"] < pd.Timestamp(end))
+    return gpd.GeoDataFrame(merged[in_range].sort_values("IDate").reset_index(drop=True))
+
+
+def _typed_index(frame: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Coerce index columns to native timestamp/float dtypes before they are persisted."""
+    frame = frame.copy()
+    for column in ("IDate", "FDate"):
+        if column in frame:
+            frame[column] = pd.to_datetime(frame[column])
+    for column in ("area", "lat", "lon"):
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce").astype("float64")
+    if "Id" in frame and not frame["Id"].isna().any():
+        frame["Id"] = frame["Id"].astype("int64")
+    if "geometry" not in frame:
+        geometry = gpd.GeoSeries([None] * len(frame), index=frame.index, crs="EPSG:4326")
+        frame = gpd.GeoDataFrame(frame, geometry=geometry)
+    return frame
+
+
+def _export_csv(frame: gpd.GeoDataFrame, output_path: Path) -> None:
+    df = pd.DataFrame(frame.drop(columns=["geometry"]))
+    df["geometry_wkt"] = frame.geometry.to_wkt()
     df.to_csv(output_path, index=False)
+    logger.info("Exported index CSV at %s", output_path)
+
+
+def _save_index(
+    context: PipelineContext,
+    dataset_name: str,
+    frame: gpd.GeoDataFrame,
+    *,
+    export_csv: bool = False,
+) -> None:
+    output_dir = dataset_output_dir(context, stage="index", dataset_name=dataset_name)
+    output_path = output_dir / INDEX_FILENAME
+    frame = _typed_index(frame)
+    write_index(frame, output_path)
+    if export_csv:
+        _export_csv(frame, output_dir / "index.csv")
     context.set_index(frame, path=output_path)
-    logger.info("Stored index CSV at %s", output_path)
+    logger.info("Stored index GeoParquet at %s", output_path)
+
 
+def _restore_globfire_index(context: PipelineContext, output_dir: Path) -> bool:
+    output_path = output_dir / INDEX_FILENAME
+    if not output_path.exists():
+        return False
+    context.set_index(read_index(output_path), path=output_path)
+    logger.info("Reused index GeoParquet at %s", output_path)
+    return True
 
-@register_dataset(source="index", name="globfire")
-def load_globfire_index(context: PipelineContext, options: Mapping[str, Any]) -> gpd.GeoDataFrame:
-    """Fetch the GlobFire index dataset and persist it to disk."""
 
+def _globfire_options(options: Mapping[str, Any]) -> Tuple[datetime, datetime, float, int, int]:
+    """Validated ``(start, end, min_size, batch_size, refresh_days)`` options."""
     try:
         start = _parse_datetime(options["start_date"], field="start_date")
         end = _parse_datetime(options["end_date"], field="end_date")
@@ -211,7 +659,149 @@ def load_globfire_index(context: PipelineContext, options: Mapping[str, Any]) ->
         raise ConfigError("GlobFire end_date must not precede start_date")
 
     min_size = float(options.get("min_size", 1e7))
-    frame = _globfire_index(start=start, end=end, min_size=min_size)
-    _save_index(context, dataset_name="globfire", frame=frame)
+    batch_size = int(options.get("batch_size", DEFAULT_DAILY_BATCH_SIZE))
+    if batch_size <= 0:
+        raise ConfigError("GlobFire batch_size must be a positive integer")
+    refresh_days = int(options.get("refresh_days", DEFAULT_REFRESH_DAYS))
+    return start, end, min_size, batch_size, refresh_days
+
+
+def _add_queries(cost: DatasetCost, features: Sequence[int], feature_bytes: int) -> None:
+    """Count one ``size`` request and the ``toList`` pages of each collection."""
+    for count in features:
+        cost.requests += 1 + math.ceil(count / DEFAULT_PAGE_SIZE)
+        cost.bytes += count * feature_bytes
+
+
+def _add_fire_queries(cost: DatasetCost, fires: pd.DataFrame, batch_size: int) -> None:
+    """Count the daily centroid queries of :func:`_collect_daily_centroids` for ``fires``."""
+    if fires.empty:
+        return
+    days = (fires["FDate"] - fires["IDate"]).dt.days + 1
+    features: List[int] = []
+    for year in range(fires["IDate"].dt.year.min(), fires["FDate"].dt.year.max() + 1):
+        first = pd.Timestamp(year=year, month=1, day=1)
+        burning = (fires["IDate"] < first + pd.DateOffset(years=1)) & (fires["FDate"] >= first)
+        year_days = days[burning].tolist()
+        features.extend(
+            sum(year_days[offset : offset + batch_size])
+            for offset in range(0, len(year_days), batch_size)
+        )
+    _add_queries(cost, features, DAILY_FEATURE_BYTES)
+
+
+def _globfire_cost(index: Any, options: Mapping[str, Any], config: Any) -> DatasetCost:
+    """Estimate the GlobFire queries :func:`_update_globfire_store` will send.
+
+    Only date ranges the stored partitions do not cover are counted, plus the refresh
+    of fires still burning at an earlier cutoff. Fires come from the planning index;
+    ranges it does not span get synthetic fires at the index's daily rate.
+    """
+    start, end, min_size, batch_size, refresh_days = _globfire_options(options)
+    store_dir = config.paths.raw_data / "index" / config.schema.index.name / PARTITIONS_DIRNAME
+    covered = _load_coverage(store_dir, min_size) or []
+    missing = _missing_intervals(start, end, covered)
+    cost = DatasetCost(concurrency=config.execution.max_concurrency)
+    if not missing:
+        cost.notes.append("stored partitions cover the date range; nothing is fetched")
+        return cost
+
+    columns = ["IDate", "FDate"]
+    if index is None or len(index) == 0:
+        fires = pd.DataFrame({column: pd.Series(dtype="datetime64[ns]") for column in columns})
+    else:
+        fires = pd.DataFrame({column: pd.to_datetime(index[column]) for column in columns})
+    known = list(covered)
+    if not fires.empty:
+        known.append((fires["IDate"].min(), fires["IDate"].max() + timedelta(days=1)))
+    known = _merge_intervals(known)
+    known_days = sum((known_end - known_start).days for known_start, known_end in known)
+    rate = len(fires) / known_days if known_days else 0.0
+
+    covered_ends = {covered_end for _, covered_end in covered}
+    fetched = 0
+    for gap_start, gap_end in missing:
+        in_gap = (fires["IDate"] >= gap_start) & (fires["IDate"] < gap_end)
+        frames = [fires[in_gap]]
+        for unknown_start, unknown_end in _missing_intervals(gap_start, gap_end, known):
+            count = int(round(rate * (unknown_end - unknown_start).days))
+            if count:
+                synthetic = synthetic_index(count, start=unknown_start, end=unknown_end)
+                frames.append(synthetic[["IDate", "FDate"]])
+        gap = pd.concat(frames, ignore_index=True)
+        _add_queries(cost, [len(gap)], FINAL_FEATURE_BYTES)
+        _add_fire_queries(cost, gap, batch_size)
+        fetched += len(gap)
+
+        if gap_start in covered_ends:
+            burning = (fires["IDate"] < gap_start) & (
+                fires["FDate"] >= gap_start - timedelta(days=refresh_days)
+            )
+            refresh = fires[burning]
+            _add_queries(
+                cost,
+                [
+                    len(refresh[offset : offset + batch_size])
+                    for offset in range(0, len(refresh), batch_size)
+                ],
+                FINAL_FEATURE_BYTES,
+            )
+            _add_fire_queries(cost, refresh, batch_size)
+            fetched += len(refresh)
+
+    in_range = (fires["IDate"] >= start) & (fires["IDate"] < end)
+    cost.disk_bytes = (fetched + int(in_range.sum())) * INDEX_ROW_BYTES
+    if covered:
+        cost.notes.append(f"fetches {len(missing)} date range(s) missing from stored partitions")
+    if fires.empty:
+        cost.notes.append("the planning index has no fires to extrapolate from")
+    return cost
+
+
+@register_dataset(
+    source="index", name="globfire", restore=_restore_globfire_index, cost=_globfire_cost
+)
+def load_globfire_index(
+    context: PipelineContext,
+    options: Mapping[str, Any],
+    *,
+    dataset_name: Optional[str] = None,
+) -> gpd.GeoDataFrame:
+    """Fetch the GlobFire index dataset and persist it to disk under ``dataset_name``.
+
+    Fires are kept in year/month partitions together with the date ranges they cover,
+    so extending ``end_date`` only queries Earth Engine for the new range.
+    """
+
+    start, end, min_size, batch_size, refresh_days = _globfire_options(options)
+    name = dataset_name or "globfire"
+    output_dir = dataset_output_dir(context, stage="index", dataset_name=name)
+    with context.span("index_fetch", dataset=name):
+        frame = _update_globfire_store(
+            output_dir / PARTITIONS_DIRNAME,
+            start=start,
+            end=end,
+            min_size=min_size,
+            executor=context.executor,
+            batch_size=batch_size,
+            refresh_days=refresh_days,
+            cache=context.request_cache,
+        )
+    if context.request_cache is not None:
+        stats = context.request_cache.stats
+        logger.info(
+            "Request cache: %d hits, %d misses (%d expired)",
+            stats["hits"],
+            stats["misses"],
+            stats["expired"],
+        )
+    with context.span("index_write", dataset=name):
+        _save_index(
+            context,
+            dataset_name=name,
+            frame=frame,
+            export_csv=bool(options.get("export_csv", False)),
+        )
+    context.metrics.incr("rows_produced", len(frame), dataset=name)
     return frame
 
@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, Tuple
+from importlib import import_module
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 DatasetCallable = Callable[..., object]
+RestoreCallable = Callable[..., bool]
+CostCallable = Callable[..., object]
 
 
 @dataclass(frozen=True)
@@ -17,25 +20,96 @@ class DatasetKey:
         return DatasetKey(self.source.lower(), self.name.lower())
 
 
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Where a dataset is registered: importing ``module`` runs its registration."""
+
+    source: str
+    name: str
+    module: str
+
+
 class DatasetRegistry:
-    """Stores dataset fetch functions keyed by (source, name)."""
+    """Stores dataset fetch functions keyed by (source, name).
+
+    Datasets may be declared up front as :class:`DatasetSpec` metadata; the module
+    that registers a declared dataset is only imported when the dataset is resolved,
+    so listing or validating datasets does not import Earth Engine or GIS libraries.
+    """
 
     def __init__(self) -> None:
+        self._specs: Dict[Tuple[str, str], DatasetSpec] = {}
         self._datasets: Dict[Tuple[str, str], DatasetCallable] = {}
-
-    def register(self, *, source: str, name: str, func: DatasetCallable) -> None:
+        self._restorers: Dict[Tuple[str, str], RestoreCallable] = {}
+        self._costs: Dict[Tuple[str, str], CostCallable] = {}
+
+    def register(
+        self,
+        *,
+        source: str,
+        name: str,
+        func: DatasetCallable,
+        restore: Optional[RestoreCallable] = None,
+        cost: Optional[CostCallable] = None,
+    ) -> None:
         key = (source.lower(), name.lower())
         if key in self._datasets:
             raise ValueError(f"Dataset '{name}' for source '{source}' already registered")
         self._datasets[key] = func
+        if restore is not None:
+            self._restorers[key] = restore
+        if cost is not None:
+            self._costs[key] = cost
+
+    def declare(self, *, source: str, name: str, module: str) -> None:
+        """Declare that importing ``module`` registers the dataset ``(source, name)``."""
+        key = (source.lower(), name.lower())
+        existing = self._specs.get(key)
+        if existing is not None and existing.module != module:
+            raise ValueError(
+                f"Dataset '{name}' for source '{source}' already declared in {existing.module}"
+            )
+        self._specs[key] = DatasetSpec(source=key[0], name=key[1], module=module)
+
+    def is_known(self, *, source: str, name: str) -> bool:
+        """Whether the dataset is registered or declared, without importing anything."""
+        key = (source.lower(), name.lower())
+        return key in self._datasets or key in self._specs
+
+    def _resolve(self, key: Tuple[str, str]) -> None:
+        spec = self._specs.get(key)
+        if key not in self._datasets and spec is not None:
+            import_module(spec.module)
+
+    def specs(self) -> List[DatasetSpec]:
+        """Every declared or registered dataset, sorted, without importing any module."""
+        specs = dict(self._specs)
+        for key, func in self._datasets.items():
+            specs.setdefault(
+                key, DatasetSpec(source=key[0], name=key[1], module=func.__module__)
+            )
+        return [specs[key] for key in sorted(specs)]
 
     def get(self, *, source: str, name: str) -> DatasetCallable:
         key = (source.lower(), name.lower())
+        self._resolve(key)
         try:
             return self._datasets[key]
         except KeyError as exc:
             raise KeyError(f"No dataset registered for source='{source}' name='{name}'") from exc
 
+    def get_restore(self, *, source: str, name: str) -> Optional[RestoreCallable]:
+        """Return the callable that reloads a completed output into the context, if any."""
+        key = (source.lower(), name.lower())
+        self._resolve(key)
+        return self._restorers.get(key)
+
+    def get_cost(self, *, source: str, name: str) -> Optional[CostCallable]:
+        """Return the callable that estimates the dataset's work offline, if any."""
+        key = (source.lower(), name.lower())
+        self._resolve(key)
+        return self._costs.get(key)
+
     def items(self) -> Iterable[Tuple[Tuple[str, str], DatasetCallable]]:
         return self._datasets.items()
 
@@ -43,11 +117,26 @@ class DatasetRegistry:
 registry = DatasetRegistry()
 
 
-def register_dataset(*, source: str, name: str) -> Callable[[DatasetCallable], DatasetCallable]:
-    """Decorator used by dataset modules to register fetch functions."""
+def register_dataset(
+    *,
+    source: str,
+    name: str,
+    restore: Optional[RestoreCallable] = None,
+    cost: Optional[CostCallable] = None,
+) -> Callable[[DatasetCallable], DatasetCallable]:
+    """Decorator used by dataset modules to register fetch functions.
+
+    The pipeline calls ``func(context, options, dataset_name=...)`` with the name of
+    the config entry, which may differ from ``name``; outputs are written under it.
+    ``restore(context, output_dir)`` is optional; it reloads a previously completed
+    output into the context and returns ``False`` when the output cannot be reused.
+    ``cost(index, options, config)`` is optional too; it returns a
+    :class:`~raster_builder.planner.DatasetCost` estimate for ``raster-builder plan``
+    without touching any remote service.
+    """
 
     def decorator(func: DatasetCallable) -> DatasetCallable:
-        registry.register(source=source, name=name, func=func)
+        registry.register(source=source, name=name, func=func, restore=restore, cost=cost)
         return func
 
     return decorator
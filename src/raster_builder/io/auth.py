@@ -7,13 +7,13 @@ import logging
 from pathlib import Path
 from typing import Any, Optional
 
-import ee  # type: ignore
-
 logger = logging.getLogger(__name__)
 
 
 def authenticate_earth_engine(service_account_path: Path) -> str:
     """Authenticate the Earth Engine client using a service account JSON file."""
+    import ee  # type: ignore
+
     with service_account_path.open("r", encoding="utf-8") as handle:
         info = json.load(handle)
 
@@ -0,0 +1,106 @@
+"""Size-bounded LRU cache of fetched arrays on local disk."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .storage import atomic_output, file_lock
+
+__all__ = ["DiskCache", "cache_key"]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 2 * 1024**3
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable digest of JSON-serialisable ``parts``."""
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class DiskCache:
+    """Arrays stored as ``.npy`` files under ``root``, evicted least recently used first.
+
+    Reads refresh an entry's modification time, which is the recency eviction uses.
+    Filling a missing entry holds a per-key file lock, so concurrent threads or
+    processes asking for the same key fetch it once. Hits are memory-mapped.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return array
+
+    def get_or_fetch(self, key: str, fetch: Callable[[Path], None]) -> np.ndarray:
+        """Return the array for ``key``, calling ``fetch(path)`` to write it on a miss.
+
+        ``fetch`` must write an ``.npy`` file to the exact path it is given, for
+        example through :func:`numpy.lib.format.open_memmap` (``np.save`` would
+        append a suffix).
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        path = self._path(key)
+        with file_lock(path.with_suffix(".lock")):
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            with atomic_output(path) as tmp_path:
+                fetch(tmp_path)
+            # Map before evicting: an entry larger than the whole budget is still usable.
+            array = np.load(path, mmap_mode="r")
+        self.evict()
+        return array
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently used entries (and their lock files) until the cache fits.
+
+        Returns the bytes freed.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            # A fetch racing this still works; at worst the key is fetched twice.
+            path.with_suffix(".lock").unlink(missing_ok=True)
+            freed += size
+        if freed:
+            logger.debug("Evicted %d bytes from %s", freed, self.root)
+        return freed
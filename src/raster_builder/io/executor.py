@@ -0,0 +1,212 @@
+"""Shared thread pool for remote requests with retry and exponential backoff."""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Deque, Iterable, Iterator, Optional, TypeVar
+
+from ..config import ExecutionConfig
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..metrics import RunMetrics
+
+__all__ = ["RequestExecutor", "call_with_retry", "is_transient_error"]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+_STATUS_PATTERN = re.compile(r"\b(?:httperror|http|error|status|code)\W{0,3}(?:429|500|502|503|504)\b")
+# requests' connection errors do not derive from the builtin ConnectionError.
+_TRANSIENT_EXCEPTION_NAMES = {
+    "ConnectionError",
+    "ChunkedEncodingError",
+    "ReadTimeout",
+    "ConnectTimeout",
+}
+_TRANSIENT_MARKERS = (
+    "too many requests",
+    "too many concurrent",
+    "quota",
+    "capacity exceeded",
+    "rate limit",
+    "internal error",
+    "service unavailable",
+    "backend error",
+    "connection reset",
+    "temporarily",
+)
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return ``True`` for quota, throttling and transient server errors worth retrying."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ in _TRANSIENT_EXCEPTION_NAMES:
+        return True
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        try:
+            return int(status) in RETRY_STATUS_CODES
+        except (TypeError, ValueError):
+            pass
+    message = str(exc).lower()
+    if _STATUS_PATTERN.search(message):
+        return True
+    return any(marker in message for marker in _TRANSIENT_MARKERS)
+
+
+def call_with_retry(
+    func: Callable[..., R],
+    *args: Any,
+    max_retries: int = 5,
+    backoff_base: float = 1.0,
+    backoff_max: float = 60.0,
+    is_retryable: Callable[[BaseException], bool] = is_transient_error,
+    sleep: Callable[[float], None] = time.sleep,
+    rng: Optional[random.Random] = None,
+    on_event: Optional[Callable[[str], None]] = None,
+    **kwargs: Any,
+) -> R:
+    """Invoke ``func`` in the calling thread, retrying transient failures.
+
+    Delays grow exponentially from ``backoff_base`` up to ``backoff_max`` seconds with
+    full jitter. ``on_event`` receives ``"requests"``, ``"request_retries"`` and
+    ``"request_failures"`` so callers can count them.
+    """
+    rng = rng or random
+    notify = on_event or (lambda event: None)
+    attempt = 0
+    while True:
+        notify("requests")
+        try:
+            return func(*args, **kwargs)
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                notify("request_failures")
+                raise
+            notify("request_retries")
+            delay = rng.uniform(0, min(backoff_max, backoff_base * (2 ** attempt)))
+            attempt += 1
+            logger.warning(
+                "Transient request failure (%s); retry %d/%d in %.1fs",
+                exc,
+                attempt,
+                max_retries,
+                delay,
+            )
+            sleep(delay)
+
+
+class RequestExecutor:
+    """Run blocking remote calls on a bounded thread pool, retrying transient failures.
+
+    Dataset functions submit callables (usually ``ee.ComputedObject.getInfo``) and
+    receive futures. Each call is retried with exponential backoff and full jitter
+    when ``is_retryable`` accepts the raised exception. ``sleep`` and ``rng`` can be
+    replaced to exercise the retry logic against a fake backend without waiting.
+    Attempts, retries and failures are counted on ``metrics`` when given.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        *,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        is_retryable: Callable[[BaseException], bool] = is_transient_error,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: Optional[random.Random] = None,
+        metrics: Optional["RunMetrics"] = None,
+    ) -> None:
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._is_retryable = is_retryable
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._metrics = metrics
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="request")
+
+    @classmethod
+    def from_config(
+        cls,
+        config: ExecutionConfig,
+        metrics: Optional["RunMetrics"] = None,
+    ) -> "RequestExecutor":
+        return cls(
+            max_workers=config.max_concurrency,
+            max_retries=config.max_retries,
+            backoff_base=config.backoff_base,
+            backoff_max=config.backoff_max,
+            metrics=metrics,
+        )
+
+    def _count(self, event: str) -> None:
+        if self._metrics is not None:
+            self._metrics.incr(event)
+
+    def call(self, func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """Invoke ``func`` in the calling thread, retrying transient failures."""
+        return call_with_retry(
+            func,
+            *args,
+            max_retries=self.max_retries,
+            backoff_base=self.backoff_base,
+            backoff_max=self.backoff_max,
+            is_retryable=self._is_retryable,
+            sleep=self._sleep,
+            rng=self._rng,
+            on_event=self._count,
+            **kwargs,
+        )
+
+    def submit(self, func: Callable[..., R], *args: Any, **kwargs: Any) -> "Future[R]":
+        """Schedule ``func`` on the pool with retries and return its future."""
+        return self._pool.submit(self.call, func, *args, **kwargs)
+
+    def get_info(self, obj: Any) -> "Future[Any]":
+        """Schedule ``obj.getInfo()`` for an Earth Engine computed object."""
+        return self.submit(obj.getInfo)
+
+    def map(
+        self,
+        func: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        window: Optional[int] = None,
+    ) -> Iterator[R]:
+        """Yield ``func(item)`` in input order, keeping at most ``window`` calls in flight.
+
+        The window bounds how many completed-but-unconsumed results are held in memory.
+        """
+        window = window or self.max_workers * 2
+        pending: Deque["Future[R]"] = deque()
+        for item in items:
+            pending.append(self.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self) -> "RequestExecutor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
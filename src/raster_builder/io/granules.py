@@ -0,0 +1,286 @@
+"""NASA CMR granule search, deduplicated download plans and a content-keyed granule cache."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from urllib.parse import urlsplit
+
+from .executor import RequestExecutor, call_with_retry
+from .storage import atomic_output, file_lock
+
+__all__ = [
+    "Granule",
+    "GranulePlan",
+    "GranuleCache",
+    "GranuleDownloader",
+    "search_granules",
+    "plan_granules",
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CMR_URL = "https://cmr.earthdata.nasa.gov"
+CMR_PAGE_SIZE = 2000
+BBox = Tuple[float, float, float, float]
+SessionFactory = Callable[[], Any]
+
+
+@dataclass(frozen=True)
+class Granule:
+    """One downloadable granule file as described by CMR."""
+
+    concept_id: str
+    url: str
+    revision: str = ""
+    size: Optional[int] = None
+    checksum: Optional[str] = None
+    checksum_algorithm: Optional[str] = None
+
+    @property
+    def filename(self) -> str:
+        return Path(urlsplit(self.url).path).name
+
+    @property
+    def content_key(self) -> str:
+        """Key of the granule's content: its checksum, else concept id, revision and URL."""
+        if self.checksum:
+            identity = f"{self.checksum_algorithm or ''}:{self.checksum}"
+        else:
+            identity = f"{self.concept_id}:{self.revision}:{self.url}"
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_umm(cls, item: Mapping[str, Any]) -> List["Granule"]:
+        """Granule files of one ``granules.umm_json`` search result item."""
+        meta = item.get("meta", {})
+        umm = item.get("umm", {})
+        archive = (umm.get("DataGranule") or {}).get("ArchiveAndDistributionInformation") or []
+        details = {entry.get("Name"): entry for entry in archive}
+        granules = []
+        for related in umm.get("RelatedUrls") or []:
+            if related.get("Type") != "GET DATA" or not related.get("URL", "").startswith("http"):
+                continue
+            url = related["URL"]
+            entry = details.get(Path(urlsplit(url).path).name) or (
+                archive[0] if len(archive) == 1 else {}
+            )
+            checksum = entry.get("Checksum") or {}
+            size = entry.get("SizeInBytes")
+            granules.append(
+                cls(
+                    concept_id=str(meta.get("concept-id", umm.get("GranuleUR", url))),
+                    url=url,
+                    revision=str(meta.get("revision-id", "")),
+                    size=None if size is None else int(size),
+                    checksum=checksum.get("Value"),
+                    checksum_algorithm=checksum.get("Algorithm"),
+                )
+            )
+        return granules
+
+
+def search_granules(
+    session: Any,
+    *,
+    short_name: str,
+    bbox: BBox,
+    start: date,
+    end: date,
+    version: Optional[str] = None,
+    provider: Optional[str] = None,
+    cmr_url: str = DEFAULT_CMR_URL,
+) -> List[Granule]:
+    """Search CMR for granules of ``short_name`` intersecting ``bbox`` between two days.
+
+    Results are paged with the ``CMR-Search-After`` header.
+    """
+    params: Dict[str, Any] = {
+        "short_name": short_name,
+        "bounding_box": ",".join(str(value) for value in bbox),
+        "temporal": f"{start.isoformat()}T00:00:00Z,{end.isoformat()}T23:59:59Z",
+        "page_size": CMR_PAGE_SIZE,
+    }
+    if version:
+        params["version"] = version
+    if provider:
+        params["provider"] = provider
+    granules: List[Granule] = []
+    headers: Dict[str, str] = {}
+    while True:
+        response = session.get(
+            f"{cmr_url.rstrip('/')}/search/granules.umm_json",
+            params=params,
+            headers=headers,
+            timeout=60,
+        )
+        response.raise_for_status()
+        items = response.json().get("items", [])
+        for item in items:
+            granules.extend(Granule.from_umm(item))
+        search_after = response.headers.get("CMR-Search-After")
+        if not items or not search_after or len(items) < CMR_PAGE_SIZE:
+            return granules
+        headers = {"CMR-Search-After": search_after}
+
+
+@dataclass
+class GranulePlan:
+    """The distinct granules needed for all fires and which fires need each."""
+
+    granules: Dict[str, Granule] = field(default_factory=dict)
+    fires: Dict[str, Set[Any]] = field(default_factory=dict)
+    searches: int = 0
+
+    def add(self, fire_id: Any, granules: Iterable[Granule]) -> None:
+        self.searches += 1
+        for granule in granules:
+            self.granules.setdefault(granule.content_key, granule)
+            self.fires.setdefault(granule.content_key, set()).add(fire_id)
+
+
+def plan_granules(
+    queries: Iterable[Tuple[Any, BBox, date, date]],
+    search: Callable[[BBox, date, date], List[Granule]],
+    executor: RequestExecutor,
+) -> GranulePlan:
+    """Run ``search`` for every ``(fire_id, bbox, start, end)`` and deduplicate the results.
+
+    Searches run concurrently on ``executor``; granules shared by several fires are
+    planned once.
+    """
+    plan = GranulePlan()
+    queries = list(queries)
+    results = executor.map(lambda query: search(*query[1:]), queries)
+    for (fire_id, *_), granules in zip(queries, results):
+        plan.add(fire_id, granules)
+    return plan
+
+
+class GranuleCache:
+    """Granule files stored under ``root/<key[:2]>/<content key>/<filename>``."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def path(self, granule: Granule) -> Path:
+        key = granule.content_key
+        return self.root / key[:2] / key / granule.filename
+
+    def get(self, granule: Granule) -> Optional[Path]:
+        path = self.path(granule)
+        if not path.is_file():
+            return None
+        if granule.size is not None and path.stat().st_size != granule.size:
+            return None
+        return path
+
+
+def _hasher(algorithm: Optional[str]) -> Optional[Any]:
+    name = (algorithm or "").replace("-", "").lower()
+    return hashlib.new(name) if name in hashlib.algorithms_available else None
+
+
+class GranuleDownloader:
+    """Download granules concurrently into a :class:`GranuleCache`.
+
+    Each worker thread keeps its own session from ``session_factory`` (for
+    Earthdata, ``earthaccess.get_requests_https_session``), so connections are
+    pooled and reused across the granules it downloads (callers may borrow them via
+    :meth:`session`, e.g. for CMR searches). Cached granules are never
+    fetched again; concurrent requests for one granule download it once.
+    """
+
+    def __init__(
+        self,
+        cache: GranuleCache,
+        session_factory: SessionFactory,
+        *,
+        workers: int = 8,
+        max_retries: int = 5,
+        chunk_size: int = 1 << 20,
+        metrics: Optional[Any] = None,
+    ) -> None:
+        self.cache = cache
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.metrics = metrics
+        self._session_factory = session_factory
+        self._local = threading.local()
+        self._sessions: List[Any] = []
+        self._lock = threading.Lock()
+
+    def session(self) -> Any:
+        """The calling thread's pooled session, created on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._session_factory()
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def _count(self, name: str, value: float = 1) -> None:
+        if self.metrics is not None:
+            self.metrics.incr(name, value)
+
+    def download(self, granule: Granule) -> Path:
+        """Return the cached path of ``granule``, downloading it first if needed."""
+        cached = self.cache.get(granule)
+        if cached is not None:
+            self._count("granules_cached")
+            return cached
+        path = self.cache.path(granule)
+        with file_lock(path.parent.with_name(f".{path.parent.name}.lock")):
+            cached = self.cache.get(granule)
+            if cached is not None:
+                self._count("granules_cached")
+                return cached
+            return call_with_retry(
+                self._fetch, granule, path, max_retries=self.max_retries, on_event=self._count
+            )
+
+    def _fetch(self, granule: Granule, path: Path) -> Path:
+        hasher = _hasher(granule.checksum_algorithm) if granule.checksum else None
+        written = 0
+        with atomic_output(path) as tmp_path:
+            with self.session().get(granule.url, stream=True, timeout=300) as response:
+                response.raise_for_status()
+                with tmp_path.open("wb") as handle:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        handle.write(chunk)
+                        written += len(chunk)
+                        if hasher is not None:
+                            hasher.update(chunk)
+            if granule.size is not None and written != granule.size:
+                raise IOError(f"Granule {granule.url}: got {written} of {granule.size} bytes")
+            if hasher is not None and hasher.hexdigest().lower() != granule.checksum.lower():
+                raise IOError(f"Granule {granule.url}: checksum mismatch")
+        self._count("granules_downloaded")
+        self._count("bytes_downloaded", written)
+        return path
+
+    def download_all(self, granules: Sequence[Granule]) -> Dict[str, Path]:
+        """Download every granule and map content keys to cached paths."""
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="granule") as pool:
+            paths = pool.map(self.download, granules)
+            return {granule.content_key: path for granule, path in zip(granules, paths)}
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self) -> "GranuleDownloader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,151 @@
+"""Crash-safe journal of work unit progress backed by SQLite."""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+__all__ = ["RunJournal", "file_checksum", "UNIT_STATES"]
+
+UNIT_STATES = ("pending", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    dataset TEXT NOT NULL,
+    unit TEXT NOT NULL,
+    state TEXT NOT NULL,
+    output_path TEXT,
+    checksum TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (dataset, unit)
+)
+"""
+
+
+def file_checksum(path: Path, *, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """Record the state of every work unit so an interrupted run can resume.
+
+    Each state change is committed immediately (WAL mode), so after a crash units
+    are either ``done`` with an output whose checksum was recorded, or they are
+    picked up again on the next run. Units without a row are pending, and ``done``
+    units whose output has gone missing are treated as incomplete.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+
+    def _set(
+        self,
+        dataset: str,
+        unit: str,
+        state: str,
+        *,
+        output_path: Optional[Path] = None,
+        checksum: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    dataset,
+                    unit,
+                    state,
+                    None if output_path is None else str(output_path),
+                    checksum,
+                    error,
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def mark_running(self, dataset: str, unit: str) -> None:
+        self._set(dataset, unit, "running")
+
+    def mark_done(self, dataset: str, unit: str, output_path: Optional[Path]) -> None:
+        """Record a finished unit, checksumming its output file if it produced one."""
+        checksum = None
+        if output_path is not None and Path(output_path).is_file():
+            checksum = file_checksum(Path(output_path))
+        self._set(dataset, unit, "done", output_path=output_path, checksum=checksum)
+
+    def mark_failed(self, dataset: str, unit: str, error: BaseException) -> None:
+        self._set(dataset, unit, "failed", error=f"{type(error).__name__}: {error}")
+
+    def states(self, dataset: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT unit, state FROM units WHERE dataset = ?", (dataset,)
+            ).fetchall()
+        return dict(rows)
+
+    def outputs(self, dataset: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """Yield ``(unit, output_path, checksum)`` for every completed unit."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT unit, output_path, checksum FROM units WHERE dataset = ? AND state = 'done'",
+                (dataset,),
+            ).fetchall()
+        yield from rows
+
+    def completed_units(self, dataset: str, *, verify_checksums: bool = False) -> set[str]:
+        """Return the units that finished and whose outputs still exist.
+
+        With ``verify_checksums`` every output is re-hashed and compared to the
+        recorded checksum, which is thorough but reads every file.
+        """
+        completed: set[str] = set()
+        for unit, output_path, checksum in self.outputs(dataset):
+            if output_path is not None:
+                path = Path(output_path)
+                if not path.exists():
+                    continue
+                if (
+                    verify_checksums
+                    and checksum is not None
+                    and path.is_file()
+                    and file_checksum(path) != checksum
+                ):
+                    continue
+            completed.add(unit)
+        return completed
+
+    def reset(self, dataset: str, units: Optional[Iterable[str]] = None) -> None:
+        """Forget recorded progress for a dataset, or only for the given units."""
+        with self._lock:
+            if units is None:
+                self._connection.execute("DELETE FROM units WHERE dataset = ?", (dataset,))
+            else:
+                self._connection.executemany(
+                    "DELETE FROM units WHERE dataset = ? AND unit = ?",
+                    [(dataset, unit) for unit in units],
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
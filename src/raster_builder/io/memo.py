@@ -0,0 +1,216 @@
+"""Persistent memoization of Earth Engine computations keyed by their serialized expression."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .executor import is_transient_error
+from .storage import atomic_output
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..metrics import RunMetrics
+
+__all__ = ["RequestCache", "asset_version"]
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def asset_version(asset_id: str) -> str:
+    """``updateTime`` of an Earth Engine asset, so re-ingested assets get new cache keys.
+
+    Falls back to ``"unknown"`` (and the cache TTL) when the asset cannot be inspected;
+    transient errors are raised so the request executor retries them.
+    """
+    import ee  # type: ignore
+
+    try:
+        return str(ee.data.getAsset(asset_id).get("updateTime", ""))
+    except Exception as exc:  # noqa: BLE001 - any metadata failure just weakens the key
+        if is_transient_error(exc):
+            raise  # let the request executor retry it
+        logger.warning("Could not read the version of asset %s: %s", asset_id, exc)
+        return "unknown"
+
+
+class RequestCache:
+    """Results of Earth Engine computations stored under ``root`` as gzip-compressed JSON.
+
+    Keys hash an expression's ``serialize()`` output with the versions of the assets
+    it reads. Entries older than ``ttl_seconds`` are discarded when read; reads refresh
+    an entry's modification time and the least recently read entries are evicted
+    once the cache exceeds ``max_bytes``. The cache's size is scanned once and then
+    tracked as entries are written, so eviction only rescans when it is over budget.
+    Results that arrive in pages are stored page by page (:meth:`put_page`,
+    :meth:`put_pages`, :meth:`get_pages`). Hits and misses are counted in
+    :attr:`stats` and, with ``metrics``, as ``request_cache_hits``/``_misses``.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int,
+        ttl_seconds: Optional[float] = None,
+        metrics: Optional["RunMetrics"] = None,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.metrics = metrics
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "expired": 0}
+        self._lock = threading.Lock()
+        # Bytes on disk as written by this process; None until the first write scans.
+        self._size: Optional[int] = None
+        root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(expression: Any, *versions: str) -> str:
+        """Digest of an ``ee`` object (or its serialized form) and asset versions."""
+        serialized = expression if isinstance(expression, str) else expression.serialize()
+        digest = hashlib.sha256(serialized.encode("utf-8"))
+        for version in versions:
+            digest.update(b"\0" + version.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def _count(self, outcome: str, label: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+        if self.metrics is not None:
+            self.metrics.incr(f"request_cache_{outcome}", query=label)
+
+    def _read(self, key: str, *, check_ttl: bool = True) -> Tuple[str, Any]:
+        """``("hits", value)``, ``("misses", None)`` or ``("expired", None)``, uncounted."""
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                record = json.load(handle)
+        except (OSError, ValueError, EOFError):
+            return "misses", None
+        if (
+            check_ttl
+            and self.ttl_seconds is not None
+            and time.time() - record["created"] > self.ttl_seconds
+        ):
+            path.unlink(missing_ok=True)
+            return "expired", None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return "hits", record["value"]
+
+    def _miss(self, outcome: str, label: str) -> None:
+        if outcome == "expired":
+            self._count("expired", label)
+        self._count("misses", label)
+
+    def get(self, key: str, default: Any = None, *, label: str = "") -> Any:
+        """The cached result for ``key``, or ``default`` when missing or expired."""
+        outcome, value = self._read(key)
+        if outcome != "hits":
+            self._miss(outcome, label)
+            return default
+        self._count("hits", label)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-serialisable result, evicting once the cache exceeds ``max_bytes``."""
+        path = self._path(key)
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        with atomic_output(path) as tmp_path:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as handle:
+                json.dump({"created": time.time(), "value": value}, handle)
+            written = tmp_path.stat().st_size
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()
+            else:
+                self._size += written - replaced
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    @classmethod
+    def page_key(cls, key: str, page: int) -> str:
+        """Key of page ``page`` of the paged result stored under ``key``."""
+        return cls.key(key, "page", str(page))
+
+    def put_page(self, key: str, page: int, value: Any) -> None:
+        """Store one page of a paged result; it is found once :meth:`put_pages` runs."""
+        self.put(self.page_key(key, page), value)
+
+    def put_pages(self, key: str, pages: int) -> None:
+        """Complete a paged result whose ``pages`` pages were stored with :meth:`put_page`."""
+        self.put(key, {"pages": pages})
+
+    def get_pages(self, key: str, *, label: str = "") -> Optional[List[Any]]:
+        """The pages of a complete paged result, or ``None`` if it or any page is gone."""
+        outcome, manifest = self._read(key)
+        if outcome == "hits" and not (isinstance(manifest, dict) and "pages" in manifest):
+            outcome = "misses"  # an entry written as a whole
+        pages: List[Any] = []
+        if outcome == "hits":
+            for page in range(int(manifest["pages"])):
+                # The manifest's age covers its pages, which were written just before it.
+                outcome, value = self._read(self.page_key(key, page), check_ttl=False)
+                if outcome != "hits":
+                    break
+                pages.append(value)
+        if outcome != "hits":
+            self._miss(outcome, label)
+            return None
+        self._count("hits", label)
+        return pages
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], *, label: str = "") -> Any:
+        """Return the cached result for ``key``, calling ``compute()`` and storing it on a miss."""
+        value = self.get(key, _MISSING, label=label)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        for path in self.root.glob("*/*.json.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """Delete least recently read entries until the cache fits; return bytes freed."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in entries:
+            if total - freed <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            freed += size
+        with self._lock:
+            self._size = total - freed
+        if freed:
+            logger.debug("Evicted %d bytes from %s", freed, self.root)
+        return freed
@@ -0,0 +1,312 @@
+"""Direct pixel fetches from Earth Engine and GeoTIFF output."""
+
+from __future__ import annotations
+
+import math
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from .storage import atomic_output
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .executor import RequestExecutor
+
+__all__ = [
+    "PixelGrid",
+    "compute_pixels",
+    "fetch_into",
+    "fetch_pixels",
+    "fetch_to_geotiff",
+    "geotiff_sink",
+    "plan_tiles",
+    "write_geotiff",
+]
+
+DEFAULT_NODATA = -9999.0
+# computePixels rejects responses over 48 MiB or grids wider than 32768 pixels; the byte
+# budget leaves headroom for the response envelope.
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+MAX_REQUEST_DIMENSION = 32768
+BLOCK_SIZE = 256
+
+PixelFetcher = Callable[[Dict[str, Any]], Any]
+WindowSink = Callable[[np.ndarray, int, int], None]
+
+
+@dataclass(frozen=True)
+class PixelGrid:
+    """North-up pixel grid: top-left corner ``(x0, y0)`` in ``crs`` units and square pixels."""
+
+    crs: str
+    x0: float
+    y0: float
+    resolution: float
+    width: int
+    height: int
+
+    @classmethod
+    def from_bbox(
+        cls,
+        bbox: Tuple[float, float, float, float],
+        crs: str,
+        resolution: float,
+    ) -> "PixelGrid":
+        """Cover a lon/lat bbox with a grid in ``crs`` snapped to multiples of ``resolution``.
+
+        Snapping means grids built for overlapping boxes share pixel boundaries, so a
+        larger fetch can later be cropped exactly into smaller ones.
+        """
+        from pyproj import Transformer
+
+        transformer = Transformer.from_crs("EPSG:4326", crs, always_xy=True)
+        min_x, min_y, max_x, max_y = transformer.transform_bounds(*bbox)
+        x0 = math.floor(min_x / resolution) * resolution
+        y0 = math.ceil(max_y / resolution) * resolution
+        x1 = math.ceil(max_x / resolution) * resolution
+        y1 = math.floor(min_y / resolution) * resolution
+        return cls(
+            crs=crs,
+            x0=x0,
+            y0=y0,
+            resolution=resolution,
+            width=max(1, int(round((x1 - x0) / resolution))),
+            height=max(1, int(round((y0 - y1) / resolution))),
+        )
+
+    def subgrid(self, col_off: int, row_off: int, width: int, height: int) -> "PixelGrid":
+        """The window of this grid starting at pixel ``(col_off, row_off)``."""
+        return PixelGrid(
+            crs=self.crs,
+            x0=self.x0 + col_off * self.resolution,
+            y0=self.y0 - row_off * self.resolution,
+            resolution=self.resolution,
+            width=width,
+            height=height,
+        )
+
+    @property
+    def transform(self) -> Tuple[float, float, float, float, float, float]:
+        """GDAL-ordered affine coefficients ``(a, b, c, d, e, f)``."""
+        return (self.resolution, 0.0, self.x0, 0.0, -self.resolution, self.y0)
+
+    def to_request(self) -> Dict[str, Any]:
+        """The ``grid`` parameter of an Earth Engine ``computePixels`` request."""
+        return {
+            "dimensions": {"width": self.width, "height": self.height},
+            "affineTransform": {
+                "scaleX": self.resolution,
+                "shearX": 0,
+                "translateX": self.x0,
+                "shearY": 0,
+                "scaleY": -self.resolution,
+                "translateY": self.y0,
+            },
+            "crsCode": self.crs,
+        }
+
+
+def compute_pixels(request: Dict[str, Any]) -> Any:
+    """Send a ``computePixels`` request to Earth Engine."""
+    import ee  # type: ignore
+
+    return ee.data.computePixels(request)
+
+
+def plan_tiles(
+    grid: PixelGrid,
+    band_count: int,
+    *,
+    bytes_per_value: int = 4,
+    max_bytes: int = MAX_REQUEST_BYTES,
+    max_dimension: int = MAX_REQUEST_DIMENSION,
+) -> List[Tuple[int, int, PixelGrid]]:
+    """Split ``grid`` into ``(col_off, row_off, subgrid)`` tiles that fit one request.
+
+    Tiles span the full width when a block row fits; otherwise they are squares with
+    sides that are multiples of the GeoTIFF block size, so each tile writes whole blocks.
+    """
+    max_pixels = max(1, max_bytes // (max(1, band_count) * bytes_per_value))
+    if grid.width * grid.height <= max_pixels and max(grid.width, grid.height) <= max_dimension:
+        return [(0, 0, grid)]
+    tile_width = min(grid.width, max_dimension)
+    if tile_width * min(grid.height, BLOCK_SIZE) > max_pixels:
+        side = min(max_dimension, math.isqrt(max_pixels))
+        tile_width = side - side % BLOCK_SIZE if side >= BLOCK_SIZE else side
+    tile_height = min(grid.height, max_dimension, max(1, max_pixels // tile_width))
+    if tile_height >= BLOCK_SIZE:
+        tile_height -= tile_height % BLOCK_SIZE
+    tiles = []
+    for row in range(0, grid.height, tile_height):
+        height = min(tile_height, grid.height - row)
+        for col in range(0, grid.width, tile_width):
+            width = min(tile_width, grid.width - col)
+            tiles.append((col, row, grid.subgrid(col, row, width, height)))
+    return tiles
+
+
+def fetch_pixels(
+    image: Any,
+    grid: PixelGrid,
+    band_names: Sequence[str],
+    *,
+    fetcher: Optional[PixelFetcher] = None,
+) -> np.ndarray:
+    """Fetch ``image`` on ``grid`` and return a ``(bands, height, width)`` float32 array.
+
+    ``fetcher`` defaults to :func:`compute_pixels`; a local fake returning a
+    structured array with one field per band can stand in for Earth Engine.
+    """
+    request = {
+        "expression": image,
+        "fileFormat": "NUMPY_NDARRAY",
+        "grid": grid.to_request(),
+        "bandIds": list(band_names),
+    }
+    data = (fetcher or compute_pixels)(request)
+    if data.dtype.names:
+        return np.stack([data[name] for name in band_names]).astype(np.float32, copy=False)
+    array = np.asarray(data, dtype=np.float32)
+    return array if array.ndim == 3 else array[np.newaxis]
+
+
+def _geotiff_profile(
+    grid: PixelGrid,
+    count: int,
+    dtype: str,
+    nodata: float,
+    profile: Optional[Mapping[str, Any]],
+) -> Dict[str, Any]:
+    from rasterio.transform import Affine
+
+    options: Dict[str, Any] = {
+        "driver": "GTiff",
+        "dtype": dtype,
+        "count": count,
+        "height": grid.height,
+        "width": grid.width,
+        "crs": grid.crs,
+        "transform": Affine(*grid.transform),
+        "nodata": nodata,
+        "compress": "deflate",
+        "tiled": True,
+        "blockxsize": BLOCK_SIZE,
+        "blockysize": BLOCK_SIZE,
+    }
+    options.update(profile or {})
+    if grid.width < BLOCK_SIZE or grid.height < BLOCK_SIZE:
+        options["tiled"] = False
+        options.pop("blockxsize", None)
+        options.pop("blockysize", None)
+    return options
+
+
+def write_geotiff(
+    path: Path,
+    array: np.ndarray,
+    grid: PixelGrid,
+    band_names: Sequence[str],
+    *,
+    nodata: float = DEFAULT_NODATA,
+    profile: Optional[Mapping[str, Any]] = None,
+) -> Path:
+    """Write a ``(bands, height, width)`` array as a tiled, compressed GeoTIFF, atomically."""
+    import rasterio
+
+    options = _geotiff_profile(grid, array.shape[0], str(array.dtype), nodata, profile)
+    with atomic_output(path) as tmp_path:
+        with rasterio.open(tmp_path, "w", **options) as dataset:
+            dataset.write(array)
+            for index, name in enumerate(band_names, start=1):
+                dataset.set_band_description(index, name)
+    return path
+
+
+@contextmanager
+def geotiff_sink(
+    path: Path,
+    grid: PixelGrid,
+    band_names: Sequence[str],
+    *,
+    nodata: float = DEFAULT_NODATA,
+    profile: Optional[Mapping[str, Any]] = None,
+) -> Iterator[WindowSink]:
+    """Open a GeoTIFF for ``grid`` and yield a sink writing ``(array, col_off, row_off)``.
+
+    The file is written to a temporary path and moved into place when the block exits.
+    """
+    import rasterio
+    from rasterio.windows import Window
+
+    options = _geotiff_profile(grid, len(band_names), "float32", nodata, profile)
+    with atomic_output(path) as tmp_path:
+        with rasterio.open(tmp_path, "w", **options) as dataset:
+
+            def write(array: np.ndarray, col_off: int, row_off: int) -> None:
+                window = Window(col_off, row_off, array.shape[2], array.shape[1])
+                dataset.write(array, window=window)
+
+            yield write
+            for index, name in enumerate(band_names, start=1):
+                dataset.set_band_description(index, name)
+
+
+def fetch_into(
+    image: Any,
+    grid: PixelGrid,
+    band_names: Sequence[str],
+    sink: WindowSink,
+    *,
+    executor: "RequestExecutor",
+    max_bytes: int = MAX_REQUEST_BYTES,
+    fetcher: Optional[PixelFetcher] = None,
+) -> int:
+    """Fetch ``image`` on ``grid`` into ``sink``, tiling requests that exceed the limits.
+
+    Tiles from :func:`plan_tiles` are requested on ``executor`` (the run's executor,
+    so its concurrency limit, retries and request counters apply) and handed to
+    ``sink`` by the calling thread as they arrive in order, so at most a bounded
+    number of tiles is held in memory and the full mosaic never is. Returns the
+    number of bytes fetched.
+    """
+    tiles = plan_tiles(grid, len(band_names), max_bytes=max_bytes)
+
+    def fetch_tile(tile: Tuple[int, int, PixelGrid]) -> np.ndarray:
+        return fetch_pixels(image, tile[2], band_names, fetcher=fetcher)
+
+    fetched = 0
+    arrays = executor.map(fetch_tile, tiles, window=executor.max_workers * 2)
+    for (col, row, _), array in zip(tiles, arrays):
+        sink(array, col, row)
+        fetched += array.nbytes
+    return fetched
+
+
+def fetch_to_geotiff(
+    image: Any,
+    grid: PixelGrid,
+    band_names: Sequence[str],
+    path: Path,
+    *,
+    nodata: float = DEFAULT_NODATA,
+    profile: Optional[Mapping[str, Any]] = None,
+    **fetch_options: Any,
+) -> Path:
+    """Fetch ``image`` on ``grid`` into a GeoTIFF at ``path`` (see :func:`fetch_into`)."""
+    with geotiff_sink(path, grid, band_names, nodata=nodata, profile=profile) as sink:
+        fetch_into(image, grid, band_names, sink, **fetch_options)
+    return path
@@ -0,0 +1,133 @@
+"""Arrow tables published once in shared memory and attached read-only by worker processes."""
+
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pyarrow as pa
+
+__all__ = ["SharedTable", "SharedTableHandle", "index_table", "to_arrow_table"]
+
+logger = logging.getLogger(__name__)
+
+# Attachments of this process, kept open for its lifetime: tables built on them point
+# straight into the shared mapping, so it must outlive every slice handed out.
+_ATTACHED: Dict[str, Tuple[shared_memory.SharedMemory, "pa.Table"]] = {}
+_ATTACH_LOCK = threading.Lock()
+
+
+def to_arrow_table(data: Any) -> Optional["pa.Table"]:
+    """Convert an Arrow table/batch or (Geo)DataFrame to an Arrow table (geometry as WKB)."""
+    import pyarrow as pa
+
+    if data is None:
+        return None
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    geometry = getattr(data, "geometry", None) if hasattr(data, "set_geometry") else None
+    if geometry is not None:
+        import pandas as pd
+
+        name = geometry.name or "geometry"
+        data = pd.DataFrame(data).assign(**{name: geometry.to_wkb()})
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+def index_table(index: Any) -> "pa.Table":
+    """The index as an Arrow table; geometries become WKB in a ``geometry`` column."""
+    import pyarrow as pa
+
+    return to_arrow_table(index) if index is not None else pa.table({})
+
+
+@dataclass(frozen=True)
+class SharedTableHandle:
+    """Picklable reference to a :class:`SharedTable`; a few dozen bytes per task."""
+
+    name: str
+    size: int
+
+    def attach(self) -> "pa.Table":
+        """The published table, mapped read-only without copying; cached per process."""
+        import pyarrow as pa
+
+        with _ATTACH_LOCK:
+            attached = _ATTACHED.get(self.name)
+            if attached is None:
+                memory = _open(self.name)
+                buffer = pa.py_buffer(memory.buf)[: self.size]
+                table = pa.ipc.open_file(pa.BufferReader(buffer)).read_all()
+                attached = _ATTACHED[self.name] = (memory, table)
+        return attached[1]
+
+    def slice(self, offset: int, length: int) -> "pa.Table":
+        """Rows ``offset:offset + length`` of the published table (zero-copy)."""
+        return self.attach().slice(offset, length)
+
+
+def _open(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _write(memory: shared_memory.SharedMemory, table: "pa.Table") -> None:
+    # The Arrow buffer exports ``memory.buf``; it must be gone before the block can close.
+    import pyarrow as pa
+
+    stream = pa.FixedSizeBufferWriter(pa.py_buffer(memory.buf))
+    with pa.ipc.new_file(stream, table.schema) as writer:
+        writer.write_table(table)
+    stream.close()
+
+
+class SharedTable:
+    """An Arrow table serialized once into a ``multiprocessing.shared_memory`` block.
+
+    Pass :attr:`handle` (plus row ranges) to worker processes instead of the rows
+    themselves; :meth:`SharedTableHandle.attach` maps the block in each worker, so
+    per-task messages and per-worker memory stay constant as the table grows.
+    Use as a context manager; the block is unlinked on exit, after the pool using it
+    has shut down.
+    """
+
+    def __init__(self, table: "pa.Table") -> None:
+        import pyarrow as pa
+
+        sink = pa.MockOutputStream()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        size = sink.size()
+        self.num_rows = table.num_rows
+        self._memory: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(
+            create=True, size=max(size, 1)
+        )
+        try:
+            _write(self._memory, table)
+        except BaseException:
+            self.close()
+            raise
+        self.handle = SharedTableHandle(name=self._memory.name, size=size)
+        logger.debug("Published %d rows (%d bytes) as %s", self.num_rows, size, self.handle.name)
+
+    def close(self) -> None:
+        """Release and unlink the block; workers still attached keep their mapping."""
+        if self._memory is None:
+            return
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+
+    def __enter__(self) -> "SharedTable":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
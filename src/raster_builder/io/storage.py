@@ -2,21 +2,550 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
 from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
+from ..config import ConfigError
 from ..context import PipelineContext
 
-__all__ = ["dataset_output_dir"]
+if TYPE_CHECKING:  # pragma: no cover
+    import geopandas as gpd
+    import numpy as np
+
+    from .pixels import PixelGrid, WindowSink
+
+__all__ = [
+    "atomic_output",
+    "dataset_output_dir",
+    "read_fingerprint",
+    "write_fingerprint",
+    "clear_fingerprint",
+    "clear_outputs",
+    "write_index",
+    "read_index",
+    "partition_path",
+    "iter_partitions",
+    "file_lock",
+    "RasterWriter",
+    "GeoTiffWriter",
+    "ZarrCubeWriter",
+    "CogCubeWriter",
+    "RASTER_WRITERS",
+    "raster_writer",
+]
+
+FINGERPRINT_FILENAME = ".fingerprint.json"
 
 
 def dataset_output_dir(context: PipelineContext, stage: str, dataset_name: str) -> Path:
-    """Return a directory for storing outputs related to a dataset."""
+    """Return a directory for storing outputs related to a dataset.
+
+    Sharded runs keep everything but the shared index in their shard's directory.
+    """
 
     if stage in {"index", "earthengine"}:
         root = context.raw_path
     else:
         root = context.processed_path
+    if context.shard is not None and stage != "index":
+        root = context.shard.directory(root)
 
     output = root / stage / dataset_name
     output.mkdir(parents=True, exist_ok=True)
     return output
+
+
+@contextmanager
+def atomic_output(path: Path) -> Iterator[Path]:
+    """Yield a temporary sibling of ``path`` that replaces ``path`` only on success.
+
+    Readers never observe a half-written file: the temporary file is renamed into
+    place atomically after the block completes and removed if it raises.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def read_fingerprint(output_dir: Path, *, pending: bool = False) -> Optional[str]:
+    """Return the fingerprint of the last completed run stored in ``output_dir``.
+
+    With ``pending``, also return the fingerprint of a run that started rebuilding
+    the output but did not complete: the one the files in ``output_dir`` belong to.
+    """
+
+    path = output_dir / FINGERPRINT_FILENAME
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            record = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not pending and record.get("completed_at") is None:
+        return None
+    return record.get("fingerprint")
+
+
+def write_fingerprint(output_dir: Path, fingerprint: str, *, completed: bool = True) -> None:
+    """Mark the output in ``output_dir`` as complete for ``fingerprint``.
+
+    With ``completed=False`` the output is marked as being rebuilt for ``fingerprint``
+    instead; :func:`read_fingerprint` only reports it with ``pending=True``.
+    """
+
+    record = {
+        "fingerprint": fingerprint,
+        "completed_at": datetime.now(timezone.utc).isoformat() if completed else None,
+    }
+    with atomic_output(output_dir / FINGERPRINT_FILENAME) as tmp_path:
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(record, handle)
+
+
+def clear_fingerprint(output_dir: Path) -> None:
+    """Invalidate the completion marker before an output is rebuilt."""
+
+    (output_dir / FINGERPRINT_FILENAME).unlink(missing_ok=True)
+
+
+def clear_outputs(output_dir: Path) -> None:
+    """Delete everything in ``output_dir`` but its fingerprint, so no stale file survives."""
+
+    for path in output_dir.iterdir():
+        if path.name == FINGERPRINT_FILENAME:
+            continue
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+
+def write_index(frame: "gpd.GeoDataFrame", path: Path) -> Path:
+    """Write an index table as GeoParquet (WKB geometry, native timestamp columns)."""
+
+    with atomic_output(path) as tmp_path:
+        frame.to_parquet(tmp_path, index=False, compression="zstd")
+    return path
+
+
+def read_index(
+    path: Path,
+    *,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Any] = None,
+    memory_map: bool = True,
+) -> Any:
+    """Read an index written by :func:`write_index`.
+
+    Only the requested ``columns`` are decoded and the file is memory-mapped by
+    default. A ``GeoDataFrame`` is returned when the geometry column is included,
+    otherwise a plain ``DataFrame``. ``filters`` are passed to pyarrow row-group
+    pruning, e.g. ``[("IDate", ">=", pd.Timestamp("2021-06-01"))]``.
+    """
+
+    if columns is not None and "geometry" not in columns:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, columns=list(columns), filters=filters, memory_map=memory_map)
+        return table.to_pandas()
+
+    import geopandas as gpd
+
+    return gpd.read_parquet(
+        path,
+        columns=None if columns is None else list(columns),
+        filters=filters,
+        memory_map=memory_map,
+    )
+
+
+def partition_path(root: Path, year: int, month: int) -> Path:
+    """Return the GeoParquet file holding the rows of one year/month partition."""
+
+    path = root / f"year={year:04d}" / f"month={month:02d}" / "part.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def iter_partitions(root: Path) -> list[Path]:
+    """List the partition files below ``root`` in chronological order."""
+
+    return sorted(root.glob("year=*/month=*/part.parquet"))
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``path`` against other threads and processes."""
+
+    import fcntl
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _default_nodata(nodata: Optional[float]) -> float:
+    from .pixels import DEFAULT_NODATA
+
+    return DEFAULT_NODATA if nodata is None else nodata
+
+
+class RasterWriter(ABC):
+    """Destination for the ``(band, y, x)`` rasters of each fire-day.
+
+    Handlers open a day with :meth:`open_day`, feed the yielded sink
+    ``(array, col_off, row_off)`` windows and report :meth:`output_path` as their
+    output. :meth:`finalize` runs once after all units of a dataset. Writers that
+    lock shared files keep the lock files in ``lock_dir`` (default: next to them).
+    """
+
+    format = ""
+
+    def __init__(self, root: Path, *, lock_dir: Optional[Path] = None) -> None:
+        self.root = root
+        self.lock_dir = lock_dir
+
+    def lock_path(self, path: Path) -> Path:
+        """Lock file guarding ``path``; unique per path inside a shared ``lock_dir``."""
+        if self.lock_dir is None:
+            return path.with_name(f".{path.name}.lock")
+        digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+        return self.lock_dir / f"{path.name}.{digest}.lock"
+
+    @abstractmethod
+    def output_path(self, fire_id: Any, day: date) -> Path:
+        """The file (or store) a fire-day is reported as written to."""
+
+    @abstractmethod
+    def open_day(
+        self,
+        fire_id: Any,
+        day: date,
+        grid: "PixelGrid",
+        band_names: Sequence[str],
+        *,
+        nodata: Optional[float] = None,
+    ) -> "ContextManager[WindowSink]":
+        """Context manager yielding a sink for a fire-day's windows; commits on exit."""
+
+    @abstractmethod
+    def read_day(self, fire_id: Any, day: date) -> "np.ndarray":
+        """The ``(band, y, x)`` array written for a fire-day."""
+
+    def finalize(self) -> List[Path]:
+        return []
+
+
+class GeoTiffWriter(RasterWriter):
+    """One GeoTIFF per fire and day: ``<fire id>/<YYYY-MM-DD>.tif``."""
+
+    format = "geotiff"
+
+    def output_path(self, fire_id: Any, day: date) -> Path:
+        return self.root / str(fire_id) / f"{day.isoformat()}.tif"
+
+    @contextmanager
+    def open_day(
+        self,
+        fire_id: Any,
+        day: date,
+        grid: "PixelGrid",
+        band_names: Sequence[str],
+        *,
+        nodata: Optional[float] = None,
+    ) -> "Iterator[WindowSink]":
+        from .pixels import geotiff_sink
+
+        path = self.output_path(fire_id, day)
+        with geotiff_sink(path, grid, band_names, nodata=_default_nodata(nodata)) as sink:
+            yield sink
+
+    def read_day(self, fire_id: Any, day: date) -> "np.ndarray":
+        import rasterio
+
+        with rasterio.open(self.output_path(fire_id, day)) as dataset:
+            return dataset.read()
+
+
+def _import_zarr() -> Any:
+    try:
+        import zarr  # type: ignore
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise ConfigError(
+            "output_format 'zarr' requires the zarr package (pip install 'raster-builder[zarr]')"
+        ) from exc
+    return zarr
+
+
+class ZarrCubeWriter(RasterWriter):
+    """One Zarr store per fire holding a ``(time, band, y, x)`` datacube.
+
+    Each chunk covers one day, all bands and up to 256 x 256 pixels, so days can be
+    written concurrently and reading one fire-day touches only that day's chunks.
+    Days are appended in arrival order; the ``dates`` attribute maps them to time
+    indices. Only reserving a time index is serialized, under a file lock.
+    """
+
+    format = "zarr"
+    chunk_size = 256
+
+    def output_path(self, fire_id: Any, day: date) -> Path:
+        return self.root / f"{fire_id}.zarr"
+
+    def _reserve(
+        self,
+        store: Path,
+        day: date,
+        grid: "PixelGrid",
+        band_names: Sequence[str],
+        nodata: float,
+    ) -> Any:
+        zarr = _import_zarr()
+        with file_lock(self.lock_path(store)):
+            group = zarr.open_group(str(store), mode="a")
+            if "data" not in group:
+                from numcodecs import Blosc  # type: ignore
+
+                group.create_dataset(
+                    "data",
+                    shape=(0, len(band_names), grid.height, grid.width),
+                    chunks=(
+                        1,
+                        len(band_names),
+                        min(self.chunk_size, grid.height),
+                        min(self.chunk_size, grid.width),
+                    ),
+                    dtype="f4",
+                    fill_value=nodata,
+                    compressor=Blosc(cname="zstd", clevel=3, shuffle=Blosc.SHUFFLE),
+                )
+                group.attrs.update(
+                    {
+                        "dates": [],
+                        "bands": list(band_names),
+                        "crs": grid.crs,
+                        "transform": list(grid.transform),
+                        "nodata": nodata,
+                    }
+                )
+            data = group["data"]
+            if data.shape[1:] != (len(band_names), grid.height, grid.width):
+                raise ValueError(f"{store} holds a {data.shape[1:]} cube; got a different grid")
+            dates = list(group.attrs["dates"])
+            if day.isoformat() in dates:
+                index = dates.index(day.isoformat())
+            else:
+                index = len(dates)
+                data.resize((index + 1, *data.shape[1:]))
+                group.attrs["dates"] = [*dates, day.isoformat()]
+        return data, index
+
+    @contextmanager
+    def open_day(
+        self,
+        fire_id: Any,
+        day: date,
+        grid: "PixelGrid",
+        band_names: Sequence[str],
+        *,
+        nodata: Optional[float] = None,
+    ) -> "Iterator[WindowSink]":
+        store = self.output_path(fire_id, day)
+        data, index = self._reserve(store, day, grid, band_names, _default_nodata(nodata))
+
+        def write(array: "np.ndarray", col_off: int, row_off: int) -> None:
+            rows = slice(row_off, row_off + array.shape[1])
+            cols = slice(col_off, col_off + array.shape[2])
+            data[index, :, rows, cols] = array
+
+        yield write
+
+    def read_day(self, fire_id: Any, day: date) -> "np.ndarray":
+        group = _import_zarr().open_group(str(self.output_path(fire_id, day)), mode="r")
+        return group["data"][list(group.attrs["dates"]).index(day.isoformat())]
+
+
+def _overview_factors(width: int, height: int, block_size: int) -> List[int]:
+    """Decimation factors halving the raster until it fits in one tile."""
+    factors = []
+    factor = 2
+    while max(width, height) / (factor // 2) > block_size:
+        factors.append(factor)
+        factor *= 2
+    return factors
+
+
+class CogCubeWriter(GeoTiffWriter):
+    """One cloud-optimized GeoTIFF per fire with the bands of every day stacked.
+
+    Days are staged as single-day GeoTIFFs under ``.days/`` (:meth:`staging_path`)
+    and :meth:`finalize` writes ``<fire id>.tif`` (every day's :meth:`output_path`)
+    as a cloud-optimized GeoTIFF: bands ordered day by day (descriptions
+    ``YYYY-MM-DD/band``), tiled, band-interleaved and with overviews.
+    Only fires with staged days are assembled; days already in the cube are kept
+    unless restaged, and staged files are removed once the cube is written.
+    """
+
+    format = "cog"
+    STAGING_DIRNAME = ".days"
+
+    def output_path(self, fire_id: Any, day: date) -> Path:
+        return self.cube_path(fire_id)
+
+    def staging_path(self, fire_id: Any, day: date) -> Path:
+        return self.root / self.STAGING_DIRNAME / str(fire_id) / f"{day.isoformat()}.tif"
+
+    def cube_path(self, fire_id: Any) -> Path:
+        return self.root / f"{fire_id}.tif"
+
+    @contextmanager
+    def open_day(
+        self,
+        fire_id: Any,
+        day: date,
+        grid: "PixelGrid",
+        band_names: Sequence[str],
+        *,
+        nodata: Optional[float] = None,
+    ) -> "Iterator[WindowSink]":
+        from .pixels import geotiff_sink
+
+        path = self.staging_path(fire_id, day)
+        with geotiff_sink(path, grid, band_names, nodata=_default_nodata(nodata)) as sink:
+            yield sink
+
+    def read_day(self, fire_id: Any, day: date) -> "np.ndarray":
+        import rasterio
+
+        with rasterio.open(self.cube_path(fire_id)) as dataset:
+            prefix = f"{day.isoformat()}/"
+            indexes = [
+                position
+                for position, description in enumerate(dataset.descriptions, start=1)
+                if description and description.startswith(prefix)
+            ]
+            return dataset.read(indexes)
+
+    def finalize(self) -> List[Path]:
+        staging = self.root / self.STAGING_DIRNAME
+        if not staging.is_dir():
+            return []
+        paths = []
+        for fire_dir in sorted(staging.iterdir()):
+            day_paths = sorted(fire_dir.glob("*.tif")) if fire_dir.is_dir() else []
+            if not day_paths:
+                continue
+            paths.append(self._assemble(fire_dir.name, day_paths))
+            for day_path in day_paths:
+                day_path.unlink()
+            try:
+                fire_dir.rmdir()
+            except OSError:  # a day staged meanwhile; it is assembled next time
+                pass
+        try:
+            staging.rmdir()
+        except OSError:
+            pass
+        return paths
+
+    def _assemble(self, fire_id: str, day_paths: Sequence[Path]) -> Path:
+        import rasterio
+        import rasterio.shutil
+
+        from .pixels import BLOCK_SIZE
+
+        with rasterio.open(day_paths[0]) as first:
+            profile = first.profile
+            band_names = list(first.descriptions)
+        path = self.cube_path(fire_id)
+        # Each day's bands come from its staged file or, if not restaged, the old cube.
+        sources: Dict[str, Tuple[Path, List[int]]] = {}
+        if path.exists():
+            with rasterio.open(path) as cube:
+                for position, description in enumerate(cube.descriptions, start=1):
+                    day, _, _ = (description or "").partition("/")
+                    sources.setdefault(day, (path, []))[1].append(position)
+        for day_path in day_paths:
+            sources[day_path.stem] = (day_path, list(range(1, len(band_names) + 1)))
+        days = sorted(sources)
+        profile.update(count=len(days) * len(band_names), interleave="band")
+        profile.pop("compress", None)  # the scratch stack is read once; compress only the cube
+        scratch = path.with_name(f".{path.name}.stack.tif")
+        try:
+            with rasterio.open(scratch, "w", **profile) as stack:
+                for day_number, day in enumerate(days):
+                    source_path, indexes = sources[day]
+                    offset = day_number * len(band_names)
+                    with rasterio.open(source_path) as source:
+                        for band, (name, index) in enumerate(zip(band_names, indexes), start=1):
+                            stack.write(source.read(index), offset + band)
+                            stack.set_band_description(offset + band, f"{day}/{name}")
+                stack.build_overviews(_overview_factors(stack.width, stack.height, BLOCK_SIZE))
+                stack.update_tags(ns="rio_overview", resampling="nearest")
+            with atomic_output(path) as tmp_path:
+                # GDAL's COG recipe (the COG driver cannot band-interleave before 3.11):
+                # tiles and overviews copied so the header and overviews come first.
+                rasterio.shutil.copy(
+                    scratch,
+                    tmp_path,
+                    driver="GTiff",
+                    tiled=True,
+                    blockxsize=BLOCK_SIZE,
+                    blockysize=BLOCK_SIZE,
+                    interleave="band",
+                    compress="deflate",
+                    copy_src_overviews=True,
+                )
+        finally:
+            scratch.unlink(missing_ok=True)
+        return path
+
+
+RASTER_WRITERS: Dict[str, Type[RasterWriter]] = {
+    writer.format: writer for writer in (GeoTiffWriter, ZarrCubeWriter, CogCubeWriter)
+}
+
+
+def raster_writer(options: Mapping[str, Any], output_dir: Path) -> RasterWriter:
+    """Return the writer selected by a dataset's ``output_format`` option (``geotiff``).
+
+    Its lock files go to the ``lock_dir`` option when set.
+    """
+
+    name = str(options.get("output_format", GeoTiffWriter.format))
+    lock_dir = options.get("lock_dir")
+    try:
+        writer_class = RASTER_WRITERS[name]
+    except KeyError:
+        raise ConfigError(
+            f"Unknown output_format '{name}' (expected one of {', '.join(RASTER_WRITERS)})"
+        ) from None
+    return writer_class(output_dir, lock_dir=Path(lock_dir) if lock_dir else None)
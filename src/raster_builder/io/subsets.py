@@ -0,0 +1,139 @@
+"""Windowed reads of granule variables, reprojected onto fire grids."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .pixels import DEFAULT_NODATA, PixelGrid
+
+__all__ = ["granule_variables", "subset_granule"]
+
+logger = logging.getLogger(__name__)
+
+FireGrid = Tuple[Any, PixelGrid]
+
+
+def _variable_name(name: str) -> str:
+    """Short variable name of a GDAL subdataset (``NETCDF:"f.nc":lst`` -> ``lst``)."""
+    return name.rsplit(":", 1)[-1].strip('"').rsplit("/", 1)[-1]
+
+
+def _band_names(name: str, source: Any, container: Any) -> List[str]:
+    if source is container:  # no variables: use band descriptions
+        return [
+            description or f"band_{band}"
+            for band, description in enumerate(source.descriptions, start=1)
+        ]
+    variable = _variable_name(name)
+    if source.count == 1:
+        return [variable]
+    return [f"{variable}_{band}" for band in range(1, source.count + 1)]
+
+
+def granule_variables(container: Any, variables: Optional[Sequence[str]] = None) -> List[str]:
+    """GDAL names of the subdatasets to read, or the file itself when it has none."""
+    names = list(container.subdatasets)
+    if not names:
+        return [container.name]  # a single-variable file: nothing to select
+    if not variables:
+        return names
+    wanted = set(variables)
+    selected = [name for name in names if _variable_name(name) in wanted]
+    missing = wanted - {_variable_name(name) for name in selected}
+    if missing:
+        logger.warning("%s has no variables %s", container.name, ", ".join(sorted(missing)))
+    return selected
+
+
+def subset_granule(
+    path: Path,
+    targets: Sequence[FireGrid],
+    *,
+    variables: Optional[Sequence[str]] = None,
+    resampling: str = "nearest",
+    nodata: float = DEFAULT_NODATA,
+) -> Iterator[Tuple[Any, np.ndarray, List[str]]]:
+    """Yield ``(fire_id, array, band_names)`` for every fire grid from one open granule.
+
+    The granule and its selected variables (HDF/NetCDF subdatasets) are opened once.
+    For each fire only the source window covering its grid, plus a one-pixel margin
+    for resampling, is read; GDAL decodes just the blocks/chunks that window touches.
+    The window is reprojected straight onto the fire's grid, so memory per fire is
+    bounded by its window rather than the granule. Values are unpacked with each
+    band's scale and offset before reprojection. Variables without a georeferenced
+    grid (swath products) are skipped, as are fires outside the granule.
+    """
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.transform import Affine
+    from rasterio.warp import reproject, transform_bounds
+    from rasterio.windows import Window, WindowError, from_bounds, intersection
+
+    method = Resampling[resampling]
+    container = rasterio.open(path)
+    names = granule_variables(container, variables)
+    if container.subdatasets:
+        sources = [rasterio.open(name) for name in names]
+    else:
+        sources = [container]
+    try:
+        usable = []
+        for name, source in zip(names, sources):
+            if source.crs is None or source.transform.is_identity:
+                logger.warning("Skipping %s: no georeferenced grid", name)
+                continue
+            usable.append((name, source))
+        for fire_id, grid in targets:
+            bounds = (
+                grid.x0,
+                grid.y0 - grid.height * grid.resolution,
+                grid.x0 + grid.width * grid.resolution,
+                grid.y0,
+            )
+            arrays: List[np.ndarray] = []
+            band_names: List[str] = []
+            covered = False
+            for name, source in usable:
+                destination = np.full(
+                    (source.count, grid.height, grid.width), nodata, dtype=np.float32
+                )
+                band_names.extend(_band_names(name, source, container))
+                arrays.append(destination)
+                source_bounds = transform_bounds(grid.crs, source.crs, *bounds, densify_pts=21)
+                window = from_bounds(*source_bounds, transform=source.transform)
+                window = Window(
+                    int(np.floor(window.col_off)) - 1,
+                    int(np.floor(window.row_off)) - 1,
+                    int(np.ceil(window.width)) + 3,
+                    int(np.ceil(window.height)) + 3,
+                )
+                try:
+                    window = intersection(window, Window(0, 0, source.width, source.height))
+                except WindowError:
+                    continue  # the fire lies outside this granule
+                covered = True
+                # Unpack to physical values first so resampling blends those, not raw counts.
+                data = source.read(window=window, masked=True).astype(np.float32)
+                scales = np.asarray(source.scales, dtype=np.float32).reshape(-1, 1, 1)
+                offsets = np.asarray(source.offsets, dtype=np.float32).reshape(-1, 1, 1)
+                reproject(
+                    source=(data * scales + offsets).filled(nodata),
+                    destination=destination,
+                    src_transform=source.window_transform(window),
+                    src_crs=source.crs,
+                    src_nodata=nodata,
+                    dst_transform=Affine(*grid.transform),
+                    dst_crs=grid.crs,
+                    dst_nodata=nodata,
+                    resampling=method,
+                )
+            if covered:
+                yield fire_id, np.concatenate(arrays), band_names
+    finally:
+        for source in sources:
+            source.close()
+        container.close()
@@ -3,27 +3,175 @@
 from __future__ import annotations
 
 import argparse
+import json
+import sys
 from pathlib import Path
 
-from .pipeline import run_pipeline
+COMMANDS = ("run", "plan", "validate", "list", "merge")
+# Options of ``run`` that take a value, so the value is not mistaken for the config path.
+RUN_VALUE_OPTIONS = ("--shard",)
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run the wildfire dataset pipeline")
-    parser.add_argument(
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the pipeline (the default command)")
+    run.add_argument(
         "config",
         type=Path,
         help="Path to the pipeline configuration YAML file",
     )
+    run.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every dataset even if its fingerprint matches a completed output",
+    )
+    run.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Only process the fires of shard I of N (0-based); the index is shared",
+    )
+
+    plan = commands.add_parser(
+        "plan",
+        help="Estimate requests, pixels, bytes and time per dataset without fetching anything",
+    )
+    plan.add_argument("config", type=Path, help="Path to the pipeline configuration YAML file")
+    plan.add_argument(
+        "--index",
+        type=Path,
+        help="Index GeoParquet to plan over (default: the index stored by a previous run)",
+    )
+    plan.add_argument(
+        "--sample",
+        type=int,
+        help="Plan over this many random fires and scale up, or synthetic fires if no index",
+    )
+    plan.add_argument("--seed", type=int, default=0, help="Seed for sampling")
+    plan.add_argument(
+        "--concurrency",
+        type=int,
+        help="Requests in flight per dataset (default: each dataset's workers)",
+    )
+    plan.add_argument(
+        "--request-seconds",
+        type=float,
+        default=2.0,
+        help="Assumed latency of one request in seconds",
+    )
+    plan.add_argument(
+        "--bandwidth-mbps",
+        type=float,
+        default=20.0,
+        help="Assumed download throughput in MiB per second",
+    )
+    plan.add_argument("--json", action="store_true", help="Print the plan as JSON")
+
+    validate = commands.add_parser(
+        "validate", help="Check a configuration and its datasets without running anything"
+    )
+    validate.add_argument("config", type=Path, help="Path to the pipeline configuration YAML file")
+
+    listing = commands.add_parser("list", help="List the registered datasets")
+    listing.add_argument("--json", action="store_true", help="Print the datasets as JSON")
+
+    merge = commands.add_parser("merge", help="Combine the outputs of a sharded run")
+    merge.add_argument("config", type=Path, help="Path to the pipeline configuration YAML file")
     return parser
 
 
+def _first_positional(argv: list[str]) -> str | None:
+    expects_value = False
+    for arg in argv:
+        if expects_value:
+            expects_value = False
+        elif arg in RUN_VALUE_OPTIONS:
+            expects_value = True
+        elif not arg.startswith("-"):
+            return arg
+    return None
+
+
 def main(argv: list[str] | None = None) -> None:
-    parser = build_parser()
-    args = parser.parse_args(argv)
-    run_pipeline(args.config)
+    argv = list(sys.argv[1:] if argv is None else argv)
+    first = _first_positional(argv)
+    if first is not None and first not in COMMANDS:
+        # ``raster-builder [--force] config.yml`` still runs the pipeline.
+        argv.insert(0, "run")
+    args = build_parser().parse_args(argv)
+
+    if args.command == "list":
+        from .datasets import load_builtin_datasets, registry
+
+        load_builtin_datasets()
+        specs = registry.specs()
+        if args.json:
+            print(json.dumps([spec.__dict__ for spec in specs], indent=2))
+        else:
+            for spec in specs:
+                print(f"{spec.source:<12} {spec.name:<20} {spec.module}")
+        return
+
+    if args.command == "validate":
+        from .config import ConfigError
+        from .pipeline import validate_config
+
+        try:
+            config = validate_config(args.config)
+        except ConfigError as exc:
+            print(exc, file=sys.stderr)
+            raise SystemExit(1) from None
+        count = 1 + sum(len(entries) for _, entries in config.schema.stages())
+        print(f"{config.config_path}: OK ({count} datasets)")
+        return
+
+    if args.command == "plan":
+        from .config import ConfigError
+        from .planner import plan_pipeline
+
+        try:
+            plan = plan_pipeline(
+                args.config,
+                index_path=args.index,
+                sample=args.sample,
+                seed=args.seed,
+                concurrency=args.concurrency,
+                request_seconds=args.request_seconds,
+                bytes_per_second=args.bandwidth_mbps * 1024**2,
+            )
+        except ConfigError as exc:
+            print(exc, file=sys.stderr)
+            raise SystemExit(1) from None
+        print(json.dumps(plan.to_dict(), indent=2) if args.json else plan.format())
+        return
+
+    if args.command == "merge":
+        from .config import ConfigError
+        from .shards import merge_shards
+
+        try:
+            path = merge_shards(args.config)
+        except ConfigError as exc:
+            print(exc, file=sys.stderr)
+            raise SystemExit(1) from None
+        print(path)
+        return
+
+    from .pipeline import run_pipeline
+
+    shard = None
+    if args.shard:
+        from .config import ConfigError
+        from .shards import ShardSpec
+
+        try:
+            shard = ShardSpec.parse(args.shard)
+        except ConfigError as exc:
+            print(exc, file=sys.stderr)
+            raise SystemExit(1) from None
+    run_pipeline(args.config, force=args.force, shard=shard)
 
 
 if __name__ == "__main__":  # pragma: no cover
     main()
-
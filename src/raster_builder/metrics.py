@@ -0,0 +1,214 @@
+"""Run instrumentation: timers, counters and peak memory, written as a run report."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+__all__ = ["RunMetrics", "merge_reports", "peak_rss_bytes"]
+
+LabelKey = Tuple[Tuple[str, str], ...]
+REPORT_FILENAME = "run_report.json"
+PROMETHEUS_FILENAME = "run_report.prom"
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process and its finished children, in bytes.
+
+    Returns 0 where the ``resource`` module is unavailable (Windows).
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+@dataclass
+class _Timer:
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    errors: int = 0
+
+    def observe(self, seconds: float, *, error: bool = False) -> None:
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        if error:
+            self.errors += 1
+
+
+class RunMetrics:
+    """Thread-safe timers and counters collected during one pipeline run.
+
+    Timers are aggregated per name and label set, so per-unit spans stay cheap:
+    label work units by dataset rather than by unit id.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._timers: Dict[Tuple[str, LabelKey], _Timer] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+
+    def observe(self, name: str, seconds: float, *, error: bool = False, **labels: Any) -> None:
+        """Record a duration measured elsewhere (for example in a worker process)."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._timers.setdefault(key, _Timer()).observe(seconds, error=error)
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[None]:
+        """Time the enclosed block under ``name`` and ``labels``."""
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, error=error, **labels)
+
+    def incr(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def drain_counters(self) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Return ``(name, labels, value)`` of every counter and reset them.
+
+        Worker processes use this to ship their counts to the run's metrics.
+        """
+        with self._lock:
+            counters, self._counters = self._counters, {}
+        return [(name, dict(labels), value) for (name, labels), value in counters.items()]
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        with self._lock:
+            timers = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": timer.count,
+                    "errors": timer.errors,
+                    "total_seconds": round(timer.total, 6),
+                    "max_seconds": round(timer.maximum, 6),
+                }
+                for (name, labels), timer in sorted(self._timers.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {
+            "started_at": self._started_at.isoformat(),
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "timers": timers,
+            "counters": counters,
+            **extra,
+        }
+
+    def write(
+        self,
+        directory: Path,
+        *,
+        prometheus: bool = False,
+        **extra: Any,
+    ) -> Path:
+        """Write ``run_report.json`` (and optionally a Prometheus textfile) to ``directory``."""
+        from .io.storage import atomic_output  # io.storage imports the context module
+
+        report = self.report(**extra)
+        path = directory / REPORT_FILENAME
+        with atomic_output(path) as tmp_path:
+            tmp_path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+        if prometheus:
+            with atomic_output(directory / PROMETHEUS_FILENAME) as tmp_path:
+                tmp_path.write_text(_prometheus_text(report), encoding="utf-8")
+        return path
+
+
+def merge_reports(reports: Sequence[Dict[str, Any]], **extra: Any) -> Dict[str, Any]:
+    """Combine run reports of runs that executed side by side (e.g. shards on several nodes).
+
+    Counters and timer totals add up; maxima, wall time and peak memory are the
+    largest of any run, since the runs overlapped rather than ran back to back.
+    """
+    timers: Dict[Tuple[str, LabelKey], Dict[str, Any]] = {}
+    counters: Dict[Tuple[str, LabelKey], float] = {}
+    for report in reports:
+        for timer in report.get("timers", []):
+            key = (timer["name"], _label_key(timer["labels"]))
+            merged = timers.setdefault(key, {**timer, "count": 0, "errors": 0, "total_seconds": 0})
+            merged["count"] += timer["count"]
+            merged["errors"] += timer["errors"]
+            merged["total_seconds"] = round(merged["total_seconds"] + timer["total_seconds"], 6)
+            merged["max_seconds"] = max(merged["max_seconds"], timer["max_seconds"])
+        for counter in report.get("counters", []):
+            key = (counter["name"], _label_key(counter["labels"]))
+            counters[key] = counters.get(key, 0) + counter["value"]
+    started: List[str] = [report["started_at"] for report in reports if "started_at" in report]
+    return {
+        "started_at": min(started) if started else None,
+        "wall_seconds": max((report.get("wall_seconds", 0) for report in reports), default=0),
+        "peak_rss_bytes": max((report.get("peak_rss_bytes", 0) for report in reports), default=0),
+        "timers": [timers[key] for key in sorted(timers)],
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(counters.items())
+        ],
+        **extra,
+    }
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prometheus_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items()))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _metric_name(name: str) -> str:
+    return "raster_builder_" + "".join(char if char.isalnum() else "_" for char in name)
+
+
+def _prometheus_text(report: Dict[str, Any]) -> str:
+    lines = [
+        "# TYPE raster_builder_wall_seconds gauge",
+        f"raster_builder_wall_seconds {report['wall_seconds']}",
+        "# TYPE raster_builder_peak_rss_bytes gauge",
+        f"raster_builder_peak_rss_bytes {report['peak_rss_bytes']}",
+    ]
+    for timer in report["timers"]:
+        base = _metric_name(timer["name"])
+        labels = _prometheus_labels(timer["labels"])
+        lines.append(f"{base}_seconds_total{labels} {timer['total_seconds']}")
+        lines.append(f"{base}_seconds_max{labels} {timer['max_seconds']}")
+        lines.append(f"{base}_count{labels} {timer['count']}")
+        lines.append(f"{base}_errors{labels} {timer['errors']}")
+    for counter in report["counters"]:
+        labels = _prometheus_labels(counter["labels"])
+        lines.append(f"{_metric_name(counter['name'])}{labels} {counter['value']}")
+    return "\n".join(lines) + "\n"
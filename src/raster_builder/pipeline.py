@@ -4,13 +4,23 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Iterable
+from typing import Collection, List, Optional, Sequence
 
-from .config import DatasetEntry, PipelineConfig, load_config
+from .config import ConfigError, DatasetEntry, PipelineConfig, load_config
 from .context import PipelineContext
 from .datasets import load_builtin_datasets, registry
-from .datasets.custom import resolve_custom_callable
+from .datasets.batch import BatchDataset
+from .datasets.custom import custom_module_exists, resolve_custom_callable
 from .io.auth import authenticate_earth_engine, earthaccess_session
+from .io.storage import (
+    clear_outputs,
+    dataset_output_dir,
+    file_lock,
+    read_fingerprint,
+    write_fingerprint,
+)
+from .scheduler import DatasetFailure, PipelineError, run_stage_entries
+from .shards import ShardSpec, write_shard_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -30,39 +40,248 @@ def _load_config(config_path: Path) -> PipelineConfig:
 def _resolve_callable(entry: DatasetEntry) -> callable:
     if entry.function:
         return resolve_custom_callable(entry.function)
-    return registry.get(source=entry.source, name=entry.name)
+    return registry.get(source=entry.source, name=entry.registered_name)
 
 
-def _run_dataset(context: PipelineContext, stage: str, entry: DatasetEntry) -> None:
+def _callable_path(func: callable) -> str:
+    return f"{getattr(func, '__module__', '')}.{getattr(func, '__qualname__', repr(func))}"
+
+
+def _restore_dataset(
+    context: PipelineContext,
+    stage: str,
+    entry: DatasetEntry,
+    output_dir: Path,
+) -> bool:
+    restore = (
+        None
+        if entry.function
+        else registry.get_restore(source=entry.source, name=entry.registered_name)
+    )
+    if restore is None:
+        # Downstream stages only produce files, so an unchanged output needs no reload.
+        return stage != "index"
+    return bool(restore(context, output_dir))
+
+
+def _run_dataset(
+    context: PipelineContext,
+    stage: str,
+    entry: DatasetEntry,
+    *,
+    upstream: Optional[str] = None,
+    force: bool = False,
+) -> str:
+    """Run one dataset unless its completed output already matches its fingerprint.
+
+    Outputs left by a different fingerprint, or by any run when ``force`` is set, are
+    deleted first; those of an interrupted run with the same fingerprint are kept for
+    the dataset to resume from. The index manages its own partitioned store instead.
+    """
+
     func = _resolve_callable(entry)
+    # Names are unique across stages and dependencies run first, so their fingerprints
+    # are already known; copy the mapping, sibling datasets add to it concurrently.
+    dependencies = {
+        name: fingerprint
+        for (_, name), fingerprint in context.fingerprints.copy().items()
+        if name in entry.depends_on
+    }
+    fingerprint = entry.fingerprint(
+        _callable_path(func), upstream=upstream, dependencies=dependencies
+    )
+    context.fingerprints[(stage, entry.name)] = fingerprint
+    output_dir = dataset_output_dir(context, stage=stage, dataset_name=entry.name)
+
+    if not force and read_fingerprint(output_dir) == fingerprint:
+        if _restore_dataset(context, stage, entry, output_dir):
+            logger.info("Skipping %s dataset '%s' (unchanged since last run)", stage, entry.name)
+            context.metrics.incr("datasets_skipped", stage=stage)
+            return fingerprint
+
+    previous = read_fingerprint(output_dir, pending=True)
+    if stage != "index" and (force or previous not in (None, fingerprint)):
+        logger.info("Removing outputs of %s dataset '%s' from a previous run", stage, entry.name)
+        clear_outputs(output_dir)
+    write_fingerprint(output_dir, fingerprint, completed=False)
     logger.info("Running %s dataset '%s'", stage, entry.name)
-    func(context, entry.options)
+    with context.span("dataset", stage=stage, dataset=entry.name):
+        if entry.function and not isinstance(func, BatchDataset):
+            func(context, entry.options)
+        else:
+            # Registry and batch outputs are named after the entry, not the function.
+            func(context, entry.options, dataset_name=entry.name)
+    write_fingerprint(output_dir, fingerprint)
+    return fingerprint
+
+
+def _run_shared_index(
+    context: PipelineContext,
+    entry: DatasetEntry,
+    *,
+    force: bool = False,
+) -> str:
+    """Build the index once for all shards, then keep only this shard's fires.
+
+    Shards serialize on a lock in the index directory: the first builds the index,
+    the others find its fingerprint and reload it. With ``force`` every shard rebuilds
+    it in turn under the lock; the partitioned store keeps that from refetching.
+    """
+
+    shard = context.shard
+    assert shard is not None
+    lock_path = dataset_output_dir(context, stage="index", dataset_name=entry.name) / ".lock"
+    with file_lock(lock_path):
+        fingerprint = _run_dataset(context, "index", entry, force=force)
+    index = context.index_data
+    context.set_index(shard.select(index), rows=0 if index is None else len(index))
+    logger.info(
+        "Shard %d/%d covers %d of %d fires",
+        shard.index,
+        shard.count,
+        0 if context.index_data is None else len(context.index_data),
+        0 if index is None else len(index),
+    )
+    return fingerprint
+
 
+def _run_stage(
+    context: PipelineContext,
+    stage: str,
+    entries: Sequence[DatasetEntry],
+    *,
+    upstream: str,
+    force: bool = False,
+    failed: Collection[str] = (),
+) -> List[DatasetFailure]:
+    """Run a stage's datasets concurrently and return the failures it collected."""
 
-def _run_stage(context: PipelineContext, stage: str, entries: Iterable[DatasetEntry]) -> None:
-    for entry in entries:
-        _run_dataset(context, stage, entry)
+    if not entries:
+        return []
+    with context.span("stage", stage=stage):
+        outcome = run_stage_entries(
+            stage,
+            entries,
+            lambda entry: _run_dataset(context, stage, entry, upstream=upstream, force=force),
+            max_workers=context.config.execution.workers_for(stage),
+            failed=failed,
+        )
+    return outcome.failures
 
 
-def run_pipeline(config_path: Path) -> PipelineContext:
-    """Execute the configured pipeline and return the runtime context."""
+def _write_report(
+    context: PipelineContext,
+    status: str,
+    failures: Sequence[DatasetFailure],
+) -> None:
+    directory = context.processed_path
+    if context.shard is not None:
+        directory = context.shard.directory(directory)
+    path = context.metrics.write(
+        directory,
+        prometheus=context.config.execution.prometheus_textfile,
+        status=status,
+        failures=[str(failure) for failure in failures],
+        config_path=str(context.config.config_path),
+    )
+    logger.info("Wrote run report to %s", path)
+
+
+def validate_config(config_path: Path) -> PipelineConfig:
+    """Load a configuration and check every dataset resolves, without importing any.
+
+    Registry datasets must be declared; custom functions must name an importable
+    module. Problems are collected and raised together as a :class:`ConfigError`.
+    """
+
+    load_builtin_datasets()
+    config = load_config(config_path)
+    problems = []
+    entries = [("index", config.schema.index)]
+    for stage, stage_entries in config.schema.stages():
+        entries.extend((stage, entry) for entry in stage_entries)
+    for stage, entry in entries:
+        if entry.function:
+            try:
+                found = custom_module_exists(entry.function)
+            except ValueError as exc:
+                problems.append(f"{stage} dataset '{entry.name}': {exc}")
+                continue
+            if not found:
+                problems.append(
+                    f"{stage} dataset '{entry.name}': module of '{entry.function}' not found"
+                )
+        elif not registry.is_known(source=entry.source, name=entry.registered_name):
+            problems.append(
+                f"{stage} dataset '{entry.name}': no dataset registered for "
+                f"source='{entry.source}' name='{entry.registered_name}'"
+            )
+    if problems:
+        raise ConfigError("Invalid configuration:\n  " + "\n  ".join(problems))
+    return config
+
+
+def run_pipeline(
+    config_path: Path,
+    *,
+    force: bool = False,
+    shard: Optional[ShardSpec] = None,
+) -> PipelineContext:
+    """Execute the configured pipeline and return the runtime context.
+
+    Datasets whose fingerprint matches a completed output are skipped unless
+    ``force`` is set. Datasets within a stage run concurrently; if any of them fail
+    the remaining ones still run and a :class:`PipelineError` is raised at the end.
+    With ``shard``, stages after the shared index only process that shard's fires
+    and write below its shard directory (see :mod:`raster_builder.shards`).
+    """
 
     load_builtin_datasets()
     config = _load_config(config_path)
-    context = PipelineContext(config=config)
+    context = PipelineContext(config=config, force=force, shard=shard)
 
     project_id = authenticate_earth_engine(config.credentials.earthengine_service_account)
     context.earth_engine_project = project_id
 
     context.earthaccess_session = earthaccess_session(config.credentials.earthaccess_netrc)
 
-    index_entry = config.schema.index
-    _run_dataset(context, "index", index_entry)
+    failures: List[DatasetFailure] = []
+    status = "failed"
+    try:
+        index_entry = config.schema.index
+        with context.span("stage", stage="index"):
+            if shard is None:
+                index_fingerprint = _run_dataset(context, "index", index_entry, force=force)
+            else:
+                index_fingerprint = _run_shared_index(context, index_entry, force=force)
+
+        for stage, entries in config.schema.stages():
+            failures.extend(
+                _run_stage(
+                    context,
+                    stage,
+                    entries,
+                    upstream=index_fingerprint,
+                    force=force,
+                    failed={failure.name for failure in failures},
+                )
+            )
+        status = "failed" if failures else "succeeded"
+    finally:
+        context.close()
+        # A failure to report must not mask the error that ended the run.
+        try:
+            _write_report(context, status, failures)
+        except Exception:  # noqa: BLE001
+            logger.exception("Could not write the run report")
+        if shard is not None:
+            try:
+                write_shard_metadata(context, status=status)
+            except Exception:  # noqa: BLE001
+                logger.exception("Could not write the metadata of shard %s", shard.label)
 
-    _run_stage(context, "earthengine", config.schema.earthengine)
-    _run_stage(context, "earthaccess", config.schema.earthaccess)
-    _run_stage(context, "custom", config.schema.custom)
+    if failures:
+        raise PipelineError(failures)
 
     logger.info("Pipeline completed successfully")
     return context
-
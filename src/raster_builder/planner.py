@@ -0,0 +1,310 @@
+"""Offline estimates of a run's requests, pixels, bytes and duration."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, field, replace
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import ConfigError, DatasetEntry, PipelineConfig, load_config
+from .datasets import load_builtin_datasets, registry
+
+__all__ = [
+    "DatasetCost",
+    "DatasetPlan",
+    "RunPlan",
+    "plan_index",
+    "plan_pipeline",
+    "synthetic_index",
+]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUEST_SECONDS = 2.0
+DEFAULT_BYTES_PER_SECOND = 20 * 1024**2
+INDEX_FILENAME = "index.parquet"
+# Lon/lat box of the contiguous United States, where sampled fires are placed.
+SAMPLE_BOUNDS = (-124.0, 31.0, -103.0, 49.0)
+SAMPLE_MAX_DAYS = 21
+
+
+@dataclass
+class DatasetCost:
+    """Estimated work of one dataset.
+
+    ``bytes`` is what is downloaded, ``disk_bytes`` what is written; ``concurrency``
+    is how many requests the dataset keeps in flight.
+    """
+
+    work_units: int = 0
+    requests: int = 0
+    pixels: int = 0
+    bytes: int = 0
+    disk_bytes: int = 0
+    concurrency: int = 1
+    notes: List[str] = field(default_factory=list)
+
+    def scaled(self, factor: float) -> "DatasetCost":
+        """Costs multiplied by ``factor``, e.g. to extrapolate from a sampled index."""
+        return replace(
+            self,
+            work_units=int(round(self.work_units * factor)),
+            requests=int(round(self.requests * factor)),
+            pixels=int(round(self.pixels * factor)),
+            bytes=int(round(self.bytes * factor)),
+            disk_bytes=int(round(self.disk_bytes * factor)),
+            notes=list(self.notes),
+        )
+
+    def seconds(
+        self,
+        *,
+        concurrency: Optional[int] = None,
+        request_seconds: float = DEFAULT_REQUEST_SECONDS,
+        bytes_per_second: float = DEFAULT_BYTES_PER_SECOND,
+    ) -> float:
+        """Wall time if each request takes ``request_seconds`` plus its transfer time."""
+        concurrency = max(1, concurrency or self.concurrency)
+        busy = self.requests * request_seconds + self.bytes / bytes_per_second
+        return busy / concurrency
+
+
+@dataclass
+class DatasetPlan:
+    """The estimate for one configured dataset (``cost`` is None without a cost function)."""
+
+    stage: str
+    name: str
+    cost: Optional[DatasetCost]
+    seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "name": self.name,
+            "cost": None if self.cost is None else asdict(self.cost),
+            "seconds": self.seconds,
+        }
+
+
+@dataclass
+class RunPlan:
+    """Estimates for every dataset of a configuration over one index."""
+
+    index_rows: int
+    index_source: str
+    sample_factor: float = 1.0
+    datasets: List[DatasetPlan] = field(default_factory=list)
+
+    def totals(self) -> DatasetCost:
+        total = DatasetCost(concurrency=0)
+        for plan in self.datasets:
+            if plan.cost is None:
+                continue
+            total.work_units += plan.cost.work_units
+            total.requests += plan.cost.requests
+            total.pixels += plan.cost.pixels
+            total.bytes += plan.cost.bytes
+            total.disk_bytes += plan.cost.disk_bytes
+        return total
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index_rows": self.index_rows,
+            "index_source": self.index_source,
+            "sample_factor": self.sample_factor,
+            "datasets": [plan.to_dict() for plan in self.datasets],
+            "totals": asdict(self.totals()),
+            "seconds": sum(plan.seconds or 0.0 for plan in self.datasets),
+        }
+
+    def format(self) -> str:
+        """Human readable table of the plan."""
+        lines = [f"Index: {self.index_rows} fires ({self.index_source})"]
+        if self.sample_factor != 1.0:
+            lines.append(f"Costs extrapolated from a sample (x{self.sample_factor:.2f})")
+        header = ("dataset", "units", "requests", "pixels", "download", "disk", "time")
+        rows = [header]
+        for plan in self.datasets:
+            label = f"{plan.stage}/{plan.name}"
+            cost = plan.cost
+            if cost is None:
+                rows.append((label, "-", "-", "-", "-", "-", "no estimate"))
+                continue
+            rows.append(
+                (
+                    label,
+                    f"{cost.work_units:,}",
+                    f"{cost.requests:,}",
+                    f"{cost.pixels:,}",
+                    _format_bytes(cost.bytes),
+                    _format_bytes(cost.disk_bytes),
+                    _format_seconds(plan.seconds or 0.0),
+                )
+            )
+        widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+        for row in rows:
+            lines.append("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+        for plan in self.datasets:
+            for note in plan.cost.notes if plan.cost else []:
+                lines.append(f"note: {plan.stage}/{plan.name}: {note}")
+        return "\n".join(lines)
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if value < 1024 or unit == "TiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def _format_seconds(seconds: float) -> str:
+    return str(timedelta(seconds=int(round(seconds))))
+
+
+def synthetic_index(
+    count: int,
+    *,
+    start: Any = "2018-01-01",
+    end: Any = "2021-12-31",
+    seed: int = 0,
+    max_days: int = SAMPLE_MAX_DAYS,
+) -> pd.DataFrame:
+    """Index of ``count`` random point fires over the CONUS between ``start`` and ``end``.
+
+    Durations are uniform in ``[1, max_days]`` days. Used to plan runs before the
+    real index exists.
+    """
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = SAMPLE_BOUNDS
+    first = pd.Timestamp(start)
+    span = max(1, (pd.Timestamp(end) - first).days)
+    starts = first + pd.to_timedelta(rng.integers(0, span, count), unit="D")
+    durations = pd.to_timedelta(rng.integers(0, max_days, count), unit="D")
+    return pd.DataFrame(
+        {
+            "Id": np.arange(1, count + 1),
+            "IDate": starts,
+            "FDate": starts + durations,
+            "lat": rng.uniform(min_lat, max_lat, count),
+            "lon": rng.uniform(min_lon, max_lon, count),
+        }
+    )
+
+
+def plan_index(
+    config: PipelineConfig,
+    *,
+    index_path: Optional[Path] = None,
+    sample: Optional[int] = None,
+    seed: int = 0,
+) -> Tuple[Any, str, float]:
+    """Return ``(index, description, scale factor)`` for planning.
+
+    Uses ``index_path``, else the index a previous run stored under
+    ``paths.raw_data``. ``sample`` keeps that many random fires (costs are scaled
+    back up) or, when no index exists, generates that many synthetic fires within
+    the index dataset's ``start_date``/``end_date``.
+    """
+    from .io.storage import read_index
+
+    entry = config.schema.index
+    stored = config.paths.raw_data / "index" / entry.name / INDEX_FILENAME
+    path = Path(index_path) if index_path else stored
+    if path.exists():
+        index = read_index(path)
+        source = str(path)
+    elif index_path:
+        raise ConfigError(f"Index file not found: {index_path}")
+    elif sample:
+        index = synthetic_index(
+            sample,
+            start=entry.options.get("start_date", "2018-01-01"),
+            end=entry.options.get("end_date", "2021-12-31"),
+            seed=seed,
+        )
+        return index, f"{sample} synthetic fires", 1.0
+    else:
+        raise ConfigError(
+            f"No index at {stored}; pass an index file or a sample size to plan without one"
+        )
+    if sample and sample < len(index):
+        factor = len(index) / sample
+        index = index.sample(n=sample, random_state=seed).sort_index()
+        return index, f"{sample} of {int(round(sample * factor))} fires in {source}", factor
+    return index, source, 1.0
+
+
+def _plan_dataset(
+    stage: str,
+    entry: DatasetEntry,
+    index: Any,
+    config: PipelineConfig,
+    *,
+    factor: float,
+    concurrency: Optional[int],
+    request_seconds: float,
+    bytes_per_second: float,
+) -> DatasetPlan:
+    cost_function = None
+    if not entry.function:
+        cost_function = registry.get_cost(source=entry.source, name=entry.registered_name)
+    if cost_function is None:
+        return DatasetPlan(stage=stage, name=entry.name, cost=None)
+    cost = cost_function(index, entry.options, config)
+    if factor != 1.0:
+        cost = cost.scaled(factor)
+    seconds = cost.seconds(
+        concurrency=concurrency,
+        request_seconds=request_seconds,
+        bytes_per_second=bytes_per_second,
+    )
+    return DatasetPlan(stage=stage, name=entry.name, cost=cost, seconds=seconds)
+
+
+def plan_pipeline(
+    config_path: Path,
+    *,
+    index_path: Optional[Path] = None,
+    sample: Optional[int] = None,
+    seed: int = 0,
+    concurrency: Optional[int] = None,
+    request_seconds: float = DEFAULT_REQUEST_SECONDS,
+    bytes_per_second: float = DEFAULT_BYTES_PER_SECOND,
+) -> RunPlan:
+    """Estimate every configured dataset's cost without authenticating or fetching.
+
+    Each dataset's registered cost function, the index's included, is applied to the
+    planning index (see :func:`plan_index`). Time assumes ``request_seconds`` of
+    latency per request plus transfer at ``bytes_per_second``, spread over
+    ``concurrency`` parallel requests (default: each dataset's own ``workers``).
+    """
+    load_builtin_datasets()
+    config = load_config(config_path)
+    index, source, factor = plan_index(config, index_path=index_path, sample=sample, seed=seed)
+    plan = RunPlan(
+        index_rows=int(round(len(index) * factor)), index_source=source, sample_factor=factor
+    )
+    stages = [("index", [config.schema.index]), *config.schema.stages()]
+    for stage, entries in stages:
+        for entry in entries:
+            plan.datasets.append(
+                _plan_dataset(
+                    stage,
+                    entry,
+                    index,
+                    config,
+                    factor=factor,
+                    concurrency=concurrency,
+                    request_seconds=request_seconds,
+                    bytes_per_second=bytes_per_second,
+                )
+            )
+    logger.debug("Planned %d datasets over %s", len(plan.datasets), source)
+    return plan
@@ -0,0 +1,145 @@
+"""Spatial index over fire regions and merging of overlapping fetch requests."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from shapely import STRtree, box
+
+__all__ = ["FireRegion", "FireRegionIndex", "union_bbox"]
+
+BBox = Tuple[float, float, float, float]
+
+
+def union_bbox(boxes: Iterable[BBox]) -> BBox:
+    """Smallest bbox containing every box in ``boxes``."""
+    min_x, min_y, max_x, max_y = zip(*boxes)
+    return (min(min_x), min(min_y), max(max_x), max(max_y))
+
+
+def _area(bbox: BBox) -> float:
+    return (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
+
+
+@dataclass(frozen=True)
+class FireRegion:
+    """One fire's buffered lon/lat bbox, output CRS and active days (inclusive)."""
+
+    fire_id: Any
+    bbox: BBox
+    crs: str
+    first_day: date
+    last_day: date
+
+    def active_on(self, day: date) -> bool:
+        return self.first_day <= day <= self.last_day
+
+
+class FireRegionIndex:
+    """STRtree over buffered fire boxes, filtered by each fire's active date span.
+
+    Answers which fires touch a box on a day (:meth:`query`) and groups fires that
+    are active on the same day, share a CRS and overlap or touch into shared fetch
+    regions (:meth:`fetch_regions`). A group is only merged when its union box is no
+    larger than the boxes fetched separately, so chains of distant fires are not.
+    """
+
+    def __init__(self, regions: Sequence[FireRegion]) -> None:
+        self.regions = list(regions)
+        self._tree = STRtree([box(*region.bbox) for region in self.regions])
+        self._first = np.array([region.first_day.toordinal() for region in self.regions])
+        self._last = np.array([region.last_day.toordinal() for region in self.regions])
+        self._by_day: Dict[date, Dict[Any, BBox]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_index(
+        cls,
+        index: Any,
+        *,
+        crs: Optional[str] = None,
+        buffer_days: int = 0,
+        buffer_m: Optional[float] = None,
+    ) -> "FireRegionIndex":
+        """Build from the index table with the same boxes and CRS as the work units."""
+        from .workunits import DEFAULT_BUFFER_M, fire_bbox, utm_crs
+
+        buffer_m = DEFAULT_BUFFER_M if buffer_m is None else buffer_m
+        if index is None or len(index) == 0:
+            return cls([])
+        geometries = index.geometry if "geometry" in index else None
+        padding = timedelta(days=buffer_days)
+        regions = []
+        rows = index[["Id", "IDate", "FDate", "lat", "lon"]].itertuples(index=False)
+        for position, row in enumerate(rows):
+            geometry = geometries.iloc[position] if geometries is not None else None
+            regions.append(
+                FireRegion(
+                    fire_id=row.Id,
+                    bbox=fire_bbox(geometry, row.lon, row.lat, buffer_m),
+                    crs=crs or utm_crs(row.lon, row.lat),
+                    first_day=pd.Timestamp(row.IDate).date() - padding,
+                    last_day=pd.Timestamp(row.FDate).date() + padding,
+                )
+            )
+        return cls(regions)
+
+    def _active(self, positions: np.ndarray, day: date) -> np.ndarray:
+        ordinal = day.toordinal()
+        return positions[(self._first[positions] <= ordinal) & (self._last[positions] >= ordinal)]
+
+    def query(self, bbox: BBox, day: Optional[date] = None) -> List[Any]:
+        """Ids of fires whose box intersects ``bbox`` (and that are active on ``day``)."""
+        positions = self._tree.query(box(*bbox), predicate="intersects")
+        if day is not None:
+            positions = self._active(positions, day)
+        return [self.regions[position].fire_id for position in sorted(positions)]
+
+    def fetch_regions(self, day: date) -> Dict[Any, BBox]:
+        """Map each fire active on ``day`` to the box to fetch for it that day."""
+        with self._lock:
+            cached = self._by_day.get(day)
+        if cached is not None:
+            return cached
+        active = self._active(np.arange(len(self.regions)), day)
+        parent = {int(position): int(position) for position in active}
+
+        def find(position: int) -> int:
+            while parent[position] != position:
+                parent[position] = parent[parent[position]]
+                position = parent[position]
+            return position
+
+        for position in active:
+            region = self.regions[position]
+            for other in self._tree.query(box(*region.bbox), predicate="intersects"):
+                other = int(other)
+                if other in parent and self.regions[other].crs == region.crs:
+                    parent[find(other)] = find(int(position))
+
+        groups: Dict[int, List[int]] = {}
+        for position in parent:
+            groups.setdefault(find(position), []).append(position)
+        assignment: Dict[Any, BBox] = {}
+        for members in groups.values():
+            boxes = [self.regions[member].bbox for member in members]
+            merged = union_bbox(boxes)
+            shared = _area(merged) <= sum(_area(bbox) for bbox in boxes)
+            for member, bbox in zip(members, boxes):
+                assignment[self.regions[member].fire_id] = merged if shared else bbox
+        with self._lock:
+            self._by_day[day] = assignment
+        return assignment
+
+    def assign(self, units: Iterable[Any]) -> Iterator[Any]:
+        """Yield work units with ``fetch_bbox`` set to their shared fetch region."""
+        for unit in units:
+            fetch_bbox = self.fetch_regions(unit.date).get(unit.fire_id)
+            if fetch_bbox is not None and fetch_bbox != unit.bbox:
+                unit = replace(unit, fetch_bbox=fetch_bbox)
+            yield unit
@@ -0,0 +1,130 @@
+"""Concurrent scheduling of the datasets inside one pipeline stage."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Collection, Dict, List, Optional, Sequence, TypeVar
+
+from .config import ConfigError, DatasetEntry
+
+__all__ = ["DatasetFailure", "PipelineError", "StageResult", "run_stage_entries"]
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+
+@dataclass
+class DatasetFailure:
+    """A dataset that raised, or was skipped because a dependency failed."""
+
+    stage: str
+    name: str
+    error: BaseException
+
+    def __str__(self) -> str:
+        return f"{self.stage}/{self.name}: {self.error}"
+
+
+class PipelineError(RuntimeError):
+    """Raised once the pipeline has finished when one or more datasets failed."""
+
+    def __init__(self, failures: Sequence[DatasetFailure]) -> None:
+        self.failures = list(failures)
+        details = "; ".join(str(failure) for failure in self.failures)
+        super().__init__(f"{len(self.failures)} dataset(s) failed: {details}")
+
+
+@dataclass
+class StageResult:
+    """Results of the datasets that completed and the failures that were collected."""
+
+    results: Dict[str, object]
+    failures: List[DatasetFailure]
+
+
+def _check_acyclic(entries: Sequence[DatasetEntry]) -> None:
+    local = {entry.name: entry for entry in entries}
+    visiting: set[str] = set()
+    done: set[str] = set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ConfigError(f"Circular depends_on involving dataset '{name}'")
+        visiting.add(name)
+        for dependency in local[name].depends_on:
+            if dependency in local:
+                visit(dependency)
+        visiting.discard(name)
+        done.add(name)
+
+    for entry in entries:
+        visit(entry.name)
+
+
+def run_stage_entries(
+    stage: str,
+    entries: Sequence[DatasetEntry],
+    run: Callable[[DatasetEntry], R],
+    *,
+    max_workers: int,
+    failed: Collection[str] = (),
+) -> StageResult:
+    """Run ``entries`` concurrently while honouring their ``depends_on`` links.
+
+    Dependencies on datasets outside ``entries`` refer to earlier stages and are
+    satisfied unless they appear in ``failed``. A dataset that raises is recorded as
+    a failure; its dependents are skipped, every other dataset still runs.
+    """
+
+    _check_acyclic(entries)
+    local = {entry.name for entry in entries}
+    remaining: Dict[str, DatasetEntry] = {entry.name: entry for entry in entries}
+    completed: set[str] = set()
+    failed_names = set(failed)
+    result = StageResult(results={}, failures=[])
+
+    def blocked_by(entry: DatasetEntry) -> Optional[str]:
+        return next((name for name in entry.depends_on if name in failed_names), None)
+
+    def ready(entry: DatasetEntry) -> bool:
+        return all(name in completed for name in entry.depends_on if name in local)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{stage}-dataset") as pool:
+        running: Dict["Future[R]", DatasetEntry] = {}
+        while remaining or running:
+            for name, entry in list(remaining.items()):
+                blocker = blocked_by(entry)
+                if blocker is not None:
+                    del remaining[name]
+                    failed_names.add(name)
+                    result.failures.append(
+                        DatasetFailure(stage, name, RuntimeError(f"dependency '{blocker}' failed"))
+                    )
+                    logger.error(
+                        "Skipping %s dataset '%s': dependency '%s' failed", stage, name, blocker
+                    )
+                elif ready(entry):
+                    del remaining[name]
+                    running[pool.submit(run, entry)] = entry
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                entry = running.pop(future)
+                try:
+                    result.results[entry.name] = future.result()
+                except Exception as exc:
+                    failed_names.add(entry.name)
+                    result.failures.append(DatasetFailure(stage, entry.name, exc))
+                    logger.exception("%s dataset '%s' failed", stage, entry.name)
+                else:
+                    completed.add(entry.name)
+
+    return result
@@ -0,0 +1,249 @@
+"""Deterministic index sharding for multi-node runs and merging of shard outputs.
+
+``raster-builder run config.yml --shard 1/4`` runs every stage after the index on
+the fires whose ``Id`` hashes to shard 1 of 4. The index itself is built once, by
+whichever shard gets its lock first, and reused by the others. Every shard writes
+below ``shards/shard-<i>-of-<N>/`` in the raw and processed directories;
+``raster-builder merge config.yml`` combines them into the regular layout.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from .config import ConfigError, load_config
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .context import PipelineContext
+
+__all__ = ["ShardSpec", "merge_shards", "shard_of", "write_shard_metadata"]
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIRNAME = "shards"
+SHARD_METADATA_FILENAME = "shard.json"
+
+
+def shard_of(fire_id: Any, count: int) -> int:
+    """Shard of a fire ``Id``; stable across processes, machines and Python versions."""
+    digest = hashlib.blake2b(str(fire_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Shard ``index`` (0-based) of ``count``."""
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count < 1 or not 0 <= self.index < self.count:
+            raise ConfigError(f"Invalid shard {self.index}/{self.count} (expected 0 <= i < N)")
+
+    @classmethod
+    def parse(cls, text: str) -> "ShardSpec":
+        """Parse ``i/N``."""
+        index, sep, count = text.partition("/")
+        try:
+            if not sep:
+                raise ValueError
+            return cls(int(index), int(count))
+        except ValueError:
+            raise ConfigError(f"Invalid shard '{text}' (expected 'i/N', e.g. '0/4')") from None
+
+    @property
+    def label(self) -> str:
+        return f"shard-{self.index}-of-{self.count}"
+
+    def directory(self, root: Path) -> Path:
+        """This shard's private copy of ``root`` (the raw or processed data directory)."""
+        return root / SHARDS_DIRNAME / self.label
+
+    def select(self, index: Any) -> Any:
+        """The rows of an index whose fire ``Id`` belongs to this shard."""
+        if index is None or len(index) == 0:
+            return index
+        owned = index["Id"].map(lambda fire_id: shard_of(fire_id, self.count) == self.index)
+        return index[owned.to_numpy()].reset_index(drop=True)
+
+
+def write_shard_metadata(context: "PipelineContext", *, status: str) -> Path:
+    """Record what the context's shard covered next to its run report, for merging."""
+    from .io.storage import atomic_output
+
+    shard = context.shard
+    assert shard is not None
+    index = dict(context.artifacts.get("index", {}))
+    index_key = ("index", context.config.schema.index.name)
+    shard_rows = 0 if context.index_data is None else len(context.index_data)
+    record = {
+        "shard": shard.index,
+        "count": shard.count,
+        "status": status,
+        "index_fingerprint": context.fingerprints.get(index_key),
+        "index_rows": index.pop("rows", shard_rows),
+        "shard_rows": shard_rows,
+        "index": index,
+        "fingerprints": {
+            f"{stage}/{name}": fingerprint
+            for (stage, name), fingerprint in context.fingerprints.items()
+        },
+    }
+    path = shard.directory(context.processed_path) / SHARD_METADATA_FILENAME
+    with atomic_output(path) as tmp_path:
+        tmp_path.write_text(json.dumps(record, indent=2, default=str), encoding="utf-8")
+    return path
+
+
+def _read_shards(processed: Path) -> List[Dict[str, Any]]:
+    records = []
+    for path in sorted((processed / SHARDS_DIRNAME).glob(f"shard-*/{SHARD_METADATA_FILENAME}")):
+        records.append(json.loads(path.read_text(encoding="utf-8")))
+    if not records:
+        raise ConfigError(f"No shard outputs found under {processed / SHARDS_DIRNAME}")
+    counts = {record["count"] for record in records}
+    if len(counts) > 1:
+        raise ConfigError(f"Shard outputs of different shard counts {sorted(counts)} found")
+    count = counts.pop()
+    problems = []
+    present = {record["shard"] for record in records}
+    missing = sorted(set(range(count)) - present)
+    if missing:
+        problems.append(f"missing shards {missing} of {count}")
+    failed = sorted(record["shard"] for record in records if record["status"] != "succeeded")
+    if failed:
+        problems.append(f"shards {failed} did not succeed")
+    if len({record["index_fingerprint"] for record in records}) > 1:
+        problems.append("shards were built from different indexes")
+    if problems:
+        raise ConfigError("Cannot merge shards: " + "; ".join(problems))
+    return sorted(records, key=lambda record: record["shard"])
+
+
+def _link(source: Path, target: Path) -> None:
+    """Hard-link ``source`` to ``target`` (copying across filesystems), replacing it."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def _merge_dataset(shard_dirs: List[Path], target: Path) -> int:
+    """Merge one dataset's shard directories into ``target``; returns the files written.
+
+    Parquet manifests at the top of the dataset directory are concatenated; every
+    other file (per-fire outputs, which shards never share) is linked into place.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from .io.storage import FINGERPRINT_FILENAME, atomic_output
+
+    manifests: Dict[str, List[Path]] = {}
+    written = 0
+    for shard_dir in shard_dirs:
+        for path in sorted(shard_dir.rglob("*")):
+            if not path.is_file() or path.name == FINGERPRINT_FILENAME:
+                continue
+            relative = path.relative_to(shard_dir)
+            if path.suffix == ".parquet" and len(relative.parts) == 1:
+                manifests.setdefault(path.name, []).append(path)
+                continue
+            _link(path, target / relative)
+            written += 1
+    for name, paths in manifests.items():
+        tables = [pq.read_table(path) for path in paths]
+        with atomic_output(target / name) as tmp_path:
+            pq.write_table(
+                pa.concat_tables(tables, promote_options="default"),
+                tmp_path,
+                compression="zstd",
+            )
+        written += 1
+    return written
+
+
+def merge_shards(config_path: Path) -> Path:
+    """Combine the outputs of all shards of a run into the regular output layout.
+
+    Every shard must have succeeded and been built from the same index. Dataset
+    manifests are concatenated, per-fire files are hard-linked into place, shard
+    run reports are merged into ``run_report.json`` (with the index and shard
+    metadata) and a dataset is marked complete when every shard completed it.
+    Returns the path of the merged run report.
+    """
+    from .io.storage import atomic_output, clear_fingerprint, read_fingerprint, write_fingerprint
+    from .metrics import REPORT_FILENAME, merge_reports
+
+    config = load_config(config_path)
+    processed = config.paths.processed_data
+    records = _read_shards(processed)
+    shards = [ShardSpec(record["shard"], record["count"]) for record in records]
+
+    stages = [stage for stage, _ in config.schema.stages()]
+    for root in dict.fromkeys((config.paths.raw_data, processed)):
+        for stage in stages:
+            names = sorted(
+                {
+                    path.name
+                    for shard in shards
+                    for path in (shard.directory(root) / stage).glob("*")
+                    if path.is_dir()
+                }
+            )
+            for name in names:
+                shard_dirs = [shard.directory(root) / stage / name for shard in shards]
+                target = root / stage / name
+                target.mkdir(parents=True, exist_ok=True)
+                clear_fingerprint(target)
+                written = _merge_dataset([path for path in shard_dirs if path.is_dir()], target)
+                fingerprints = {read_fingerprint(path) for path in shard_dirs}
+                if len(fingerprints) == 1 and None not in fingerprints:
+                    write_fingerprint(target, fingerprints.pop())
+                logger.info("Merged %s dataset '%s' from %d shards", stage, name, len(shards))
+                logger.debug("Wrote %d files to %s", written, target)
+
+    reports = []
+    for shard in shards:
+        report_path = shard.directory(processed) / REPORT_FILENAME
+        exists = report_path.exists()
+        reports.append(json.loads(report_path.read_text(encoding="utf-8")) if exists else {})
+    report = merge_reports(
+        reports,
+        status="succeeded",
+        failures=[],
+        config_path=str(config.config_path),
+        index={
+            "fingerprint": records[0]["index_fingerprint"],
+            "rows": records[0]["index_rows"],
+            **records[0]["index"],
+        },
+        shards=[
+            {
+                "shard": record["shard"],
+                "rows": record["shard_rows"],
+                "wall_seconds": report.get("wall_seconds"),
+            }
+            for record, report in zip(records, reports)
+        ],
+    )
+    merged_rows = sum(record["shard_rows"] for record in records)
+    if merged_rows != records[0]["index_rows"]:
+        logger.warning(
+            "Shards cover %d fires but the index has %d", merged_rows, records[0]["index_rows"]
+        )
+    path = processed / REPORT_FILENAME
+    with atomic_output(path) as tmp_path:
+        tmp_path.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+    logger.info("Merged %d shards into %s", len(shards), path)
+    return path
@@ -0,0 +1,406 @@
+"""Expansion of the index into fire-day work units and their parallel dispatch."""
+
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from .config import ConfigError, ExecutionConfig
+from .context import PipelineContext
+from .datasets.registry import DatasetCallable, register_dataset
+from .io.auth import authenticate_earth_engine
+from .io.executor import RequestExecutor
+from .io.journal import RunJournal
+from .io.storage import dataset_output_dir, raster_writer
+from .metrics import RunMetrics
+from .planner import DatasetCost
+
+__all__ = [
+    "WorkUnit",
+    "WorkUnitError",
+    "WorkUnitReport",
+    "UnitHandler",
+    "UnitOutput",
+    "iter_work_units",
+    "option_work_units",
+    "options_crs",
+    "run_work_units",
+    "register_work_unit_dataset",
+]
+
+logger = logging.getLogger(__name__)
+
+BBox = Tuple[float, float, float, float]
+Counters = List[Tuple[str, Dict[str, Any], float]]
+DEFAULT_BUFFER_M = 10_000.0
+METERS_PER_DEGREE = 111_320.0
+
+# Request executor of a work unit worker process, set up by ``_init_worker``; its
+# counters are shipped back to the run's metrics with each unit's result.
+_WORKER_EXECUTOR: Optional[RequestExecutor] = None
+_WORKER_METRICS: Optional[RunMetrics] = None
+
+
+@dataclass(frozen=True)
+class WorkUnit:
+    """One fire on one day.
+
+    ``bbox`` is ``(min_lon, min_lat, max_lon, max_lat)`` in EPSG:4326; ``crs`` is the
+    projection outputs for this unit should be written in. ``fetch_bbox`` is set when
+    the unit shares a larger fetch region with overlapping fires on the same day.
+    """
+
+    fire_id: Any
+    date: date
+    bbox: BBox
+    crs: str
+    fetch_bbox: Optional[BBox] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.fire_id}/{self.date.isoformat()}"
+
+
+UnitHandler = Callable[[WorkUnit, Mapping[str, Any], Path], Any]
+
+
+@dataclass(frozen=True)
+class UnitOutput:
+    """What a handler produced: the output file and how many bytes it downloaded."""
+
+    path: Optional[Path] = None
+    bytes_downloaded: int = 0
+
+
+class WorkUnitError(RuntimeError):
+    """Raised after dispatch when one or more work units failed."""
+
+
+@dataclass
+class WorkUnitReport:
+    """Outcome of dispatching work units to a handler."""
+
+    completed: List[Tuple[WorkUnit, Any]] = field(default_factory=list)
+    failed: List[Tuple[WorkUnit, BaseException]] = field(default_factory=list)
+    resumed: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "completed": len(self.completed),
+            "failed": len(self.failed),
+            "resumed": self.resumed,
+            "failed_units": [unit.key for unit, _ in self.failed],
+        }
+
+
+def utm_crs(lon: float, lat: float) -> str:
+    """Return the WGS84 UTM zone EPSG code containing ``(lon, lat)``."""
+    zone = min(60, int(math.floor((lon + 180.0) / 6.0)) + 1)
+    return f"EPSG:{32600 + zone if lat >= 0 else 32700 + zone}"
+
+
+def options_crs(options: Mapping[str, Any]) -> Optional[str]:
+    """The CRS a dataset's ``crs`` or ``utm_zone`` option selects, if any."""
+    if options.get("crs"):
+        return str(options["crs"])
+    if options.get("utm_zone"):
+        zone = str(options["utm_zone"])
+        return zone if ":" in zone else f"EPSG:{zone}"
+    return None
+
+
+def fire_bbox(geometry: Any, lon: float, lat: float, buffer_m: float) -> BBox:
+    """Bounding box of a fire's perimeter (or start point) padded by ``buffer_m`` metres."""
+    if geometry is not None and not getattr(geometry, "is_empty", True):
+        min_lon, min_lat, max_lon, max_lat = geometry.bounds
+    else:
+        min_lon = max_lon = float(lon)
+        min_lat = max_lat = float(lat)
+    pad_lat = buffer_m / METERS_PER_DEGREE
+    pad_lon = buffer_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return (min_lon - pad_lon, min_lat - pad_lat, max_lon + pad_lon, max_lat + pad_lat)
+
+
+def iter_work_units(
+    index: Any,
+    *,
+    crs: Optional[str] = None,
+    buffer_days: int = 0,
+    buffer_m: float = DEFAULT_BUFFER_M,
+    include: Optional[Callable[[Any], bool]] = None,
+) -> Iterator[WorkUnit]:
+    """Lazily yield one unit per fire and day of its burning period.
+
+    Days run from ``IDate - buffer_days`` to ``FDate + buffer_days``. ``crs`` defaults
+    to the UTM zone of each fire's start location; ``include`` selects fires by id.
+    """
+    if index is None or len(index) == 0:
+        return
+    geometries = index.geometry if "geometry" in index else None
+    padding = timedelta(days=buffer_days)
+    rows = index[["Id", "IDate", "FDate", "lat", "lon"]].itertuples(index=False)
+    for position, row in enumerate(rows):
+        if include is not None and not include(row.Id):
+            continue
+        geometry = geometries.iloc[position] if geometries is not None else None
+        bbox = fire_bbox(geometry, row.lon, row.lat, buffer_m)
+        unit_crs = crs or utm_crs(row.lon, row.lat)
+        first = pd.Timestamp(row.IDate).date() - padding
+        last = pd.Timestamp(row.FDate).date() + padding
+        day = first
+        while day <= last:
+            yield WorkUnit(fire_id=row.Id, date=day, bbox=bbox, crs=unit_crs)
+            day += timedelta(days=1)
+
+
+def option_work_units(index: Any, options: Mapping[str, Any]) -> Iterator[WorkUnit]:
+    """Work units of ``index`` for a dataset's ``buffer_days``, ``buffer_m`` and CRS options."""
+    return iter_work_units(
+        index,
+        crs=options_crs(options),
+        buffer_days=int(options.get("buffer_days", 0)),
+        buffer_m=float(options.get("buffer_m", DEFAULT_BUFFER_M)),
+    )
+
+
+def _unit_count_cost(workers: int) -> Callable[..., DatasetCost]:
+    def cost(index: Any, options: Mapping[str, Any], config: Any) -> DatasetCost:
+        units = sum(1 for _ in option_work_units(index, options))
+        return DatasetCost(
+            work_units=units,
+            requests=units,
+            concurrency=int(options.get("workers", workers)),
+            notes=["one request per unit assumed; no pixel estimate"],
+        )
+
+    return cost
+
+
+def _init_worker(service_account: Optional[Path], execution: ExecutionConfig) -> None:
+    """Prepare a worker process: authenticate and build its own request executor.
+
+    Worker processes do not inherit Earth Engine initialization under spawn, nor can
+    they share the run's executor, so each gets one with the run's execution settings.
+    Without a ``service_account`` the worker keeps whatever credentials it inherited.
+    """
+    global _WORKER_EXECUTOR, _WORKER_METRICS
+
+    if service_account is not None:
+        authenticate_earth_engine(service_account)
+    _WORKER_METRICS = RunMetrics()
+    _WORKER_EXECUTOR = RequestExecutor.from_config(execution, metrics=_WORKER_METRICS)
+
+
+def _timed_call(
+    handler: UnitHandler,
+    unit: WorkUnit,
+    options: Mapping[str, Any],
+    output_dir: Path,
+) -> Tuple[Any, float, Counters]:
+    """Run a handler and measure it where it executes, which may be a worker process.
+
+    In a worker process the handler gets the worker's executor and the counters it
+    recorded are returned with the result.
+    """
+    if _WORKER_EXECUTOR is not None:
+        options = {**options, "executor": _WORKER_EXECUTOR}
+    start = time.perf_counter()
+    try:
+        result = handler(unit, options, output_dir)
+    finally:
+        counters = _WORKER_METRICS.drain_counters() if _WORKER_METRICS is not None else []
+    return result, time.perf_counter() - start, counters
+
+
+def _make_pool(
+    mode: str,
+    workers: int,
+    *,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> Executor:
+    """Thread or process pool; ``initializer(*initargs)`` runs in each worker process."""
+    if mode == "process":
+        return ProcessPoolExecutor(
+            max_workers=workers, initializer=initializer, initargs=initargs
+        )
+    if mode == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="work-unit")
+    raise ConfigError(f"Unknown work unit parallelism '{mode}' (expected 'thread' or 'process')")
+
+
+def run_work_units(
+    units: Iterable[WorkUnit],
+    handler: UnitHandler,
+    options: Mapping[str, Any],
+    output_dir: Path,
+    *,
+    workers: int = 4,
+    mode: str = "thread",
+    journal: Optional[RunJournal] = None,
+    journal_key: str = "",
+    metrics: Optional[RunMetrics] = None,
+    dataset: str = "",
+    executor: Optional[RequestExecutor] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> WorkUnitReport:
+    """Dispatch ``handler(unit, options, output_dir)`` for every unit on a pool.
+
+    Units are pulled from the iterator lazily with at most ``2 * workers`` in flight.
+    In ``thread`` mode handlers receive ``executor`` as the ``executor`` option. In
+    ``process`` mode the handler and options must be picklable and
+    ``initializer(*initargs)`` prepares each worker (e.g. authenticates). With a
+    ``journal``, units already recorded as done under ``journal_key`` are skipped
+    and every state change is recorded; handlers should write through
+    :func:`~raster_builder.io.storage.atomic_output` and return the output path
+    (or a :class:`UnitOutput`, which also reports downloaded bytes).
+    """
+    report = WorkUnitReport()
+    pending: Deque[Tuple[WorkUnit, "Future[Tuple[Any, float, Counters]]"]] = deque()
+    options = dict(options)
+    if mode == "thread" and executor is not None:
+        options["executor"] = executor
+    done = journal.completed_units(journal_key) if journal is not None else set()
+
+    def collect(unit: WorkUnit, future: "Future[Tuple[Any, float, Counters]]") -> None:
+        try:
+            result, seconds, counters = future.result()
+        except Exception as exc:
+            logger.error("Work unit %s failed: %s", unit.key, exc)
+            report.failed.append((unit, exc))
+            if metrics is not None:
+                metrics.incr("work_units_failed", dataset=dataset)
+            if journal is not None:
+                journal.mark_failed(journal_key, unit.key, exc)
+            return
+        report.completed.append((unit, result))
+        if metrics is not None:
+            for name, labels, value in counters:
+                metrics.incr(name, value, **labels)
+            metrics.observe("work_unit", seconds, dataset=dataset)
+            if isinstance(result, UnitOutput) and result.bytes_downloaded:
+                metrics.incr("bytes_downloaded", result.bytes_downloaded, dataset=dataset)
+        if journal is not None:
+            if isinstance(result, UnitOutput):
+                output_path = result.path
+            else:
+                output_path = Path(result) if isinstance(result, (str, Path)) else None
+            journal.mark_done(journal_key, unit.key, output_path)
+
+    with _make_pool(mode, workers, initializer=initializer, initargs=initargs) as pool:
+        for unit in units:
+            if unit.key in done:
+                report.resumed += 1
+                continue
+            if journal is not None:
+                journal.mark_running(journal_key, unit.key)
+            pending.append(
+                (unit, pool.submit(_timed_call, handler, unit, options, output_dir))
+            )
+            if len(pending) >= workers * 2:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+    return report
+
+
+def register_work_unit_dataset(
+    *,
+    source: str,
+    name: str,
+    workers: int = 4,
+    cost: Optional[Callable[..., DatasetCost]] = None,
+) -> Callable[[UnitHandler], DatasetCallable]:
+    """Register a handler for one work unit as a dataset that covers the whole index.
+
+    Recognised options: ``buffer_days``, ``buffer_m``, ``crs``/``utm_zone``,
+    ``workers`` (default ``workers``), ``parallelism`` (``thread`` or ``process``) and
+    ``merge_regions`` (share one fetch between overlapping fires of the same day).
+    All options are also forwarded to the handler, together with ``cache_dir`` and
+    ``lock_dir`` (under ``paths.scratch``), ``cache_max_bytes``
+    (``execution.cache_size_mb``) and ``executor``, the request executor handlers must
+    send remote calls through. Raster handlers write through
+    :func:`~raster_builder.io.storage.raster_writer` (``output_format`` option), whose
+    ``finalize`` runs after the last unit. Progress is
+    journaled per dataset fingerprint, so a restarted run only processes units that are
+    incomplete or failed. ``cost`` estimates the dataset for ``raster-builder plan``;
+    without one the plan counts units and assumes one request each.
+    """
+
+    def decorator(handler: UnitHandler) -> DatasetCallable:
+        def run(
+            context: PipelineContext,
+            options: Mapping[str, Any],
+            *,
+            dataset_name: Optional[str] = None,
+        ) -> WorkUnitReport:
+            entry = dataset_name or name
+            output_dir = dataset_output_dir(context, stage=source, dataset_name=entry)
+            journal_key = f"{source}/{entry}/{context.fingerprints.get((source, entry), '')}"
+            if context.force:
+                context.journal.reset(journal_key)
+            units = option_work_units(context.index_data, options)
+            if options.get("merge_regions"):
+                regions = context.region_index(
+                    crs=options_crs(options),
+                    buffer_days=int(options.get("buffer_days", 0)),
+                    buffer_m=float(options.get("buffer_m", DEFAULT_BUFFER_M)),
+                )
+                units = regions.assign(units)
+            handler_options = {
+                "cache_dir": str(context.scratch_path / "cache"),
+                "lock_dir": str(context.scratch_path / "locks"),
+                "cache_max_bytes": context.config.execution.cache_size_mb * 1024**2,
+                **options,
+            }
+            report = run_work_units(
+                units,
+                handler,
+                handler_options,
+                output_dir,
+                workers=int(options.get("workers", workers)),
+                mode=str(options.get("parallelism", "thread")),
+                journal=context.journal,
+                journal_key=journal_key,
+                metrics=context.metrics,
+                dataset=entry,
+                executor=context.executor,
+                initializer=_init_worker,
+                initargs=(
+                    context.config.credentials.earthengine_service_account,
+                    context.config.execution,
+                ),
+            )
+            for path in raster_writer(handler_options, output_dir).finalize():
+                logger.info("Assembled %s", path)
+            context.add_artifact(entry, report.summary())
+            logger.info(
+                "%s dataset '%s' processed %d work units (%d failed, %d resumed)",
+                source,
+                entry,
+                len(report.completed) + len(report.failed),
+                len(report.failed),
+                report.resumed,
+            )
+            if report.failed:
+                raise WorkUnitError(f"{len(report.failed)} work unit(s) of '{entry}' failed")
+            return report
+
+        run.__name__ = handler.__name__
+        run.__qualname__ = handler.__qualname__
+        run.__module__ = handler.__module__
+        run.__doc__ = handler.__doc__
+        register_dataset(source=source, name=name, cost=cost or _unit_count_cost(workers))(run)
+        return handler
+
+    return decorator
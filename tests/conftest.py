@@ -0,0 +1,105 @@
+"""Shared fixtures: the simulated ``ee`` backend from ``benchmarks/fake_ee.py``."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parents[1] / "benchmarks"
+if str(BENCHMARKS) not in sys.path:
+    sys.path.insert(0, str(BENCHMARKS))
+
+from fake_ee import FakeEarthEngine  # noqa: E402
+
+from raster_builder.io.executor import RequestExecutor  # noqa: E402
+from raster_builder.metrics import RunMetrics  # noqa: E402
+
+START = "2020-01-01"
+END = "2020-06-30"
+
+
+@pytest.fixture
+def fake_ee(monkeypatch: pytest.MonkeyPatch) -> Callable[..., FakeEarthEngine]:
+    """Install a fake ``ee`` (no latency) as the module the pipeline imports."""
+
+    def install(fires: int = 10, **options: Any) -> FakeEarthEngine:
+        options = {"start": START, "end": END, "latency": 0.0, "jitter": 0.0, **options}
+        backend = FakeEarthEngine(fires=fires, **options)
+        module = backend.module()
+        monkeypatch.setitem(sys.modules, "ee", module)
+        index = sys.modules.get("raster_builder.datasets.index")
+        if index is not None:  # bound ``ee`` when first imported
+            monkeypatch.setattr(index, "ee", module)
+        return backend
+
+    return install
+
+
+@pytest.fixture
+def metrics() -> RunMetrics:
+    return RunMetrics()
+
+
+@pytest.fixture
+def executor(metrics: RunMetrics) -> Iterator[RequestExecutor]:
+    """A request executor that retries without sleeping and counts into ``metrics``."""
+    with RequestExecutor(4, sleep=lambda seconds: None, metrics=metrics) as pool:
+        yield pool
+
+
+def set_options(path: Path, stage: str = "earthengine", position: int = 0, **options: Any) -> None:
+    """Update the options of a stage's dataset entry in the configuration at ``path``."""
+    import yaml
+
+    config = yaml.safe_load(path.read_text(encoding="utf-8"))
+    config["schema"][stage][position].setdefault("options", {}).update(options)
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+
+def counter(metrics: RunMetrics, name: str) -> float:
+    """Total of counter ``name`` over all label sets."""
+    return sum(item["value"] for item in metrics.report()["counters"] if item["name"] == name)
+
+
+@pytest.fixture
+def pipeline_config(tmp_path: Path) -> Callable[..., Path]:
+    """Write a pipeline configuration under ``tmp_path`` for the fake backend."""
+
+    def write(**execution: Any) -> Path:
+        import yaml
+
+        service_account = tmp_path / "service_account.json"
+        service_account.write_text(
+            json.dumps({"client_email": "test@example.com", "project_id": "test"}),
+            encoding="utf-8",
+        )
+        config: Dict[str, Any] = {
+            "credentials": {"earthengine_service_account": str(service_account)},
+            "paths": {
+                "raw_data": str(tmp_path / "raw"),
+                "processed_data": str(tmp_path / "processed"),
+                "scratch": str(tmp_path / "scratch"),
+            },
+            "schema": {
+                "index": {
+                    "name": "globfire",
+                    "options": {"start_date": START, "end_date": END, "min_size": 0},
+                },
+                "earthengine": [
+                    {
+                        "dataset": "firepred_daily",
+                        "options": {"resolution": 2000.0, "buffer_m": 2000.0},
+                    }
+                ],
+            },
+            "execution": {"max_concurrency": 4, "backoff_base": 0.01, **execution},
+        }
+        path = tmp_path / "pipeline.yml"
+        path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        return path
+
+    return write
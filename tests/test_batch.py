@@ -0,0 +1,59 @@
+"""Batch custom datasets run over the index in worker processes."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Mapping
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+import yaml
+
+from raster_builder.datasets.batch import batch_dataset
+from raster_builder.pipeline import run_pipeline
+
+
+@batch_dataset(batch_size=2)
+def fire_days(batch: Any, options: Mapping[str, Any]) -> pd.DataFrame:
+    """Days each fire burned, tagged with the process that computed them."""
+    frame = batch.to_pandas()
+    return pd.DataFrame(
+        {
+            "Id": frame["Id"],
+            "days": (frame["FDate"] - frame["IDate"]).dt.days + 1,
+            "pid": os.getpid(),
+        }
+    )
+
+
+@pytest.mark.parametrize("parallelism", ["process", "thread"])
+def test_batches_cover_the_index_in_order(
+    parallelism, fake_ee, pipeline_config, tmp_path
+) -> None:
+    fake_ee(fires=7)
+    path = pipeline_config()
+    config = yaml.safe_load(path.read_text(encoding="utf-8"))
+    del config["schema"]["earthengine"]
+    config["schema"]["custom"] = [
+        {
+            "dataset": "burn_days",
+            "function": f"{__name__}:fire_days",
+            "options": {"processes": 2, "parallelism": parallelism},
+        }
+    ]
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+    context = run_pipeline(path)
+
+    output = pq.read_table(tmp_path / "processed" / "custom" / "burn_days" / "burn_days.parquet")
+    result = output.to_pandas()
+    index = context.index_data
+    assert result["Id"].tolist() == index["Id"].tolist()
+    assert result["days"].tolist() == ((index["FDate"] - index["IDate"]).dt.days + 1).tolist()
+    workers = set(result["pid"])
+    if parallelism == "process":
+        assert os.getpid() not in workers
+    else:
+        assert workers == {os.getpid()}
+    assert context.artifacts["burn_days"]["batches"] == 4  # ceil(7 / 2)
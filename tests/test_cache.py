@@ -0,0 +1,54 @@
+"""Disk cache of fetched arrays: fetched once, evicted least recently used first."""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+from raster_builder.io.cache import DiskCache, cache_key
+
+SHAPE = (32, 32)
+
+
+def _fetcher(value: float, calls: List[float]) -> Callable[[Path], None]:
+    def fetch(path: Path) -> None:
+        calls.append(value)
+        array = np.lib.format.open_memmap(path, mode="w+", dtype="float64", shape=SHAPE)
+        array[:] = value
+        array.flush()
+
+    return fetch
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path) -> None:
+    entry_bytes = np.zeros(SHAPE).nbytes
+    cache = DiskCache(tmp_path, max_bytes=3 * entry_bytes + 1024)  # three entries and headers
+    calls: List[float] = []
+    keys = [cache_key("day", number) for number in range(4)]
+    for number, key in enumerate(keys[:3]):
+        cache.get_or_fetch(key, _fetcher(number, calls))
+        os.utime(cache._path(key), (number, number))
+
+    assert cache.get(keys[0]) is not None  # a read makes the oldest entry the newest
+    cache.get_or_fetch(keys[3], _fetcher(3, calls))
+
+    assert cache.get(keys[1]) is None
+    assert [cache.get(key)[0, 0] for key in (keys[0], keys[2], keys[3])] == [0, 2, 3]
+    assert cache.size() <= cache.max_bytes
+    assert not cache._path(keys[1]).with_suffix(".lock").exists()
+
+
+def test_concurrent_misses_fetch_once(tmp_path) -> None:
+    cache = DiskCache(tmp_path)
+    calls: List[float] = []
+    key = cache_key("static", "srtm")
+
+    with ThreadPoolExecutor(8) as pool:
+        arrays = list(pool.map(lambda _: cache.get_or_fetch(key, _fetcher(7, calls)), range(8)))
+
+    assert calls == [7]
+    assert all(np.array_equal(array, np.full(SHAPE, 7.0)) for array in arrays)
@@ -0,0 +1,38 @@
+"""Loading and validating pipeline configurations."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+import yaml
+
+from raster_builder.config import ConfigError, load_config
+
+
+def _add_entry(path: Path, stage: str, entry: Dict[str, Any]) -> None:
+    config = yaml.safe_load(path.read_text(encoding="utf-8"))
+    config["schema"].setdefault(stage, []).append(entry)
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+
+def test_dataset_names_are_unique_across_stages(pipeline_config) -> None:
+    path = pipeline_config()
+    _add_entry(path, "custom", {"dataset": "firepred_daily", "function": "module:function"})
+
+    with pytest.raises(ConfigError, match="'firepred_daily' is declared in stage 'earthengine'"):
+        load_config(path)
+
+
+def test_depends_on_must_name_an_earlier_dataset(pipeline_config) -> None:
+    path = pipeline_config()
+    _add_entry(path, "custom", {"dataset": "fuel", "function": "module:function"})
+    _add_entry(
+        path,
+        "earthengine",
+        {"dataset": "landcover", "options": {}, "depends_on": ["fuel"]},
+    )
+
+    with pytest.raises(ConfigError, match="depends on unknown or later datasets: fuel"):
+        load_config(path)
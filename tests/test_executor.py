@@ -0,0 +1,102 @@
+"""Retries, error classification and the concurrency bound of the request executor."""
+
+from __future__ import annotations
+
+import types
+from typing import List
+
+import pytest
+from fake_ee import EEException
+
+from raster_builder.io.executor import RequestExecutor, call_with_retry, is_transient_error
+
+from .conftest import counter
+
+
+def _status_error(status: int) -> Exception:
+    """An HTTP error the way googleapiclient raises it, with the status on ``resp``."""
+    error = Exception("request failed")
+    error.resp = types.SimpleNamespace(status=status)  # type: ignore[attr-defined]
+    return error
+
+
+@pytest.mark.parametrize(
+    ("error", "transient"),
+    [
+        (EEException("Too many concurrent aggregations."), True),
+        (EEException("User memory limit exceeded; quota exhausted"), True),
+        (TimeoutError(), True),
+        (ConnectionResetError(), True),
+        (Exception("HTTP Error 503: Service Unavailable"), True),
+        (_status_error(429), True),
+        (_status_error(400), False),
+        (EEException("Image.select: Pattern 'B99' did not match any bands."), False),
+        (ValueError("Fire 500 has no geometry"), False),
+    ],
+)
+def test_transient_errors_are_recognised(error, transient) -> None:
+    assert is_transient_error(error) is transient
+
+
+def test_quota_errors_are_retried_up_to_max_retries(fake_ee) -> None:
+    backend = fake_ee(fires=1, error_rate=1.0)
+    delays: List[float] = []
+    events: List[str] = []
+
+    with pytest.raises(EEException, match="Too many concurrent"):
+        call_with_retry(
+            backend.get_asset,
+            "asset",
+            max_retries=3,
+            backoff_base=1.0,
+            sleep=delays.append,
+            on_event=events.append,
+        )
+
+    assert backend.stats.requests["getAsset"] == 4
+    assert events.count("requests") == 4
+    assert events.count("request_retries") == 3
+    assert events.count("request_failures") == 1
+    # Full jitter below an exponentially growing ceiling.
+    assert all(0 <= delay <= 2**attempt for attempt, delay in enumerate(delays))
+    assert len(delays) == 3
+
+
+def test_transient_failures_recover(executor, metrics) -> None:
+    attempts: List[int] = []
+
+    def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise EEException("Too many concurrent aggregations.")
+        return "ok"
+
+    assert executor.submit(flaky).result() == "ok"
+    assert counter(metrics, "requests") == 3
+    assert counter(metrics, "request_retries") == 2
+    assert counter(metrics, "request_failures") == 0
+
+
+def test_non_transient_errors_are_raised_at_once(executor, metrics) -> None:
+    attempts: List[int] = []
+
+    def broken() -> None:
+        attempts.append(1)
+        raise ValueError("Image.select: band not found")
+
+    with pytest.raises(ValueError, match="band not found"):
+        executor.submit(broken).result()
+    assert len(attempts) == 1
+    assert counter(metrics, "request_retries") == 0
+    assert counter(metrics, "request_failures") == 1
+
+
+def test_concurrency_is_bounded_by_max_workers(fake_ee) -> None:
+    backend = fake_ee(fires=1, latency=0.01, max_concurrent=None)
+
+    with RequestExecutor(3, sleep=lambda seconds: None) as executor:
+        versions = list(executor.map(backend.get_asset, [str(n) for n in range(30)]))
+
+    assert [version["id"] for version in versions] == [str(n) for n in range(30)]
+    assert backend.stats.requests["getAsset"] == 30
+    assert 1 < backend.stats.peak_in_flight <= 3
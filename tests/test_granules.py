@@ -0,0 +1,198 @@
+"""CMR granule planning and downloads against a local ``http.server`` stand-in."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import Counter
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+import requests
+import yaml
+
+from raster_builder.io.granules import (
+    GranuleCache,
+    GranuleDownloader,
+    plan_granules,
+    search_granules,
+)
+from raster_builder.io.storage import read_fingerprint
+from raster_builder.pipeline import run_pipeline
+
+from .conftest import counter
+
+# name -> (min_lon, max_lon) of the granule's footprint and its content
+GRANULES = {
+    "west.hdf": ((-120.0, -110.0), b"west" * 1000),
+    "east.hdf": ((-110.0, -100.0), b"east" * 1000),
+}
+CORRUPT = "corrupt.hdf"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.hits: Counter = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def item(self, name: str, checksum: str) -> Dict[str, Any]:
+        content = GRANULES.get(name, (None, b"corrupt"))[1]
+        return {
+            "meta": {"concept-id": f"G-{name}", "revision-id": 1},
+            "umm": {
+                "RelatedUrls": [{"Type": "GET DATA", "URL": f"{self.url}/data/{name}"}],
+                "DataGranule": {
+                    "ArchiveAndDistributionInformation": [
+                        {
+                            "Name": name,
+                            "SizeInBytes": len(content),
+                            "Checksum": {"Value": checksum, "Algorithm": "MD5"},
+                        }
+                    ]
+                },
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _Server
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        parts = urlsplit(self.path)
+        with self.server.lock:
+            self.server.hits[parts.path] += 1
+        if parts.path == "/search/granules.umm_json":
+            params = parse_qs(parts.query)
+            bbox = params["bounding_box"][0].split(",")
+            min_lon, max_lon = float(bbox[0]), float(bbox[2])
+            items = [
+                self.server.item(name, hashlib.md5(content).hexdigest())
+                for name, ((west, east), content) in GRANULES.items()
+                if min_lon < east and max_lon > west
+            ]
+            if params["short_name"][0] == "CORRUPT":
+                items = [self.server.item(CORRUPT, "0" * 32)]
+            self._send(json.dumps({"items": items}).encode("utf-8"))
+        elif parts.path.startswith("/data/"):
+            name = parts.path.rsplit("/", 1)[1]
+            self._send(GRANULES.get(name, (None, b"corrupt"))[1])
+        else:
+            self.send_error(404)
+
+    def _send(self, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def cmr() -> Iterator[_Server]:
+    server = _Server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _plan(cmr: _Server, executor, short_name: str = "MOD14A1"):
+    day = date(2020, 7, 1)
+    queries: List[Tuple[Any, Tuple[float, float, float, float], date, date]] = [
+        (1, (-116.0, 40.0, -115.0, 41.0), day, day),
+        (2, (-114.0, 40.0, -113.0, 41.0), day, day),
+        (3, (-106.0, 40.0, -105.0, 41.0), day, day),
+        (4, (-111.0, 40.0, -109.0, 41.0), day, day),  # straddles both granules
+    ]
+
+    def search(bbox, start, end):
+        with requests.Session() as session:
+            return search_granules(
+                session, short_name=short_name, bbox=bbox, start=start, end=end, cmr_url=cmr.url
+            )
+
+    return plan_granules(queries, search, executor)
+
+
+def test_plan_deduplicates_granules_shared_by_fires(cmr, executor) -> None:
+    plan = _plan(cmr, executor)
+
+    assert plan.searches == 4
+    assert cmr.hits["/search/granules.umm_json"] == 4
+    fires = {plan.granules[key].filename: ids for key, ids in plan.fires.items()}
+    assert fires == {"west.hdf": {1, 2, 4}, "east.hdf": {3, 4}}
+
+
+def test_granules_download_once_and_then_hit_the_cache(cmr, executor, metrics, tmp_path) -> None:
+    plan = _plan(cmr, executor)
+    granules = list(plan.granules.values())
+    cache = GranuleCache(tmp_path / "granules")
+
+    # Every granule is requested three times at once; each is still fetched once.
+    with GranuleDownloader(cache, requests.Session, workers=6, metrics=metrics) as downloader:
+        paths = downloader.download_all(granules * 3)
+
+    assert {path.name: path.read_bytes() for path in paths.values()} == {
+        name: content for name, (_, content) in GRANULES.items()
+    }
+    assert cmr.hits["/data/west.hdf"] == cmr.hits["/data/east.hdf"] == 1
+    assert counter(metrics, "granules_downloaded") == 2
+    assert counter(metrics, "granules_cached") == 4
+
+    with GranuleDownloader(cache, requests.Session, metrics=metrics) as downloader:
+        assert downloader.download_all(granules) == paths
+    assert cmr.hits["/data/west.hdf"] == cmr.hits["/data/east.hdf"] == 1
+    assert counter(metrics, "granules_cached") == 6
+
+
+def test_checksum_mismatch_is_not_cached(cmr, executor, tmp_path) -> None:
+    plan = _plan(cmr, executor, short_name="CORRUPT")
+    cache = GranuleCache(tmp_path / "granules")
+    granule = next(iter(plan.granules.values()))
+
+    with GranuleDownloader(cache, requests.Session) as downloader:
+        with pytest.raises(IOError, match="checksum mismatch"):
+            downloader.download(granule)
+
+    assert cache.get(granule) is None
+
+
+def test_granule_entries_write_under_their_own_names(
+    cmr, fake_ee, pipeline_config, tmp_path
+) -> None:
+    fake_ee(fires=3)
+    path = pipeline_config()
+    config = yaml.safe_load(path.read_text(encoding="utf-8"))
+    config["schema"]["earthaccess"] = [
+        {"dataset": "granules", "name": name, "options": {"short_name": name, "cmr_url": cmr.url}}
+        for name in ("modis", "viirs")
+    ]
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+    run_pipeline(path)
+
+    fingerprints = set()
+    for name in ("modis", "viirs"):
+        output_dir = tmp_path / "processed" / "earthaccess" / name
+        manifest = pd.read_parquet(output_dir / "granules.parquet")
+        assert set(manifest["Id"]) and manifest["path"].notna().all()
+        fingerprints.add(read_fingerprint(output_dir))
+    assert len(fingerprints) == 2 and None not in fingerprints
+    assert not (tmp_path / "processed" / "earthaccess" / "granules").exists()
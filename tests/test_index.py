@@ -0,0 +1,143 @@
+"""GlobFire index: batched daily-perimeter queries and ignition-centroid matching."""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from raster_builder.config import load_config
+from raster_builder.datasets import index as globfire
+from raster_builder.datasets.index import (
+    PARTITIONS_DIRNAME,
+    _globfire_cost,
+    _globfire_index,
+    _match_initial_coordinates,
+    _update_globfire_store,
+)
+from raster_builder.planner import plan_pipeline
+
+from .conftest import START
+
+
+def _millis(text: str) -> int:
+    return int(pd.Timestamp(text, tz="UTC").timestamp() * 1000)
+
+
+def test_match_picks_the_closest_day_within_24_hours() -> None:
+    fires = pd.DataFrame(
+        {"Id": [1, 2, 3], "IDate": pd.to_datetime(["2020-01-05"] * 3)},
+        index=[10, 11, 12],
+    )
+    daily = pd.DataFrame(
+        {
+            "Id": [1, 1, 1, 2, 3],
+            "IDate": [
+                _millis("2020-01-03"),
+                _millis("2020-01-04 12:00"),
+                _millis("2020-01-05 06:00"),
+                _millis("2020-01-03"),  # two days early: no match
+                None,  # incomplete rows are ignored
+            ],
+            "lat": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "lon": [-1.0, -2.0, -3.0, -4.0, -5.0],
+        }
+    )
+
+    matched = _match_initial_coordinates(fires, daily)
+
+    assert matched.loc[10, "lat"] == 3.0 and matched.loc[10, "lon"] == -3.0
+    assert matched.loc[[11, 12], "lat"].isna().all()
+
+
+def test_match_without_daily_rows_returns_no_coordinates() -> None:
+    fires = pd.DataFrame({"Id": [1], "IDate": pd.to_datetime(["2020-01-05"])})
+    daily = pd.DataFrame(columns=["Id", "IDate", "lat", "lon"])
+
+    assert _match_initial_coordinates(fires, daily).empty
+
+
+def test_daily_centroids_are_fetched_in_batches(fake_ee, executor) -> None:
+    backend = fake_ee(fires=7)
+    start, end = datetime(2020, 1, 1), datetime(2020, 7, 1)
+
+    batched = _globfire_index(start, end, 0, executor, batch_size=2)
+    # One final-perimeter query plus ceil(7 / 2) daily queries, all fires in 2020.
+    assert backend.stats.requests["size"] == 1 + math.ceil(7 / 2)
+
+    single = _globfire_index(start, end, 0, executor, batch_size=1000)
+    assert backend.stats.requests["size"] == 1 + math.ceil(7 / 2) + 2
+
+    assert len(batched) == 7
+    columns = ["Id", "IDate", "lat", "lon"]
+    pd.testing.assert_frame_equal(
+        batched.sort_values("Id")[columns].reset_index(drop=True),
+        single.sort_values("Id")[columns].reset_index(drop=True),
+    )
+    # Synthetic perimeters grow around a fixed centre, so the ignition-day centroid is it.
+    centroids = [geometry.centroid for geometry in batched.geometry]
+    np.testing.assert_allclose(batched["lon"], [point.x for point in centroids], atol=1e-6)
+    np.testing.assert_allclose(batched["lat"], [point.y for point in centroids], atol=1e-6)
+
+
+def test_extending_the_range_fetches_only_the_missing_interval(
+    fake_ee, executor, monkeypatch, tmp_path
+) -> None:
+    fake_ee(fires=30, end="2020-09-30")
+    start, cutoff, end = datetime(2020, 1, 1), datetime(2020, 6, 1), datetime(2020, 9, 30)
+    fetched = []
+
+    def recording_index(gap_start, gap_end, *args, **kwargs):
+        fetched.append((gap_start, gap_end))
+        return _globfire_index(gap_start, gap_end, *args, **kwargs)
+
+    monkeypatch.setattr(globfire, "_globfire_index", recording_index)
+    store = tmp_path / PARTITIONS_DIRNAME
+    _update_globfire_store(store, start, cutoff, 0, executor, batch_size=4)
+    extended = _update_globfire_store(store, start, end, 0, executor, batch_size=4)
+    assert fetched == [(start, cutoff), (cutoff, end)]
+
+    fetched.clear()
+    assert _update_globfire_store(store, start, end, 0, executor, batch_size=4).equals(extended)
+    assert fetched == []  # fully covered: nothing is queried
+
+    # Refreshed fires replace their stored rows, so the result matches a single fetch.
+    columns = ["Id", "IDate", "FDate", "lat", "lon"]
+    full = _globfire_index(start, end, 0, executor, batch_size=4)
+    pd.testing.assert_frame_equal(
+        extended.sort_values("Id")[columns].reset_index(drop=True),
+        full.sort_values("Id")[columns].reset_index(drop=True),
+        check_dtype=False,
+    )
+
+
+def test_plan_counts_full_and_incremental_index_fetches(
+    fake_ee, executor, pipeline_config
+) -> None:
+    backend = fake_ee(fires=30, end="2020-09-30")
+    path = pipeline_config()
+    assert plan_pipeline(path, sample=5).datasets[0].name == "globfire"
+    config = load_config(path)
+    store = config.paths.raw_data / "index" / "globfire" / PARTITIONS_DIRNAME
+    start, cutoff, end = datetime(2020, 1, 1), datetime(2020, 6, 1), datetime(2020, 9, 30)
+    options = {"start_date": START, "end_date": "2020-06-01", "min_size": 0, "batch_size": 4}
+    index = _globfire_index(start, end, 0, executor, batch_size=4)
+
+    def queries() -> int:
+        return backend.stats.requests["size"] + backend.stats.requests["toList"]
+
+    served = queries()
+    planned = _globfire_cost(index, options, config)
+    _update_globfire_store(store, start, cutoff, 0, executor, batch_size=4)
+    assert planned.requests == queries() - served > 0
+    assert _globfire_cost(index, options, config).requests == 0
+
+    options["end_date"] = end.date().isoformat()
+    served = queries()
+    planned = _globfire_cost(index, options, config)
+    _update_globfire_store(store, start, end, 0, executor, batch_size=4)
+    # Only the new months and the fires still burning at the cutoff are queried.
+    assert planned.requests == queries() - served > 0
+    assert planned.bytes > 0 and planned.disk_bytes > 0
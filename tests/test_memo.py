@@ -0,0 +1,82 @@
+"""Disk memoization of Earth Engine query results."""
+
+from __future__ import annotations
+
+import os
+import time
+import types
+from datetime import datetime
+
+import pytest
+
+from raster_builder.datasets.index import _globfire_index
+from raster_builder.io import memo
+from raster_builder.io.memo import RequestCache
+
+
+def test_hits_misses_and_expiry(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    cache = RequestCache(tmp_path, max_bytes=1 << 20, ttl_seconds=3600)
+    key = cache.key("expression", "v1")
+
+    assert cache.get(key) is None
+    cache.put(key, {"features": [1, 2]})
+    assert cache.get(key) == {"features": [1, 2]}
+    assert cache.get(cache.key("expression", "v2")) is None  # a new asset version misses
+
+    later = time.time() + 7200
+    monkeypatch.setattr(memo, "time", types.SimpleNamespace(time=lambda: later))
+    assert cache.get(key) is None
+    assert cache.stats == {"hits": 1, "misses": 3, "expired": 1}
+    assert not any(tmp_path.rglob("*.json.gz"))
+
+
+def test_pages_are_found_once_complete(tmp_path) -> None:
+    cache = RequestCache(tmp_path, max_bytes=1 << 20)
+    key = cache.key("collection")
+    for page in range(3):
+        cache.put_page(key, page, [page])
+
+    assert cache.get_pages(key) is None
+    cache.put_pages(key, 3)
+    assert cache.get_pages(key) == [[0], [1], [2]]
+
+    cache._path(cache.page_key(key, 1)).unlink()  # e.g. evicted on its own
+    assert cache.get_pages(key) is None
+
+
+def test_eviction_scans_only_when_over_budget(tmp_path, monkeypatch) -> None:
+    cache = RequestCache(tmp_path, max_bytes=1 << 20)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+
+    for number in range(50):
+        key = cache.key(str(number))
+        cache.put(key, "x" * 100)
+        os.utime(cache._path(key), (number, number))  # read in order of writing
+    assert len(scans) == 1  # the first write measures the cache, later writes add up
+
+    cache.max_bytes = cache.size() // 2
+    scans.clear()
+    cache.put(cache.key("one more"), "x" * 100)
+    assert len(scans) == 1  # over budget: one scan to evict
+    assert cache.size() <= cache.max_bytes
+    assert cache.get(cache.key("0")) is None  # least recently used first
+    assert cache.get(cache.key("one more")) == "x" * 100
+
+
+def test_cached_index_queries_are_not_repeated(fake_ee, executor, tmp_path) -> None:
+    backend = fake_ee(fires=7)
+    start, end = datetime(2020, 1, 1), datetime(2020, 7, 1)
+    cache = RequestCache(tmp_path, max_bytes=1 << 30, ttl_seconds=3600)
+
+    first = _globfire_index(start, end, 0, executor, batch_size=2, cache=cache)
+    served = dict(backend.stats.requests)
+    second = _globfire_index(start, end, 0, executor, batch_size=2, cache=cache)
+
+    assert served["toList"] > 0
+    requests = dict(backend.stats.requests)
+    assert requests["toList"] == served["toList"] and requests["size"] == served["size"]
+    assert requests["getAsset"] > served["getAsset"]  # only asset versions are checked
+    assert cache.stats["hits"] == cache.stats["misses"] == 1 + 4
+    assert first.equals(second)
@@ -0,0 +1,119 @@
+"""Fingerprinted reruns of a whole pipeline against the fake backend."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Set, Tuple
+
+import yaml
+
+from raster_builder.pipeline import run_pipeline
+
+from .conftest import counter, set_options
+
+
+def _outputs(path: Path) -> Set[str]:
+    """Suffixes of the visible entries of a dataset output directory (``""`` for fire dirs)."""
+    return {entry.suffix for entry in path.iterdir() if not entry.name.startswith(".")}
+
+
+def test_unchanged_datasets_are_skipped(fake_ee, pipeline_config) -> None:
+    backend = fake_ee(fires=3)
+    path = pipeline_config()
+
+    run_pipeline(path)
+    served = backend.stats.to_dict()["total_requests"]
+    context = run_pipeline(path)
+
+    assert backend.stats.to_dict()["total_requests"] == served
+    assert counter(context.metrics, "datasets_skipped") == 2  # the index and firepred_daily
+
+
+SUMMARY_RUNS: List[str] = []
+
+
+def summarize(context: Any, options: Mapping[str, Any]) -> None:
+    """Custom dataset that records each run."""
+    SUMMARY_RUNS.append(context.fingerprints[("custom", "summary")])
+
+
+def test_dependents_rerun_when_a_dependency_changes(fake_ee, pipeline_config) -> None:
+    fake_ee(fires=3)
+    path = pipeline_config()
+    config = yaml.safe_load(path.read_text(encoding="utf-8"))
+    config["schema"]["custom"] = [
+        {
+            "dataset": "summary",
+            "function": f"{__name__}:summarize",
+            "depends_on": ["firepred_daily"],
+        }
+    ]
+    path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    SUMMARY_RUNS.clear()
+
+    run_pipeline(path)
+    run_pipeline(path)
+    assert len(SUMMARY_RUNS) == 1
+
+    set_options(path, resolution=3000.0)
+    run_pipeline(path)
+    assert len(SUMMARY_RUNS) == 2 and SUMMARY_RUNS[0] != SUMMARY_RUNS[1]
+
+
+def test_changed_options_remove_stale_outputs(fake_ee, pipeline_config, tmp_path) -> None:
+    fake_ee(fires=3)
+    path = pipeline_config()
+    output_dir = tmp_path / "raw" / "earthengine" / "firepred_daily"
+
+    run_pipeline(path)
+    assert _outputs(output_dir) == {""}
+
+    set_options(path, output_format="zarr")
+    run_pipeline(path)
+    assert _outputs(output_dir) == {".zarr"}
+
+    set_options(path, output_format="cog")
+    run_pipeline(path)
+    assert _outputs(output_dir) == {".tif"}
+
+
+def _cube_shapes(output_dir: Path) -> Dict[str, Tuple[int, ...]]:
+    import zarr
+
+    return {
+        store.name: zarr.open_group(str(store), mode="r")["data"].shape
+        for store in output_dir.glob("*.zarr")
+    }
+
+
+def test_changed_grid_replaces_zarr_cubes(fake_ee, pipeline_config, tmp_path) -> None:
+    fake_ee(fires=3)
+    path = pipeline_config()
+    output_dir = tmp_path / "raw" / "earthengine" / "firepred_daily"
+    set_options(path, output_format="zarr", resolution=3000.0)
+    run_pipeline(path)
+    coarse = _cube_shapes(output_dir)
+
+    set_options(path, resolution=2000.0)
+    run_pipeline(path)
+    run_pipeline(path, force=True)
+
+    fine = _cube_shapes(output_dir)
+    assert fine.keys() == coarse.keys()
+    for name, (days, _, height, width) in fine.items():
+        assert days == coarse[name][0]  # the same days, not appended to the old cube
+        assert height > coarse[name][2] and width > coarse[name][3]
+    # Lock files live in scratch, not next to the cubes.
+    assert [entry.name for entry in output_dir.glob(".*")] == [".fingerprint.json"]
+    assert list((tmp_path / "scratch" / "locks").glob("*.zarr.*.lock"))
+
+
+def test_cog_staging_is_removed_once_assembled(fake_ee, pipeline_config, tmp_path) -> None:
+    fake_ee(fires=3)
+    path = pipeline_config()
+    set_options(path, output_format="cog")
+    run_pipeline(path)
+
+    output_dir = tmp_path / "raw" / "earthengine" / "firepred_daily"
+    assert _outputs(output_dir) == {".tif"}
+    assert not (output_dir / ".days").exists()
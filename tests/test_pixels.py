@@ -0,0 +1,135 @@
+"""Tiled ``computePixels`` requests and their mosaic into one output."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from raster_builder.io.pixels import BLOCK_SIZE, PixelGrid, fetch_into, plan_tiles
+from raster_builder.pipeline import run_pipeline
+
+from .conftest import counter, set_options
+
+BANDS = ["a", "b"]
+GRID = PixelGrid(
+    crs="EPSG:32611", x0=500_000.0, y0=4_000_000.0, resolution=30.0, width=700, height=600
+)
+# Small enough that the grid needs several tiles.
+MAX_BYTES = BLOCK_SIZE * BLOCK_SIZE * len(BANDS) * 4
+
+
+def _expected(grid: PixelGrid) -> np.ndarray:
+    """Band ``i`` holds ``i * 1e6 + row * 1e3 + col`` in ``GRID`` pixel coordinates."""
+    rows, cols = np.mgrid[0 : grid.height, 0 : grid.width].astype(np.float32)
+    col_off = round((grid.x0 - GRID.x0) / GRID.resolution)
+    row_off = round((GRID.y0 - grid.y0) / GRID.resolution)
+    return np.stack(
+        [band * 1e6 + (rows + row_off) * 1e3 + (cols + col_off) for band in range(len(BANDS))]
+    ).astype(np.float32)
+
+
+def _fetcher(request: Dict[str, Any]) -> np.ndarray:
+    """Answer a request with the structured array ``computePixels`` would return."""
+    transform = request["grid"]["affineTransform"]
+    size = request["grid"]["dimensions"]
+    grid = PixelGrid(
+        crs=request["grid"]["crsCode"],
+        x0=transform["translateX"],
+        y0=transform["translateY"],
+        resolution=transform["scaleX"],
+        width=size["width"],
+        height=size["height"],
+    )
+    values = _expected(grid)
+    data = np.empty((grid.height, grid.width), dtype=[(band, np.float32) for band in BANDS])
+    for position, band in enumerate(request["bandIds"]):
+        data[band] = values[position]
+    return data
+
+
+def test_plan_tiles_cover_the_grid_once() -> None:
+    tiles = plan_tiles(GRID, len(BANDS), max_bytes=MAX_BYTES)
+
+    assert len(tiles) > 1
+    coverage = np.zeros((GRID.height, GRID.width), dtype=int)
+    for col, row, tile in tiles:
+        assert tile.width * tile.height * len(BANDS) * 4 <= MAX_BYTES
+        assert tile.x0 == GRID.x0 + col * GRID.resolution
+        assert tile.y0 == GRID.y0 - row * GRID.resolution
+        coverage[row : row + tile.height, col : col + tile.width] += 1
+    assert (coverage == 1).all()
+
+
+def test_plan_tiles_keeps_small_grids_whole() -> None:
+    assert plan_tiles(GRID, len(BANDS)) == [(0, 0, GRID)]
+
+
+def test_fetch_into_mosaics_tiles_in_place(executor, metrics) -> None:
+    mosaic = np.full((len(BANDS), GRID.height, GRID.width), np.nan, dtype=np.float32)
+
+    def sink(array: np.ndarray, col: int, row: int) -> None:
+        mosaic[:, row : row + array.shape[1], col : col + array.shape[2]] = array
+
+    fetched = fetch_into(
+        None, GRID, BANDS, sink, executor=executor, max_bytes=MAX_BYTES, fetcher=_fetcher
+    )
+
+    np.testing.assert_array_equal(mosaic, _expected(GRID))
+    assert fetched == mosaic.nbytes
+    tiles = len(plan_tiles(GRID, len(BANDS), max_bytes=MAX_BYTES))
+    assert counter(metrics, "requests") == tiles
+
+
+def test_fetch_into_retries_tiles_on_the_executor(executor, metrics) -> None:
+    failed = set()
+    lock = threading.Lock()
+
+    def flaky(request: Dict[str, Any]) -> np.ndarray:
+        key = json.dumps(request["grid"], sort_keys=True)
+        with lock:
+            first = key not in failed
+            failed.add(key)
+        if first:
+            raise RuntimeError("Too many concurrent aggregations.")
+        return _fetcher(request)
+
+    mosaic = np.zeros((len(BANDS), GRID.height, GRID.width), dtype=np.float32)
+
+    def sink(array: np.ndarray, col: int, row: int) -> None:
+        mosaic[:, row : row + array.shape[1], col : col + array.shape[2]] = array
+
+    fetch_into(None, GRID, BANDS, sink, executor=executor, max_bytes=MAX_BYTES, fetcher=flaky)
+
+    np.testing.assert_array_equal(mosaic, _expected(GRID))
+    assert counter(metrics, "request_retries") == len(failed)
+    assert counter(metrics, "requests") == 2 * len(failed)
+
+
+def _run(path: Path, parallelism: str) -> Dict[str, float]:
+    set_options(path, parallelism=parallelism)
+    run_pipeline(path, force=True)
+    report = json.loads((path.parent / "processed" / "run_report.json").read_text())
+    return {item["name"]: item["value"] for item in report["counters"] if not item["labels"]}
+
+
+def test_pixel_requests_are_counted_in_the_run_report(fake_ee, pipeline_config) -> None:
+    backend = fake_ee(fires=4)
+    path = pipeline_config()
+
+    counters = _run(path, "thread")
+    served = backend.stats.to_dict()
+    pixel_requests = served["requests"]["computePixels"]
+    assert pixel_requests > 0
+    assert counters["requests"] == served["total_requests"]
+
+    # Worker processes count on their own executors and report with each unit's result.
+    shutil.rmtree(path.parent / "scratch" / "cache")
+    counters = _run(path, "process")
+    parent_requests = backend.stats.to_dict()["total_requests"] - served["total_requests"]
+    assert backend.stats.requests["computePixels"] == pixel_requests  # none in this process
+    assert counters["requests"] == parent_requests + pixel_requests
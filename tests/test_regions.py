@@ -0,0 +1,50 @@
+"""Shared fetch regions of overlapping fires."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from raster_builder.regions import FireRegion, FireRegionIndex
+from raster_builder.workunits import WorkUnit
+
+CRS = "EPSG:32610"
+JULY = [date(2020, 7, day) for day in range(1, 6)]
+
+
+def _region(fire_id: int, bbox, first: int, last: int, crs: str = CRS) -> FireRegion:
+    return FireRegion(fire_id, bbox, crs, JULY[first], JULY[last])
+
+
+def _units(index: FireRegionIndex, day: date):
+    units = [
+        WorkUnit(region.fire_id, day, region.bbox, region.crs)
+        for region in index.regions
+        if region.active_on(day)
+    ]
+    return {unit.fire_id: unit.fetch_bbox for unit in index.assign(units)}
+
+
+def test_overlapping_fires_share_a_region_on_days_both_burn() -> None:
+    index = FireRegionIndex(
+        [
+            _region(1, (0.0, 0.0, 1.0, 1.0), 0, 4),
+            _region(2, (0.5, 0.0, 1.5, 1.0), 2, 4),
+            _region(3, (5.0, 5.0, 6.0, 6.0), 0, 4),  # far away
+            _region(4, (0.2, 0.2, 0.8, 0.8), 0, 4, crs="EPSG:32611"),
+        ]
+    )
+
+    assert _units(index, JULY[0]) == {1: None, 3: None, 4: None}
+    shared = (0.0, 0.0, 1.5, 1.0)
+    assert _units(index, JULY[3]) == {1: shared, 2: shared, 3: None, 4: None}
+    assert index.query((0.6, 0.6, 0.9, 0.9), JULY[0]) == [1, 4]
+    assert index.query((0.6, 0.6, 0.9, 0.9), JULY[3]) == [1, 2, 4]
+
+
+def test_fires_touching_at_a_corner_are_fetched_separately() -> None:
+    index = FireRegionIndex(
+        [_region(1, (0.0, 0.0, 1.0, 1.0), 0, 0), _region(2, (1.0, 1.0, 2.0, 2.0), 0, 0)]
+    )
+
+    # The union box would fetch twice the area of the two boxes.
+    assert _units(index, JULY[0]) == {1: None, 2: None}
@@ -0,0 +1,114 @@
+"""A run split over two ``--shard`` processes, then merged into the regular layout."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set
+
+import pandas as pd
+import pytest
+
+from raster_builder.main import main
+from raster_builder.pipeline import run_pipeline
+from raster_builder.shards import ShardSpec, shard_of
+
+from .conftest import BENCHMARKS, END, START
+
+FIRES = 12
+CHILD = """
+import sys
+from fake_ee import FakeEarthEngine
+
+FakeEarthEngine(fires={fires}, start={start!r}, end={end!r}, latency=0.0, jitter=0.0).install()
+from raster_builder.main import main
+
+main(sys.argv[1:])
+"""
+
+
+def _fire_ids(root: Path) -> Set[str]:
+    """Fires with a day GeoTIFF below ``root``, ignoring per-shard copies."""
+    return {
+        path.parent.name
+        for path in root.rglob("*.tif")
+        if "shards" not in path.relative_to(root).parts
+    }
+
+
+def test_two_shards_run_side_by_side_and_merge(pipeline_config, tmp_path, capsys) -> None:
+    config = pipeline_config()
+    code = CHILD.format(fires=FIRES, start=START, end=END)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BENCHMARKS), env.get("PYTHONPATH")]))
+    children = [
+        subprocess.Popen(
+            [sys.executable, "-c", code, "run", str(config), "--shard", f"{shard}/2"],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        for shard in range(2)
+    ]
+    for child in children:
+        _, stderr = child.communicate(timeout=300)
+        assert child.returncode == 0, stderr
+
+    raw, processed = tmp_path / "raw", tmp_path / "processed"
+    records = [
+        json.loads((ShardSpec(shard, 2).directory(processed) / "shard.json").read_text())
+        for shard in range(2)
+    ]
+    assert [record["status"] for record in records] == ["succeeded", "succeeded"]
+    assert records[0]["index_fingerprint"] == records[1]["index_fingerprint"]
+    index = pd.read_parquet(next((raw / "index").rglob("index.parquet")), columns=["Id"])
+    assert records[0]["index_rows"] == len(index) > 0
+    assert sum(record["shard_rows"] for record in records) == len(index)
+
+    shard_fires = [_fire_ids(ShardSpec(shard, 2).directory(raw)) for shard in range(2)]
+    assert all(shard_fires) and not shard_fires[0] & shard_fires[1]
+    for position, fires in enumerate(shard_fires):
+        assert all(shard_of(int(fire), 2) == position for fire in fires)
+    assert _fire_ids(raw) == set()  # nothing outside the shard directories yet
+
+    main(["merge", str(config)])
+    report_path = Path(capsys.readouterr().out.strip())
+
+    assert _fire_ids(raw) == shard_fires[0] | shard_fires[1] == {str(i) for i in index["Id"]}
+    report = json.loads(report_path.read_text())
+    assert report_path == processed / "run_report.json"
+    assert report["status"] == "succeeded"
+    assert [shard["rows"] for shard in report["shards"]] == [
+        record["shard_rows"] for record in records
+    ]
+    assert report["index"]["rows"] == len(index)
+
+
+@pytest.mark.parametrize("spec", ["bogus", "3/2"])
+def test_invalid_shard_is_reported_without_a_traceback(spec, pipeline_config, capsys) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        main(["run", str(pipeline_config()), "--shard", spec])
+
+    assert exit_info.value.code == 1
+    assert "Invalid shard" in capsys.readouterr().err
+
+
+def test_force_rebuilds_the_shared_index(fake_ee, pipeline_config) -> None:
+    fake_ee(fires=4)
+    path = pipeline_config()
+    shard = ShardSpec(0, 2)
+
+    def index_skipped(force: bool) -> bool:
+        report = run_pipeline(path, shard=shard, force=force).metrics.report()
+        return any(
+            item["name"] == "datasets_skipped" and item["labels"] == {"stage": "index"}
+            for item in report["counters"]
+        )
+
+    assert not index_skipped(force=False)
+    assert index_skipped(force=False)
+    assert not index_skipped(force=True)
@@ -0,0 +1,35 @@
+"""The index published in shared memory and attached by worker processes."""
+
+from __future__ import annotations
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pyarrow as pa
+import pytest
+
+from raster_builder.io.shared import SharedTable, SharedTableHandle
+
+
+def _table(rows: int) -> pa.Table:
+    return pa.table({"Id": list(range(rows)), "area": [float(row) * 1e6 for row in range(rows)]})
+
+
+def _column_sum(handle: SharedTableHandle, offset: int, length: int) -> float:
+    return sum(handle.slice(offset, length).column("area").to_pylist())
+
+
+def test_workers_attach_to_one_copy_and_receive_ranges() -> None:
+    table = _table(10_000)
+    with SharedTable(table) as shared, SharedTable(_table(10)) as small:
+        # Task messages do not grow with the table.
+        assert len(pickle.dumps(shared.handle)) <= len(pickle.dumps(small.handle)) + 8
+        offsets = list(range(0, 10_000, 2_500))
+        with ProcessPoolExecutor(2) as pool:
+            handles = [shared.handle] * len(offsets)
+            sums = list(pool.map(_column_sum, handles, offsets, [2_500] * len(offsets)))
+
+    expected = [sum(table.slice(offset, 2_500).column("area").to_pylist()) for offset in offsets]
+    assert sums == expected
+    with pytest.raises(FileNotFoundError):  # unlinked on exit
+        SharedTableHandle(shared.handle.name, shared.handle.size).attach()
@@ -0,0 +1,65 @@
+"""Raster writers: windows written per fire-day read back through ``read_day``."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+import pytest
+
+from raster_builder.io.pixels import PixelGrid
+from raster_builder.io.storage import CogCubeWriter, raster_writer
+
+BANDS = ["a", "b"]
+GRID = PixelGrid(
+    crs="EPSG:32611", x0=500_000.0, y0=4_000_000.0, resolution=30.0, width=300, height=280
+)
+DAYS = [date(2020, 7, 1), date(2020, 7, 2)]
+
+
+def _day(seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).random((len(BANDS), GRID.height, GRID.width), "float32")
+
+
+def _write(writer, fire_id: int, day: date, array: np.ndarray) -> None:
+    """Write ``array`` as two windows, the way tiled fetches arrive."""
+    split = GRID.height // 2
+    with writer.open_day(fire_id, day, GRID, BANDS) as sink:
+        sink(array[:, split:], 0, split)
+        sink(array[:, :split], 0, 0)
+
+
+@pytest.mark.parametrize("output_format", ["geotiff", "zarr", "cog"])
+def test_days_round_trip_through_read_day(output_format, tmp_path) -> None:
+    writer = raster_writer(
+        {"output_format": output_format, "lock_dir": str(tmp_path / "locks")},
+        tmp_path / "out",
+    )
+    arrays = {day: _day(seed) for seed, day in enumerate(DAYS)}
+    for day, array in arrays.items():
+        _write(writer, 7, day, array)
+    writer.finalize()
+
+    for day, array in arrays.items():
+        np.testing.assert_array_equal(writer.read_day(7, day), array)
+        assert writer.output_path(7, day).exists()
+
+
+def test_cog_keeps_days_that_are_not_restaged(tmp_path) -> None:
+    import rasterio
+
+    writer = CogCubeWriter(tmp_path)
+    first, second, restaged = _day(0), _day(1), _day(2)
+    _write(writer, 7, DAYS[0], first)
+    writer.finalize()
+    _write(writer, 7, DAYS[1], second)
+    _write(writer, 7, DAYS[0], restaged)
+    assert writer.finalize() == [writer.cube_path(7)]
+
+    np.testing.assert_array_equal(writer.read_day(7, DAYS[0]), restaged)
+    np.testing.assert_array_equal(writer.read_day(7, DAYS[1]), second)
+    assert writer.finalize() == []  # nothing staged, nothing reassembled
+    with rasterio.open(writer.cube_path(7)) as cube:
+        assert cube.count == len(DAYS) * len(BANDS)
+        assert cube.overviews(1)
+        assert cube.profile["interleave"] == "band"
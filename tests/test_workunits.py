@@ -0,0 +1,66 @@
+"""Work unit dispatch resumed from the run journal."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, List, Mapping, Set
+
+import pandas as pd
+
+from raster_builder.io.journal import RunJournal
+from raster_builder.io.storage import atomic_output
+from raster_builder.workunits import WorkUnit, iter_work_units, run_work_units
+
+INDEX = pd.DataFrame(
+    {
+        "Id": [1, 2],
+        "IDate": pd.to_datetime(["2020-07-01", "2020-08-10"]),
+        "FDate": pd.to_datetime(["2020-07-03", "2020-08-12"]),
+        "lat": [38.5, 40.1],
+        "lon": [-120.2, -122.4],
+    }
+)
+
+
+class Handler:
+    """Writes one file per unit and raises for the unit keys in ``broken``."""
+
+    def __init__(self, broken: Set[str]) -> None:
+        self.broken = broken
+        self.calls: List[str] = []
+
+    def __call__(self, unit: WorkUnit, options: Mapping[str, Any], output_dir: Path) -> Path:
+        self.calls.append(unit.key)
+        if unit.key in self.broken:
+            raise RuntimeError("Too many concurrent aggregations.")
+        path = output_dir / f"{unit.key.replace('/', '_')}.txt"
+        with atomic_output(path) as tmp_path:
+            tmp_path.write_text(unit.key, encoding="utf-8")
+        return path
+
+
+def test_a_rerun_resumes_after_failed_units(tmp_path) -> None:
+    units = list(iter_work_units(INDEX))
+    broken = {units[1].key, units[4].key}
+    output_dir = tmp_path / "out"
+
+    with RunJournal(tmp_path / "journal.sqlite") as journal:
+        first = Handler(broken)
+        report = run_work_units(
+            units, first, {}, output_dir, workers=2, journal=journal, journal_key="ds"
+        )
+        assert {unit.key for unit, _ in report.failed} == broken
+        assert len(report.completed) == len(units) - 2
+        assert {key for key, state in journal.states("ds").items() if state == "failed"} == broken
+
+        # An output removed since is redone along with the failures.
+        removed = next(path for _, path in report.completed)
+        removed.unlink()
+        second = Handler(set())
+        report = run_work_units(
+            units, second, {}, output_dir, workers=2, journal=journal, journal_key="ds"
+        )
+
+    assert set(second.calls) == broken | {removed.read_text(encoding="utf-8")}
+    assert report.resumed == len(units) - 3 and not report.failed
+    assert len(list(output_dir.glob("*.txt"))) == len(units)